@@ -0,0 +1,298 @@
+"""
+===============================================================
+Matplotlib Tooling: Collection-Based Batch Rendering
+===============================================================
+
+This module covers:
+1. `plot_lines`: many series as one LineCollection instead of one Line2D
+   per `plt.plot` call.
+2. `plot_markers`: many marker series (the loop in 2_Markers.ipynb) as one
+   PathCollection, with a marker shape, color and size per series.
+3. `bar_collection`: bars as one PolyCollection instead of one Rectangle
+   patch per category.
+4. `pie_collection`: pie wedges as one PolyCollection instead of one Wedge
+   patch per category.
+5. A benchmark reporting artist count, creation time and draw time for the
+   per-artist and the collection version of each chart.
+
+Geometry is built with NumPy in one go (segment, offset and vertex
+arrays), so the cost per series or category is a few array elements, not a
+Python object with its own transform, properties and draw call.
+Collections carry one label, so legends for individual series need proxy
+artists (`legend_handles`).
+
+Usage:
+    from batch_collections import plot_lines, bar_collection
+
+    fig, ax = plt.subplots()
+    plot_lines(ax, x, ys, colors=plt.cm.viridis(np.linspace(0, 1, len(ys))))
+    bar_collection(ax, np.arange(5000), heights, color='skyblue', edgecolor='black')
+"""
+
+import numpy as np
+from matplotlib.collections import LineCollection, PathCollection, PolyCollection
+from matplotlib.markers import MarkerStyle
+
+# ===============================================================
+# Section 1: Lines and Markers
+# ===============================================================
+
+
+def _series_arrays(x, ys):
+    """(n_series, n_points) x and y arrays from shared or per-series x."""
+    ys = np.asarray(ys, dtype='float64')
+    if ys.ndim == 1:
+        ys = ys[np.newaxis, :]
+    x = np.asarray(x, dtype='float64')
+    xs = np.broadcast_to(x, ys.shape) if x.ndim == 1 else x
+    return xs, ys
+
+
+def _finish(ax, collection, autoscale=True):
+    """Adds a collection to the axes and updates the data limits."""
+    ax.add_collection(collection, autolim=True)
+    if autoscale:
+        ax.autoscale_view()
+    return collection
+
+
+def plot_lines(ax, x, ys, colors=None, linewidths=1.5, linestyles='solid', label=None, **kwargs):
+    """
+    Draws every row of `ys` against `x` as one LineCollection.
+
+    `x` is shared (1D) or one row per series (2D). Returns the collection.
+    """
+    xs, ys = _series_arrays(x, ys)
+    segments = np.stack([xs, ys], axis=-1)
+    collection = LineCollection(segments, colors=colors, linewidths=linewidths, linestyles=linestyles,
+                                label=label, **kwargs)
+    return _finish(ax, collection)
+
+
+def marker_path(marker):
+    """The unit Path of a marker symbol such as 'o', 's' or '^'."""
+    style = marker if isinstance(marker, MarkerStyle) else MarkerStyle(marker)
+    return style.get_path().transformed(style.get_transform())
+
+
+def _per_series(value, n_series):
+    """One value per series from a single value or a sequence of n_series values."""
+    if isinstance(value, (list, tuple, np.ndarray)) and len(value) == n_series:
+        return list(value)
+    return [value] * n_series
+
+
+def plot_markers(ax, x, ys, markers='o', colors=None, sizes=36.0, label=None, **kwargs):
+    """
+    Draws marker-only series as one PathCollection.
+
+    `markers`, `colors` and `sizes` (points^2, like scatter) are either one
+    value for every series or one value per series. As in `scatter`,
+    filled markers are painted with their color and unfilled ones ('+',
+    'x', '1', ...) are stroked with it.
+    """
+    import matplotlib as mpl
+    from matplotlib.colors import to_rgba_array
+
+    xs, ys = _series_arrays(x, ys)
+    n_series, n_points = ys.shape
+    if colors is None:
+        colors = [f"C{i % 10}" for i in range(n_series)]
+    markers = _per_series(markers, n_series)
+    styles = {marker: MarkerStyle(marker) for marker in set(markers)}
+    paths = {marker: marker_path(style) for marker, style in styles.items()}
+
+    series_colors = to_rgba_array(_per_series(colors, n_series))
+    filled = np.array([styles[marker].is_filled() for marker in markers])
+    facecolors = np.where(filled[:, np.newaxis], series_colors, 0.0)
+    kwargs.setdefault('linewidths', mpl.rcParams['lines.markeredgewidth'])
+
+    collection = PathCollection(
+        [paths[marker] for marker in markers for _ in range(n_points)],
+        sizes=np.repeat(np.asarray(_per_series(sizes, n_series), dtype='float64'), n_points),
+        offsets=np.column_stack([xs.ravel(), ys.ravel()]),
+        offset_transform=ax.transData,
+        facecolors=np.repeat(facecolors, n_points, axis=0),
+        edgecolors=np.repeat(series_colors, n_points, axis=0),
+        label=label,
+        **kwargs,
+    )
+    # Like scatter: marker paths are in points, scaled by `sizes`, placed at the offsets
+    collection.set_transform(_identity())
+    return _finish(ax, collection)
+
+
+def _identity():
+    """Identity transform: PathCollection scales marker paths by `sizes` itself."""
+    from matplotlib.transforms import IdentityTransform
+
+    return IdentityTransform()
+
+
+def legend_handles(labels, colors, kind='line', markers=None):
+    """Proxy artists for a legend of series drawn as a single collection."""
+    from matplotlib.lines import Line2D
+
+    markers = markers or [None] * len(labels)
+    linestyle = '-' if kind == 'line' else 'None'
+    return [Line2D([], [], color=color, marker=marker, linestyle=linestyle, label=label)
+            for label, color, marker in zip(labels, colors, markers)]
+
+
+# ===============================================================
+# Section 2: Bars and Pies
+# ===============================================================
+
+
+def bar_collection(ax, x, heights, width=0.8, bottom=0.0, color=None, edgecolor=None, linewidth=None,
+                   tick_labels=None, label=None, **kwargs):
+    """
+    Draws bars as one PolyCollection (like `ax.bar` with numeric x).
+
+    Vertices of all rectangles are built as one (n, 4, 2) array.
+    `tick_labels` (category names) are applied only when given.
+    """
+    x = np.asarray(x, dtype='float64')
+    heights = np.asarray(heights, dtype='float64')
+    bottom = np.broadcast_to(np.asarray(bottom, dtype='float64'), heights.shape)
+    left, right = x - width / 2, x + width / 2
+    top = bottom + heights
+    vertices = np.stack([
+        np.column_stack([left, bottom]),
+        np.column_stack([left, top]),
+        np.column_stack([right, top]),
+        np.column_stack([right, bottom]),
+    ], axis=1)
+    collection = PolyCollection(vertices, facecolors=color if color is not None else 'C0',
+                                edgecolors=edgecolor if edgecolor is not None else 'face',
+                                linewidths=linewidth, label=label, **kwargs)
+    _finish(ax, collection)
+    if tick_labels is not None:
+        ax.set_xticks(x, tick_labels)
+    return collection
+
+
+def pie_collection(ax, sizes, colors=None, startangle=0.0, radius=1.0, inner_radius=0.0,
+                   resolution=64, **kwargs):
+    """
+    Draws pie (or donut, with inner_radius > 0) wedges as one PolyCollection.
+
+    Each wedge is a polygon with `resolution` points along its outer arc,
+    counter-clockwise from `startangle` degrees like `ax.pie`.
+    """
+    sizes = np.asarray(sizes, dtype='float64')
+    fractions = sizes / sizes.sum()
+    bounds = np.deg2rad(startangle) + 2 * np.pi * np.r_[0.0, np.cumsum(fractions)]
+    steps = np.linspace(0.0, 1.0, resolution)
+    angles = bounds[:-1, np.newaxis] + (bounds[1:] - bounds[:-1])[:, np.newaxis] * steps
+    outer = np.stack([radius * np.cos(angles), radius * np.sin(angles)], axis=-1)
+    if inner_radius > 0:
+        inner = np.stack([inner_radius * np.cos(angles), inner_radius * np.sin(angles)], axis=-1)[:, ::-1]
+        vertices = np.concatenate([outer, inner], axis=1)
+    else:
+        center = np.zeros((len(sizes), 1, 2))
+        vertices = np.concatenate([center, outer], axis=1)
+
+    if colors is None:
+        colors = [f"C{i % 10}" for i in range(len(sizes))]
+    collection = PolyCollection(vertices, facecolors=colors, **kwargs)
+    _finish(ax, collection, autoscale=False)
+    ax.set_xlim(-1.1 * radius, 1.1 * radius)
+    ax.set_ylim(-1.1 * radius, 1.1 * radius)
+    ax.set_aspect('equal')
+    return collection
+
+
+# ===============================================================
+# Section 3: Benchmark
+# ===============================================================
+
+"""
+Each case draws the same chart twice on a fresh Agg figure: once the
+notebook way (one artist per series/category) and once with a single
+collection. Reported per case and version:
+
+    artists   artists added to the axes (lines + patches + collections)
+    create_s  time to create the artists
+    draw_s    time of one full canvas.draw()
+"""
+
+
+def _count_artists(ax):
+    """Data artists on the axes."""
+    return len(ax.lines) + len(ax.patches) + len(ax.collections)
+
+
+def _cases(n, rng):
+    """(name, per-artist function, collection function) for a size n."""
+    x = np.linspace(0, 10, 50)
+    ys = np.sin(x + rng.random((n, 1)) * 10) + rng.random((n, 1)) * 5
+    markers = ['.', 'o', 'v', '^', '<', '>', 's', 'p', '*', 'h', 'H', '+', 'x', 'D', 'd']
+    series_markers = [markers[i % len(markers)] for i in range(n)]
+    heights = rng.integers(1, 100, n)
+    colors = [f"C{i % 10}" for i in range(n)]
+
+    def lines_loop(ax):
+        for y in ys:
+            ax.plot(x, y)
+
+    def markers_loop(ax):
+        for i, y in enumerate(ys[:, ::5]):
+            ax.plot(x[::5] + i, y, marker=series_markers[i], linestyle='None', markersize=6)
+
+    def markers_batched(ax):
+        plot_markers(ax, x[::5] + np.arange(n)[:, np.newaxis], ys[:, ::5], markers=series_markers,
+                     colors=colors, sizes=36)
+
+    return [
+        ('lines', lines_loop, lambda ax: plot_lines(ax, x, ys, colors=colors)),
+        ('markers', markers_loop, markers_batched),
+        ('bars', lambda ax: ax.bar(np.arange(n), heights, color='skyblue', edgecolor='black'),
+         lambda ax: bar_collection(ax, np.arange(n), heights, color='skyblue', edgecolor='black')),
+        ('pie', lambda ax: ax.pie(heights, colors=colors), lambda ax: pie_collection(ax, heights, colors=colors)),
+    ]
+
+
+def benchmark(n=2_000, seed=0):
+    """Artist count, creation and draw time per chart type, before and after."""
+    import time
+
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    rows = []
+    for name, per_artist, batched in _cases(n, np.random.default_rng(seed)):
+        for version, draw in (('per-artist', per_artist), ('collection', batched)):
+            fig, ax = plt.subplots(figsize=(10, 6))
+            start = time.perf_counter()
+            draw(ax)
+            created = time.perf_counter() - start
+            start = time.perf_counter()
+            fig.canvas.draw()
+            drawn = time.perf_counter() - start
+            rows.append({'chart': name, 'version': version, 'artists': _count_artists(ax),
+                         'create_s': created, 'draw_s': drawn, 'total_s': created + drawn})
+            plt.close(fig)
+
+    table = pd.DataFrame(rows)
+    totals = table.pivot(index='chart', columns='version', values='total_s')
+    speedup = (totals['per-artist'] / totals['collection']).rename('speedup')
+    return table, speedup
+
+
+# ===============================================================
+# Section 4: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    import matplotlib
+
+    matplotlib.use('Agg')
+    import pandas as pd
+
+    table, speedup = benchmark(n=2_000)
+    with pd.option_context('display.float_format', '{:.3f}'.format):
+        print(table.to_string(index=False))
+        print()
+        print(speedup.to_string())
+    # Output: one artist per chart instead of thousands, several times faster
@@ -0,0 +1,306 @@
+"""
+===============================================================
+Matplotlib Tooling: Headless Parallel Batch Renderer
+===============================================================
+
+This module covers:
+1. Describing charts as `ChartSpec`s: a chart function plus its keyword
+   arguments, output formats, DPI and rcParams.
+2. Rendering many charts on the non-interactive Agg backend across a pool
+   of worker processes, writing PNG and/or SVG files.
+3. Reusing the workers: each one imports matplotlib, loads the font cache
+   and draws a warm-up figure once, then renders chart after chart.
+4. Per-chart timings (building the artists, then rasterizing and saving)
+   and error capture, so one broken chart (or a spec that cannot be
+   pickled, or a crashed worker) does not abort the nightly batch.
+
+Chart functions draw with pyplot exactly like a notebook cell, minus
+plt.show(). They may return a Figure, an Axes (as DataFrame.plot does) or
+nothing, in which case the current figure is saved. They are given as
+callables or as 'module:function' strings; strings are imported inside the
+worker, so the parent process never has to import pyplot.
+
+Usage:
+    from batch_renderer import BatchRenderer, ChartSpec
+
+    specs = [ChartSpec('notebook_charts:sine_cosine', name='sine', formats=('png', 'svg'))]
+    with BatchRenderer('reports', workers=4) as renderer:
+        results = renderer.render(specs)
+    print(results_table(results))
+"""
+
+import ast
+import importlib
+import importlib.util
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+# ===============================================================
+# Section 1: Chart Specifications
+# ===============================================================
+
+
+class ChartSpec:
+    """One chart to render: function, arguments and output settings."""
+
+    def __init__(self, function, name=None, kwargs=None, formats=('png',), dpi=100, rc=None):
+        self.function = function
+        self.name = name or _function_name(function)
+        self.kwargs = kwargs or {}
+        self.formats = tuple(formats)
+        self.dpi = dpi
+        self.rc = rc or {}
+
+    def __repr__(self):
+        return f"ChartSpec({self.name!r}, formats={self.formats})"
+
+
+def _function_name(function):
+    """Default chart name: the function name."""
+    if isinstance(function, str):
+        return function.rpartition(':')[2]
+    return function.__name__
+
+
+def resolve(function):
+    """Turns 'module:function' into the function; callables pass through."""
+    if callable(function):
+        return function
+    module_name, _, attribute = function.partition(':')
+    if not attribute:
+        raise ValueError(f"Expected 'module:function', got {function!r}")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def registry_names(module_name, registry='CHARTS'):
+    """Keys of a module-level dict literal, read from the source without importing the module."""
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or spec.origin is None:
+        raise ImportError(f"No module named {module_name!r}")
+    with open(spec.origin) as file:
+        tree = ast.parse(file.read(), spec.origin)
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict)
+                and any(isinstance(target, ast.Name) and target.id == registry for target in node.targets)):
+            return [ast.literal_eval(key) for key in node.value.keys]
+    raise ValueError(f"{module_name} has no dict literal named {registry}")
+
+
+# ===============================================================
+# Section 2: Worker Processes
+# ===============================================================
+
+"""
+A ProcessPoolExecutor keeps its workers alive for the lifetime of the pool,
+and its `initializer` runs once per worker. That is where the expensive,
+chart-independent setup happens:
+
+- matplotlib.use('Agg') before pyplot is imported (no GUI toolkit),
+- importing pyplot, which loads (or builds) the font cache,
+- drawing and saving one tiny figure, which loads the default font files
+  and the PNG/SVG writers.
+
+After that, each task only pays for its own chart. With workers=0 the
+charts run in the calling process, which keeps its own backend (a notebook's
+inline backend, say) and its own open figures.
+"""
+
+_WORKER = {}
+
+
+def _init_worker(search_path, backend='Agg'):
+    """Per-process setup; runs once in every worker (backend=None keeps the current one)."""
+    import io
+    import sys
+
+    import matplotlib
+
+    if backend is not None:
+        matplotlib.use(backend)
+    import matplotlib.pyplot as plt
+
+    for path in search_path:
+        if path not in sys.path:
+            sys.path.append(path)
+
+    fig = plt.figure(figsize=(1, 1))
+    fig.gca().plot([0, 1], [0, 1])
+    fig.gca().set_title('warm-up')
+    fig.savefig(io.BytesIO(), format='png')
+    fig.savefig(io.BytesIO(), format='svg')
+    plt.close(fig)
+    _WORKER.update(plt=plt, matplotlib=matplotlib, pid=os.getpid())
+
+
+def _current_figure(result, plt):
+    """The Figure a chart function produced."""
+    if result is not None and hasattr(result, 'savefig'):
+        return result
+    if result is not None and hasattr(result, 'get_figure'):
+        return result.get_figure()
+    return plt.gcf()
+
+
+def render_chart(spec, output_dir):
+    """Renders one spec; runs inside a worker (or in-process when workers=0)."""
+    if not _WORKER:
+        # In-process render: leave the caller's backend alone
+        _init_worker([], backend=None)
+    plt, matplotlib = _WORKER['plt'], _WORKER['matplotlib']
+    result = _new_result(spec, os.getpid())
+    # Only the chart's own figures are closed, never the caller's
+    open_before = set(plt.get_fignums())
+    try:
+        with matplotlib.rc_context(spec.rc):
+            start = time.perf_counter()
+            figure = _current_figure(resolve(spec.function)(**spec.kwargs), plt)
+            result['plot_seconds'] = time.perf_counter() - start
+
+            # savefig rasterizes (or serializes) the figure once per format
+            start = time.perf_counter()
+            for fmt in spec.formats:
+                path = os.path.join(output_dir, f"{spec.name}.{fmt}")
+                figure.savefig(path, format=fmt, dpi=spec.dpi)
+                result['files'].append(path)
+            result['save_seconds'] = time.perf_counter() - start
+    except Exception as error:
+        result['status'] = 'error'
+        result['error'] = f"{type(error).__name__}: {error}\n{traceback.format_exc()}"
+    finally:
+        for number in set(plt.get_fignums()) - open_before:
+            plt.close(number)
+    result['seconds'] = result['plot_seconds'] + result['save_seconds']
+    return result
+
+
+def _new_result(spec, pid):
+    """The result dict of one chart, before rendering."""
+    return {'chart': spec.name, 'pid': pid, 'files': [], 'plot_seconds': 0.0, 'save_seconds': 0.0,
+            'seconds': 0.0, 'status': 'ok', 'error': None}
+
+
+def _failed_result(spec, error):
+    """Result for a chart whose task failed outside render_chart (pickling, a dead worker)."""
+    result = _new_result(spec, None)
+    result['status'] = 'error'
+    result['error'] = f"{type(error).__name__}: {error}\n" + ''.join(
+        traceback.format_exception(type(error), error, error.__traceback__))
+    return result
+
+
+# ===============================================================
+# Section 3: The Batch Renderer
+# ===============================================================
+
+
+class BatchRenderer:
+    """Renders ChartSpecs on a reusable pool of Agg worker processes."""
+
+    def __init__(self, output_dir, workers=None, search_path=None):
+        self.output_dir = output_dir
+        self.workers = os.cpu_count() if workers is None else workers
+        self.search_path = list(search_path or [os.path.dirname(os.path.abspath(__file__))])
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def pool(self):
+        """The worker pool, started on first use and kept until close()."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self.search_path,))
+        return self._pool
+
+    def render(self, specs):
+        """
+        Renders every spec and returns one result dict per chart, in order.
+
+        With workers=0 the charts are rendered in the calling process, which
+        is handy for debugging a single chart.
+        """
+        specs = list(specs)
+        names = [spec.name for spec in specs]
+        if len(set(names)) != len(names):
+            raise ValueError("Chart names must be unique within a batch")
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        if self.workers == 0:
+            return [render_chart(spec, self.output_dir) for spec in specs]
+        futures = [self.pool.submit(render_chart, spec, self.output_dir) for spec in specs]
+        results = []
+        for spec, future in zip(specs, futures):
+            try:
+                results.append(future.result())
+            except Exception as error:
+                results.append(_failed_result(spec, error))
+                if isinstance(error, BrokenProcessPool):
+                    # A worker died; the next render starts a fresh pool
+                    self.close()
+        return results
+
+    def close(self):
+        """Shuts the worker pool down."""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.shutdown()
+
+
+def results_table(results):
+    """Per-chart timings as a DataFrame, slowest first."""
+    table = pd.DataFrame(results, columns=['chart', 'status', 'seconds', 'plot_seconds',
+                                           'save_seconds', 'pid', 'files', 'error'])
+    return table.sort_values('seconds', ascending=False).reset_index(drop=True)
+
+
+def render_all(specs, output_dir, workers=None):
+    """One-shot helper: renders the specs and returns the results table."""
+    with BatchRenderer(output_dir, workers) as renderer:
+        return results_table(renderer.render(specs))
+
+
+def notebook_specs(formats=('png',), copies=1, dpi=100):
+    """
+    Specs for every chart in notebook_charts.CHARTS, optionally repeated.
+
+    The chart names are read from the module source, so the parent process
+    does not import notebook_charts (and with it pyplot).
+    """
+    return [ChartSpec(f"notebook_charts:{name}", name=name if copies == 1 else f"{name}_{copy:03d}",
+                      formats=formats, dpi=dpi)
+            for copy in range(copies) for name in registry_names('notebook_charts')]
+
+
+# ===============================================================
+# Section 4: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Render the notebook charts headlessly")
+    parser.add_argument('--output-dir', default=os.path.join(tempfile.gettempdir(), 'notebook_charts'))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--copies', type=int, default=3, help="render each chart this many times")
+    parser.add_argument('--formats', default='png,svg')
+    args = parser.parse_args()
+
+    specs = notebook_specs(tuple(args.formats.split(',')), args.copies)
+    start = time.perf_counter()
+    table = render_all(specs, args.output_dir, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(table[['chart', 'status', 'seconds', 'plot_seconds', 'save_seconds', 'pid']].head(10))
+    print(f"\n{len(table)} charts in {elapsed:.2f}s on {table['pid'].nunique()} worker(s); "
+          f"{(table['status'] != 'ok').sum()} failed")
+    print("Files in", args.output_dir)
@@ -0,0 +1,376 @@
+"""
+===============================================================
+Matplotlib Tooling: Mergeable Pre-Binned Histograms
+===============================================================
+
+This module covers:
+1. A `Histogram` object that holds bin edges and counts (plus underflow,
+   overflow and missing values) instead of raw data.
+2. Two kinds of edges:
+   - fixed: any edges given up front (np.linspace, custom breaks),
+   - adaptive: power-of-two bin widths aligned to multiples of the width,
+     widened automatically as new data arrives.
+3. Building one histogram per chunk, file or partition and merging them.
+   Adaptive histograms always merge: both grids are coarsened to the wider
+   bin width, which contains the finer one exactly.
+4. Rebinning to coarser resolutions from the counts alone.
+5. Quantiles, mean, saving/loading, and plotting with the usual `plt.hist`
+   keyword arguments.
+
+Usage:
+    from binned_histogram import Histogram, histogram_file
+
+    h = Histogram.fixed(-4, 4, 80)
+    for chunk in chunks:
+        h.add(chunk)
+    h.merge(other).rebin(4).plot(color='blue', edgecolor='black')
+"""
+
+import numpy as np
+
+# ===============================================================
+# Section 1: The Histogram
+# ===============================================================
+
+"""
+Adaptive grids: an adaptive histogram with bin width w = 2**k has edges
+at integer multiples of w. A grid with width 2w has edges at multiples of
+2w, which are also multiples of w, so every coarse bin is the union of two
+fine bins. Coarsening is then a bincount of the fine bins onto the coarse
+ones, and any two adaptive histograms can be brought onto one common grid
+without touching raw data. The width doubles whenever the data range would
+need more than `max_bins` bins.
+"""
+
+DEFAULT_MAX_BINS = 256
+
+
+class Histogram:
+    """Bin counts over fixed or adaptive edges; mergeable and rebinnable."""
+
+    def __init__(self, edges=None, counts=None, underflow=0, overflow=0, missing=0, adaptive=False,
+                 max_bins=DEFAULT_MAX_BINS):
+        self.edges = None if edges is None else np.asarray(edges, dtype='float64')
+        if counts is None and self.edges is not None:
+            counts = np.zeros(len(self.edges) - 1, dtype='int64')
+        self.counts = counts
+        self.underflow = int(underflow)
+        self.overflow = int(overflow)
+        self.missing = int(missing)
+        self.adaptive = adaptive
+        self.max_bins = max_bins
+
+    @classmethod
+    def fixed(cls, lo, hi, bins):
+        """Empty histogram with `bins` equal bins over [lo, hi]."""
+        return cls(np.linspace(lo, hi, bins + 1))
+
+    @classmethod
+    def with_edges(cls, edges):
+        """Empty histogram over arbitrary increasing edges."""
+        edges = np.asarray(edges, dtype='float64')
+        if len(edges) < 2 or np.any(np.diff(edges) <= 0):
+            raise ValueError("edges must be strictly increasing with at least two values")
+        return cls(edges)
+
+    @classmethod
+    def auto(cls, max_bins=DEFAULT_MAX_BINS):
+        """Empty adaptive histogram; its range follows the data."""
+        return cls(adaptive=True, max_bins=max_bins)
+
+    @classmethod
+    def from_values(cls, values, bins=None, range=None, edges=None, max_bins=DEFAULT_MAX_BINS):
+        """
+        Histogram of one array, like np.histogram.
+
+        `edges`, or `bins` together with `range`, give fixed edges; without
+        either the histogram is adaptive.
+        """
+        if edges is not None:
+            histogram = cls.with_edges(edges)
+        elif range is not None:
+            histogram = cls.fixed(range[0], range[1], bins or 10)
+        else:
+            histogram = cls.auto(bins or max_bins)
+        return histogram.add(values)
+
+    # ---------------------------------------------------------------
+    # Adding data
+    # ---------------------------------------------------------------
+
+    @property
+    def width(self):
+        """Bin width of an adaptive grid."""
+        return float(self.edges[1] - self.edges[0])
+
+    @property
+    def bins(self):
+        """Number of bins (0 while an adaptive histogram is empty)."""
+        return 0 if self.edges is None else len(self.edges) - 1
+
+    def add(self, values):
+        """Counts one chunk of values (in place) and returns the histogram."""
+        values = np.asarray(values, dtype='float64').ravel()
+        finite = np.isfinite(values)
+        self.missing += int(len(values) - finite.sum())
+        values = values[finite]
+        if len(values) == 0:
+            return self
+
+        if self.adaptive:
+            # The upper bound is exclusive, so nudge the maximum into its bin
+            self._cover(values.min(), np.nextafter(values.max(), np.inf))
+            index = np.floor((values - self.edges[0]) / self.width).astype('int64')
+            self.counts += np.bincount(np.minimum(index, self.bins - 1), minlength=self.bins)
+            return self
+
+        lo, hi = self.edges[0], self.edges[-1]
+        self.underflow += int((values < lo).sum())
+        self.overflow += int((values > hi).sum())
+        self.counts += np.histogram(values, self.edges)[0]
+        return self
+
+    def _cover(self, lo, hi, width=None):
+        """Widens an adaptive grid (and coarsens it if needed) to cover [lo, hi)."""
+        if self.edges is not None:
+            lo, hi = min(lo, self.edges[0]), max(hi, self.edges[-1])
+            width = max(width or 0.0, self.width)
+        if width is None:
+            # Keep bins well above float resolution when all values are (nearly) equal
+            span = max(hi - lo, 1e-9 * max(abs(lo), abs(hi)), 1e-12)
+            width = 2.0 ** np.ceil(np.log2(span / self.max_bins))
+        while True:
+            start = np.floor(lo / width) * width
+            bins = max(int(np.ceil(hi / width) - np.floor(lo / width)), 1)
+            if bins <= self.max_bins:
+                break
+            width *= 2
+        if self.edges is not None and np.isclose(start, self.edges[0]) and width == self.width \
+                and bins == self.bins:
+            return
+        self.counts = self._regrid(start, width, bins)
+        self.edges = start + width * np.arange(bins + 1)
+
+    def _regrid(self, start, width, bins):
+        """This histogram's counts on the aligned grid (start, width, bins)."""
+        if self.edges is None:
+            return np.zeros(bins, dtype='int64')
+        factor = int(round(width / self.width))
+        offset = int(round((self.edges[0] - start) / self.width))
+        target = (offset + np.arange(self.bins)) // factor
+        return np.bincount(target, weights=self.counts, minlength=bins).astype('int64')
+
+    # ---------------------------------------------------------------
+    # Merging and rebinning
+    # ---------------------------------------------------------------
+
+    def copy(self):
+        """An independent copy."""
+        return Histogram(None if self.edges is None else self.edges.copy(),
+                         None if self.counts is None else self.counts.copy(),
+                         self.underflow, self.overflow, self.missing, self.adaptive, self.max_bins)
+
+    def merge(self, other):
+        """
+        Combines two histograms into a new one.
+
+        Adaptive histograms are moved to a common grid first. Fixed
+        histograms must share their edges; use `rebin(edges=...)` to bring
+        one onto the other's edges when they differ but nest.
+        """
+        merged = self.copy()
+        merged.underflow += other.underflow
+        merged.overflow += other.overflow
+        merged.missing += other.missing
+        if other.edges is None:
+            return merged
+        if merged.edges is None:
+            merged.edges, merged.counts = other.edges.copy(), other.counts.copy()
+            merged.adaptive = other.adaptive
+            return merged
+
+        if self.adaptive and other.adaptive:
+            merged.max_bins = max(self.max_bins, other.max_bins)
+            merged._cover(other.edges[0], other.edges[-1], other.width)
+            merged.counts += other._regrid(merged.edges[0], merged.width, merged.bins)
+            return merged
+        if self.bins != other.bins or not np.allclose(self.edges, other.edges):
+            raise ValueError("Histograms have different edges; rebin one onto the other's edges first")
+        merged.counts += other.counts
+        return merged
+
+    def rebin(self, factor=None, edges=None):
+        """
+        A coarser histogram computed from the counts alone.
+
+        `factor` joins every `factor` neighbouring bins (adaptive histograms
+        stay aligned, so use powers of two there); `edges` must be a subset
+        of the current edges, and counts outside them move to the
+        under/overflow.
+        """
+        if (factor is None) == (edges is None):
+            raise ValueError("Pass exactly one of factor or edges")
+        if self.edges is None:
+            return self.copy()
+
+        if factor is not None:
+            if self.adaptive:
+                result = self.copy()
+                result.max_bins = -(-self.bins // factor) + 1
+                result._cover(self.edges[0], self.edges[-1], self.width * factor)
+                return result
+            starts = np.arange(0, self.bins, factor)
+            new_edges = np.r_[self.edges[starts], self.edges[-1]]
+            return Histogram(new_edges, np.add.reduceat(self.counts, starts),
+                             self.underflow, self.overflow, self.missing)
+
+        edges = np.asarray(edges, dtype='float64')
+        positions = np.searchsorted(self.edges, edges)
+        positions = np.clip(positions, 0, len(self.edges) - 1)
+        if not np.allclose(self.edges[positions], edges):
+            raise ValueError("New edges must be a subset of the current edges")
+        cumulative = np.r_[0, np.cumsum(self.counts)]
+        counts = np.diff(cumulative[positions])
+        return Histogram(edges, counts, self.underflow + int(cumulative[positions[0]]),
+                         self.overflow + int(cumulative[-1] - cumulative[positions[-1]]), self.missing)
+
+    # ---------------------------------------------------------------
+    # Statistics
+    # ---------------------------------------------------------------
+
+    @property
+    def total(self):
+        """Number of values inside the edges."""
+        return 0 if self.counts is None else int(self.counts.sum())
+
+    @property
+    def centers(self):
+        """Midpoint of every bin."""
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+    def density(self):
+        """Counts normalized so the area under the histogram is 1."""
+        return self.counts / (self.total * np.diff(self.edges))
+
+    def mean(self):
+        """Mean estimated from bin centers."""
+        return float(np.dot(self.centers, self.counts) / self.total)
+
+    def quantile(self, q):
+        """Quantile(s) estimated by linear interpolation inside bins."""
+        cumulative = np.r_[0, np.cumsum(self.counts)] / self.total
+        return np.interp(q, cumulative, self.edges)
+
+    # ---------------------------------------------------------------
+    # Persistence and plotting
+    # ---------------------------------------------------------------
+
+    def save(self, path):
+        """Writes the histogram to a .npz file."""
+        np.savez(path, edges=self.edges if self.edges is not None else np.empty(0),
+                 counts=self.counts if self.counts is not None else np.empty(0, dtype='int64'),
+                 meta=np.array([self.underflow, self.overflow, self.missing, int(self.adaptive),
+                                self.max_bins]))
+
+    @classmethod
+    def load(cls, path):
+        """Reads a histogram written by `save()`."""
+        with np.load(path) as data:
+            underflow, overflow, missing, adaptive, max_bins = data['meta'].tolist()
+            edges = data['edges'] if len(data['edges']) else None
+            counts = data['counts'] if edges is not None else None
+            return cls(edges, counts, underflow, overflow, missing, bool(adaptive), max_bins)
+
+    def plot(self, ax=None, density=False, **hist_kwargs):
+        """
+        Draws the histogram with `ax.hist` (same keyword arguments).
+
+        Each bin is passed as one weighted value, so drawing costs one
+        patch per bin no matter how many rows were counted.
+        """
+        if ax is None:
+            import matplotlib.pyplot as plt
+            ax = plt.gca()
+        return ax.hist(self.centers, bins=self.edges, weights=self.counts, density=density,
+                       **hist_kwargs)
+
+    def __repr__(self):
+        kind = 'adaptive' if self.adaptive else 'fixed'
+        if self.edges is None:
+            return f"Histogram({kind}, empty)"
+        return (f"Histogram({kind}, {self.bins} bins over [{self.edges[0]:g}, {self.edges[-1]:g}], "
+                f"total={self.total})")
+
+
+# ===============================================================
+# Section 2: Histograms of Files and Partitions
+# ===============================================================
+
+
+def histogram_file(path, column, chunksize=100_000, edges=None, bins=None, range=None,
+                   max_bins=DEFAULT_MAX_BINS):
+    """Histogram of one numeric CSV column, built chunk by chunk."""
+    import pandas as pd
+
+    histogram = (Histogram.with_edges(edges) if edges is not None
+                 else Histogram.fixed(range[0], range[1], bins or 10) if range is not None
+                 else Histogram.auto(max_bins))
+    for chunk in pd.read_csv(path, usecols=[column], chunksize=chunksize):
+        histogram.add(pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype='float64'))
+    return histogram
+
+
+def merge_all(histograms):
+    """Merges any number of histograms."""
+    histograms = list(histograms)
+    if not histograms:
+        raise ValueError("Nothing to merge")
+    merged = histograms[0]
+    for histogram in histograms[1:]:
+        merged = merged.merge(histogram)
+    return merged
+
+
+# ===============================================================
+# Section 3: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    import matplotlib
+
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    # 8_Histogram data, split into ten "partitions"
+    np.random.seed(42)
+    data = np.random.randn(1_000_000)
+    parts = [Histogram.fixed(-5, 5, 100).add(chunk) for chunk in np.array_split(data, 10)]
+    merged = merge_all(parts)
+    print(merged)
+    print("Matches np.histogram:", (merged.counts == np.histogram(data, merged.edges)[0]).all())
+    print("Rebinned to 20 bins:", merged.rebin(5))
+
+    # Adaptive partial histograms with different ranges merge onto one grid
+    left = Histogram.from_values(np.random.randn(100_000))
+    right = Histogram.from_values(np.random.randn(100_000) * 10 + 50)
+    both = left.merge(right)
+    print(both, "- bin width", both.width)
+
+    # Uber MILES straight from the CSV, cached and reloaded
+    uber_csv = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Pandas', 'UberDataset.csv')
+    miles = histogram_file(uber_csv, 'MILES', chunksize=200, range=(0, 50), bins=50)
+    cache_path = os.path.join(tempfile.gettempdir(), 'miles_hist.npz')
+    miles.save(cache_path)
+    miles = Histogram.load(cache_path)
+    print(f"MILES: {miles.total} in range, {miles.overflow} above 50, {miles.missing} missing; "
+          f"median ~ {miles.quantile(0.5):.1f}")
+
+    fig, axs = plt.subplots(1, 2, figsize=(12, 5))
+    merged.rebin(5).plot(ax=axs[0], color='blue', edgecolor='black')
+    axs[0].set_title("Merged Histogram (1M values)")
+    miles.plot(ax=axs[1], color='green', edgecolor='black')
+    axs[1].set_title("Trip Miles")
+    fig.savefig(os.path.join(tempfile.gettempdir(), 'binned_histograms.png'))
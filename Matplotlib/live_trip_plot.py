@@ -0,0 +1,385 @@
+"""
+===============================================================
+Matplotlib Tooling: Live Streaming Trip Plot with Bounded Buffers
+===============================================================
+
+This module covers:
+1. `RingBuffer`: a fixed-size NumPy ring buffer; writes are vectorized
+   slice assignments, never per-point list appends.
+2. `TripAggregator`: folds incoming trips (start time, MILES) into
+   per-minute buckets (trips, miles) kept in ring buffers, so memory stays
+   bounded however fast trips arrive.
+3. `LiveTripPlot`: trips per minute and rolling mean MILES per trip,
+   redrawn at a target FPS with blitting (Dashboard from
+   recycled_dashboard.py), fed from a generator or a queue.
+4. Back-pressure: each pass of the frame loop drains at most `max_batch`
+   trips; with policy='aggregate' the backlog is folded in on later passes,
+   with policy='drop' queued items beyond `max_backlog` are discarded and
+   counted.
+5. Counters for achieved FPS, missed frame slots, full redraws, dropped
+   points and trips rejected as late or too far ahead.
+
+The x axis shows minutes before the newest trip, so the axes stay static
+and every frame is a blit; only a y-limit change causes a full redraw.
+
+Usage:
+    from live_trip_plot import LiveTripPlot
+
+    live = LiveTripPlot(fps=30, window_minutes=120)
+    stats = live.run(trip_queue, duration=60)
+    print(stats)
+"""
+
+import queue
+import time
+
+import numpy as np
+
+from recycled_dashboard import Dashboard, Panel
+
+NS_PER_MINUTE = 60_000_000_000
+
+# ===============================================================
+# Section 1: Ring Buffer
+# ===============================================================
+
+
+class RingBuffer:
+    """Fixed-capacity NumPy ring buffer of scalars."""
+
+    def __init__(self, capacity, dtype='float64'):
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+        self.start = 0
+        self.size = 0
+        self.written = 0
+
+    def __len__(self):
+        return self.size
+
+    def extend(self, values):
+        """Appends values; the oldest are overwritten once full."""
+        values = np.asarray(values, dtype=self.data.dtype).ravel()
+        self.written += len(values)
+        if len(values) >= self.capacity:
+            self.data[:] = values[-self.capacity:]
+            self.start, self.size = 0, self.capacity
+            return
+        end = (self.start + self.size) % self.capacity
+        first = min(len(values), self.capacity - end)
+        self.data[end:end + first] = values[:first]
+        self.data[:len(values) - first] = values[first:]
+        overflow = max(self.size + len(values) - self.capacity, 0)
+        self.start = (self.start + overflow) % self.capacity
+        self.size = min(self.size + len(values), self.capacity)
+
+    def values(self):
+        """Contents, oldest first (a copy)."""
+        end = self.start + self.size
+        if end <= self.capacity:
+            return self.data[self.start:end].copy()
+        return np.concatenate([self.data[self.start:], self.data[:end - self.capacity]])
+
+    def last(self):
+        """Newest value."""
+        if self.size == 0:
+            raise IndexError("RingBuffer is empty")
+        return self.data[(self.start + self.size - 1) % self.capacity]
+
+    def add_to_last(self, amount):
+        """Adds to the newest value in place."""
+        self.data[(self.start + self.size - 1) % self.capacity] += amount
+
+
+# ===============================================================
+# Section 2: Per-Minute Aggregation
+# ===============================================================
+
+
+class TripAggregator:
+    """Trips and MILES per minute over the last `capacity` minutes."""
+
+    def __init__(self, capacity=24 * 60, max_ahead=7 * 24 * 60):
+        self.minutes = RingBuffer(capacity, 'int64')
+        self.trips = RingBuffer(capacity, 'int64')
+        self.miles = RingBuffer(capacity, 'float64')
+        self.max_ahead = max_ahead
+        self.late_trips = 0
+        self.early_trips = 0
+
+    def add(self, start_ns, miles):
+        """
+        Folds a batch of trips into minute buckets.
+
+        Trips are expected roughly in time order. Trips for the current
+        minute are added to it, gaps are filled with empty minutes, and
+        trips older than the current minute are counted in `late_trips`
+        and otherwise ignored. Trips more than `max_ahead` minutes after the
+        current minute (the batch median for the first batch) come from a
+        bad clock; they are counted in `early_trips` and ignored too, so one
+        of them cannot jump the plot ahead and turn every later trip into a
+        late one. At most `capacity` minutes are binned per batch; older
+        minutes would be overwritten at once.
+        """
+        start_ns = np.asarray(start_ns, dtype='int64').ravel()
+        miles = np.nan_to_num(np.asarray(miles, dtype='float64').ravel())
+        if len(start_ns) == 0:
+            return
+        minute = start_ns // NS_PER_MINUTE
+        if len(self.minutes):
+            current = self.minutes.last()
+            early = minute > current + self.max_ahead
+        else:
+            early = minute > int(np.median(minute)) + self.max_ahead
+            current = minute[~early].min()
+
+        late = minute < current
+        self.late_trips += int(late.sum())
+        self.early_trips += int(early.sum())
+        minute, miles = minute[~late & ~early], miles[~late & ~early]
+        if len(minute) == 0:
+            return
+
+        # Long gaps only need the last `capacity` minutes
+        offset = minute - current
+        low = max(int(offset.max()) - self.minutes.capacity + 1, 0)
+        binned = offset >= low
+        offset, miles = offset[binned] - low, miles[binned]
+        span = int(offset.max()) + 1
+        trips_per = np.bincount(offset, minlength=span)
+        miles_per = np.bincount(offset, weights=miles, minlength=span)
+        if len(self.minutes) and low == 0:
+            self.trips.add_to_last(trips_per[0])
+            self.miles.add_to_last(miles_per[0])
+            trips_per, miles_per = trips_per[1:], miles_per[1:]
+            first_new = current + 1
+        else:
+            first_new = current + low
+        self.minutes.extend(np.arange(first_new, first_new + len(trips_per)))
+        self.trips.extend(trips_per)
+        self.miles.extend(miles_per)
+
+    def series(self, window_minutes, rolling_minutes):
+        """(minutes before newest, trips per minute, rolling mean MILES per trip)."""
+        if len(self.minutes) == 0:
+            empty = np.empty(0)
+            return empty, empty, empty
+        minutes = self.minutes.values()
+        trips = self.trips.values().astype('float64')
+        miles = self.miles.values()
+
+        # Rolling sums via cumulative sums, no Python loop
+        cumulative_trips = np.r_[0.0, np.cumsum(trips)]
+        cumulative_miles = np.r_[0.0, np.cumsum(miles)]
+        lagged = np.maximum(np.arange(1, len(trips) + 1) - rolling_minutes, 0)
+        rolling_trips = cumulative_trips[1:] - cumulative_trips[lagged]
+        rolling_miles = cumulative_miles[1:] - cumulative_miles[lagged]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_miles = np.where(rolling_trips > 0, rolling_miles / rolling_trips, np.nan)
+
+        ago = (minutes - minutes[-1]).astype('float64')
+        visible = ago > -window_minutes
+        return ago[visible], trips[visible], mean_miles[visible]
+
+
+# ===============================================================
+# Section 3: The Live Plot
+# ===============================================================
+
+"""
+run() is a simple frame loop:
+
+    repeat:
+        drain up to `max_batch` trips from the source into the aggregator
+        when the next frame is due: update the two line artists and blit,
+        otherwise sleep until it is
+    if a frame took longer than the interval, the frame slots that passed
+    in the meantime are counted in `frames_missed` instead of being drawn
+    late, so the chart never falls behind real time. No data is lost: the
+    next frame shows everything drained so far.
+
+Sources:
+    queue.Queue   items are (start_ns, miles) pairs of scalars or arrays
+    iterator      the same items; it is only pulled as fast as the loop
+                  consumes, so the 'drop' policy never applies to it
+"""
+
+
+class LiveTripPlot:
+    """Trips per minute and rolling MILES, redrawn at a target FPS."""
+
+    def __init__(self, fps=30, window_minutes=120, rolling_minutes=15, max_batch=50_000,
+                 policy='aggregate', max_backlog=200_000, max_ahead=7 * 24 * 60, figsize=(10, 6)):
+        if policy not in ('aggregate', 'drop'):
+            raise ValueError("policy must be 'aggregate' or 'drop'")
+        self.fps = fps
+        self.window_minutes = window_minutes
+        self.rolling_minutes = rolling_minutes
+        self.max_batch = max_batch
+        self.policy = policy
+        self.max_backlog = max_backlog
+        self.aggregator = TripAggregator(capacity=max(window_minutes + rolling_minutes, 1),
+                                         max_ahead=max_ahead)
+        self.dashboard = Dashboard([
+            Panel('line', 'Trips per Minute', '', 'Trips', xlim=(-window_minutes, 0), ylim=(0, 10),
+                  color='C0'),
+            Panel('line', f'Rolling {rolling_minutes}-Minute Mean Miles per Trip', 'Minutes ago', 'Miles',
+                  xlim=(-window_minutes, 0), ylim=(0, 20), color='C1'),
+        ], nrows=2, ncols=1, figsize=figsize, autoscale=True)
+        self.frames_drawn = 0
+        self.frames_missed = 0
+        self.points_in = 0
+        self.points_dropped = 0
+
+    # ---------------------------------------------------------------
+    # Input
+    # ---------------------------------------------------------------
+
+    def _drain(self, source):
+        """Pulls up to `max_batch` trips from a queue or iterator; False when exhausted."""
+        starts, miles, taken = [], [], 0
+        exhausted = False
+        if isinstance(source, queue.Queue):
+            if self.policy == 'drop':
+                self._drop_backlog(source)
+            while taken < self.max_batch:
+                try:
+                    item = source.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:  # sentinel: producer is done
+                    exhausted = True
+                    break
+                taken += self._collect(item, starts, miles)
+        else:
+            while taken < self.max_batch:
+                try:
+                    item = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                taken += self._collect(item, starts, miles)
+        if starts:
+            self.aggregator.add(np.concatenate(starts), np.concatenate(miles))
+            self.points_in += taken
+        return not exhausted
+
+    @staticmethod
+    def _collect(item, starts, miles):
+        """Stores one (start_ns, miles) item; returns the number of trips in it."""
+        start_ns, trip_miles = item
+        start_ns = np.atleast_1d(np.asarray(start_ns, dtype='int64'))
+        starts.append(start_ns)
+        miles.append(np.atleast_1d(np.asarray(trip_miles, dtype='float64')))
+        return len(start_ns)
+
+    def _drop_backlog(self, source):
+        """Discards queued items beyond `max_backlog` (oldest first)."""
+        while source.qsize() > self.max_backlog:
+            try:
+                item = source.get_nowait()
+            except queue.Empty:
+                return
+            if item is None:
+                source.put(None)
+                return
+            self.points_dropped += len(np.atleast_1d(item[0]))
+
+    # ---------------------------------------------------------------
+    # Drawing
+    # ---------------------------------------------------------------
+
+    def draw(self):
+        """Pushes the current aggregates to the artists (blit when possible)."""
+        ago, trips, mean_miles = self.aggregator.series(self.window_minutes, self.rolling_minutes)
+        finite = np.isfinite(mean_miles)
+        self.dashboard.update([(ago, trips), (ago[finite], mean_miles[finite])])
+        self.frames_drawn += 1
+
+    def run(self, source, duration=None, frames=None):
+        """Consumes `source` and redraws until it ends, `duration` seconds or `frames` frames."""
+        if not isinstance(source, queue.Queue):
+            source = iter(source)
+        interval = 1.0 / self.fps
+        started = time.perf_counter()
+        next_frame = started
+        running = True
+        while running:
+            running = self._drain(source)
+            now = time.perf_counter()
+            if now >= next_frame:
+                self.draw()
+                late = time.perf_counter() - next_frame
+                missed = int(late // interval)
+                self.frames_missed += missed
+                next_frame += (missed + 1) * interval
+            else:
+                time.sleep(min(next_frame - now, interval))
+            if duration is not None and now - started >= duration:
+                break
+            if frames is not None and self.frames_drawn >= frames:
+                break
+        self.draw()
+        self.elapsed = time.perf_counter() - started
+        return self.stats()
+
+    def stats(self):
+        """Frame and point counters."""
+        elapsed = getattr(self, 'elapsed', 0.0)
+        return {
+            'target_fps': self.fps,
+            'achieved_fps': self.frames_drawn / elapsed if elapsed else 0.0,
+            'frames_drawn': self.frames_drawn,
+            'frames_missed': self.frames_missed,
+            'full_redraws': self.dashboard.full_draws,
+            'points_in': self.points_in,
+            'points_dropped': self.points_dropped,
+            'late_trips': self.aggregator.late_trips,
+            'early_trips': self.aggregator.early_trips,
+        }
+
+    def close(self):
+        """Closes the figure."""
+        self.dashboard.close()
+
+
+# ===============================================================
+# Section 4: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import threading
+
+    import matplotlib
+
+    matplotlib.use('Agg')
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Pandas'))
+    from synthetic_trips import TripModel
+
+    trips = TripModel.fit().sample(500_000, seed=0, start='2016-01-01', end='2016-01-31', as_text=False)
+    trips = trips.sort_values('START_DATE')
+    start_ns = trips['START_DATE'].to_numpy(dtype='datetime64[ns]').astype('int64')
+    miles = trips['MILES'].to_numpy()
+
+    def producer(target, batch=2_000, pause=0.01):
+        """Replays the month at ~200,000 trips per second, in small batches."""
+        for lo in range(0, len(start_ns), batch):
+            target.put((start_ns[lo:lo + batch], miles[lo:lo + batch]))
+            time.sleep(pause)
+        target.put(None)
+
+    for policy in ('aggregate', 'drop'):
+        trip_queue = queue.Queue()
+        thread = threading.Thread(target=producer, args=(trip_queue,))
+        thread.start()
+        # The small max_batch of the 'drop' run lets the queue back up on purpose
+        live = LiveTripPlot(fps=30, policy=policy, max_batch=20_000 if policy == 'aggregate' else 1_000,
+                            max_backlog=20)
+        stats = live.run(trip_queue, duration=5)
+        thread.join()
+        live.close()
+        print(policy, {key: round(value, 1) if isinstance(value, float) else value
+                       for key, value in stats.items()})
@@ -0,0 +1,276 @@
+"""
+===============================================================
+Matplotlib Tooling: Level-of-Detail Downsampling for Line Plots
+===============================================================
+
+This module covers:
+1. Min/max-per-pixel decimation (M4): for every pixel column keep the
+   first, last, lowest and highest point, so the rasterized line is the
+   same as with all points and no peak is ever lost.
+2. LTTB (Largest-Triangle-Three-Buckets): a fixed number of points chosen
+   to preserve the visual shape, for smaller output such as SVG.
+3. `LODLine`: a Line2D that holds the full series but only ever draws a
+   decimated copy sized to the axes' pixel width, and re-decimates the
+   visible range whenever the x limits change (zoom/pan) or the figure is
+   resized.
+4. `plot_series`: the same for a pandas Series, as a drop-in for
+   `series.plot()` on long time series.
+
+Both methods expect x sorted ascending (time series). Non-finite points
+are dropped before decimation.
+
+Usage:
+    from lod_lines import lod_plot
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    line = lod_plot(ax, x, y, method='minmax', color='C0')
+    ax.set_xlim(2, 3)   # re-decimates the visible range automatically
+"""
+
+import numpy as np
+
+# ===============================================================
+# Section 1: Decimation Kernels
+# ===============================================================
+
+
+def _finite(x, y):
+    """Float copies of x and y without non-finite points."""
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    keep = np.isfinite(x) & np.isfinite(y)
+    return (x, y) if keep.all() else (x[keep], y[keep])
+
+
+def _first_per_bin(bins, positions, n_bins):
+    """Index in `positions` of the first entry of every bin (-1 when empty)."""
+    first = np.full(n_bins, -1, dtype='int64')
+    # Assigning in reverse order leaves the first occurrence in place
+    first[bins[positions][::-1]] = positions[::-1]
+    return first
+
+
+def minmax_indices(x, y, n_bins, x_range=None):
+    """
+    Indices kept by min/max-per-pixel (M4) decimation.
+
+    x is split into `n_bins` equal-width bins over `x_range` (default: the
+    data range). Per non-empty bin the first, last, min and max points are
+    kept, in x order, so at most 4 * n_bins indices are returned.
+    """
+    n = len(x)
+    if n <= 4 * n_bins:
+        return np.arange(n)
+    lo, hi = x_range if x_range is not None else (x[0], x[-1])
+    width = (hi - lo) / n_bins if hi > lo else 1.0
+    bins = np.clip(((x - lo) / width).astype('int64'), 0, n_bins - 1)
+
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    counts = ends - starts + 1
+    mins = np.repeat(np.minimum.reduceat(y, starts), counts)
+    maxs = np.repeat(np.maximum.reduceat(y, starts), counts)
+
+    all_bins = len(starts)
+    segment = np.repeat(np.arange(all_bins), counts)
+    argmin = _first_per_bin(segment, np.flatnonzero(y == mins), all_bins)
+    argmax = _first_per_bin(segment, np.flatnonzero(y == maxs), all_bins)
+    return np.unique(np.concatenate([starts, ends, argmin, argmax]))
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points in between are
+    split into n_out - 2 buckets; from each bucket the point forming the
+    largest triangle with the previously kept point and the mean of the
+    next bucket is kept.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype('int64')
+    # Mean point of every bucket, used as the third triangle corner
+    sums_x = np.add.reduceat(x[:n - 1], edges[:-1])
+    sums_y = np.add.reduceat(y[:n - 1], edges[:-1])
+    sizes = np.diff(edges)
+    mean_x = np.r_[sums_x / sizes, x[-1]]
+    mean_y = np.r_[sums_y / sizes, y[-1]]
+
+    kept = np.empty(n_out, dtype='int64')
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        cx, cy = mean_x[bucket + 1], mean_y[bucket + 1]
+        area = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        previous = lo + int(np.argmax(area))
+        kept[bucket + 1] = previous
+    return kept
+
+
+METHODS = {
+    'minmax': lambda x, y, pixels, x_range: minmax_indices(x, y, pixels, x_range),
+    'lttb': lambda x, y, pixels, x_range: lttb_indices(x, y, 2 * pixels),
+}
+
+
+def decimate(x, y, pixels, method='minmax', x_range=None):
+    """The (x, y) points to draw for a line `pixels` wide."""
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {sorted(METHODS)}")
+    x, y = _finite(x, y)
+    indices = METHODS[method](x, y, max(int(pixels), 1), x_range)
+    return x[indices], y[indices]
+
+
+# ===============================================================
+# Section 2: A Line That Re-Decimates Itself
+# ===============================================================
+
+"""
+LODLine keeps the full, sorted series in memory and gives matplotlib only
+the decimated copy. On every x-limit change it:
+
+1. finds the visible slice with np.searchsorted (plus one point on each
+   side, so the line still runs off the edges of the axes),
+2. decimates that slice to the axes' current pixel width,
+3. swaps the Line2D data.
+
+Zooming in therefore shows more detail, until the visible slice has fewer
+points than pixels and is drawn raw.
+"""
+
+
+class LODLine:
+    """A decimated Line2D bound to the full series and the axes' pixel width."""
+
+    def __init__(self, ax, x, y, method='minmax', oversample=1.0, **line_kwargs):
+        self.ax = ax
+        self.x, self.y = _finite(x, y)
+        if np.any(np.diff(self.x) < 0):
+            order = np.argsort(self.x, kind='stable')
+            self.x, self.y = self.x[order], self.y[order]
+        self.method = method
+        self.oversample = oversample
+        self.line, = ax.plot([], [], **line_kwargs)
+        # Matplotlib holds bound-method callbacks weakly; the line keeps its LODLine alive
+        self.line._lod = self
+        if len(self.x):
+            ax.update_datalim(np.column_stack([self.x[[0, -1]], [self.y.min(), self.y.max()]]))
+            ax.autoscale_view()
+        self._callbacks = [
+            ax.callbacks.connect('xlim_changed', self._on_change),
+            ax.figure.canvas.mpl_connect('resize_event', self._on_change),
+        ]
+        self.refresh()
+
+    @property
+    def pixels(self):
+        """Width of the axes in device pixels (times `oversample`)."""
+        return max(int(self.ax.get_window_extent().width * self.oversample), 1)
+
+    def visible_slice(self):
+        """Slice of the full series inside the x limits, plus one point per side."""
+        lo, hi = sorted(self.ax.get_xlim())
+        start = max(np.searchsorted(self.x, lo, side='left') - 1, 0)
+        stop = min(np.searchsorted(self.x, hi, side='right') + 1, len(self.x))
+        return slice(start, stop)
+
+    def refresh(self):
+        """Re-decimates the visible range and updates the drawn line."""
+        window = self.visible_slice()
+        x_range = tuple(sorted(self.ax.get_xlim()))
+        x, y = decimate(self.x[window], self.y[window], self.pixels, self.method, x_range)
+        self.line.set_data(x, y)
+        return len(x)
+
+    def _on_change(self, _event):
+        self.refresh()
+
+    def remove(self):
+        """Removes the line and disconnects its callbacks."""
+        self.ax.callbacks.disconnect(self._callbacks[0])
+        self.ax.figure.canvas.mpl_disconnect(self._callbacks[1])
+        self.line.remove()
+        del self.line._lod
+
+
+def lod_plot(ax, x, y, method='minmax', **line_kwargs):
+    """`ax.plot(x, y)` for long series: returns an LODLine."""
+    return LODLine(ax, x, y, method=method, **line_kwargs)
+
+
+def plot_series(series, ax=None, method='minmax', title=None, xlabel=None, ylabel=None,
+                figsize=None, grid=False, **line_kwargs):
+    """
+    LOD version of `series.plot()` for long numeric or time series.
+
+    A DatetimeIndex is converted to matplotlib date numbers and the x axis
+    is formatted as dates. Returns the LODLine.
+    """
+    import matplotlib.dates as mdates
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    if ax is None:
+        _, ax = plt.subplots(figsize=figsize)
+    index = series.index
+    is_dates = isinstance(index, pd.DatetimeIndex)
+    x = mdates.date2num(index.to_numpy()) if is_dates else np.asarray(index, dtype='float64')
+    line = LODLine(ax, x, series.to_numpy(dtype='float64', na_value=np.nan), method=method,
+                   label=series.name, **line_kwargs)
+    if is_dates:
+        ax.xaxis_date()
+    ax.set_title(title or '')
+    ax.set_xlabel(xlabel if xlabel is not None else (index.name or ''))
+    if ylabel is not None:
+        ax.set_ylabel(ylabel)
+    ax.grid(grid)
+    return line
+
+
+# ===============================================================
+# Section 3: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    import io
+    import time
+
+    import matplotlib
+
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    rng = np.random.default_rng(42)
+    n = 2_000_000
+    x = np.linspace(0, 10, n)
+    y = np.sin(x) + rng.normal(0, 0.1, n)
+    y[1_234_567] = 3.0  # a single spike that must survive decimation
+
+    def draw(plot, fmt):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        start = time.perf_counter()
+        result = plot(ax)
+        fig.savefig(io.BytesIO(), format=fmt)
+        elapsed = time.perf_counter() - start
+        return result, elapsed
+
+    for fmt in ('png', 'svg'):
+        _, raw_seconds = draw(lambda ax: ax.plot(x, y), fmt)
+        lod, lod_seconds = draw(lambda ax: lod_plot(ax, x, y), fmt)
+        print(f"{fmt}: all {n:,} points {raw_seconds:.2f}s, LOD {lod_seconds:.2f}s")
+        plt.close('all')
+
+    print(f"LOD line: {len(lod.line.get_xdata()):,} points")
+    print("Spike kept:", lod.line.get_ydata().max() == 3.0)
+
+    lod.ax.set_xlim(6.1, 6.2)  # zoom: the visible range is re-decimated
+    x_zoomed = lod.line.get_xdata()
+    print(f"After zoom: {len(x_zoomed):,} points in [{x_zoomed.min():.3f}, {x_zoomed.max():.3f}]")
+
+    lttb_x, lttb_y = decimate(x, y, 500, method='lttb')
+    print(f"LTTB to 1,000 points keeps the spike: {lttb_y.max() == 3.0}")
@@ -0,0 +1,270 @@
+"""
+===============================================================
+Matplotlib Tooling: Notebook Charts as Reusable Definitions
+===============================================================
+
+This module covers:
+1. The charts of Matplotlib/1_Introduction.ipynb through 9_Pie_Chart.ipynb
+   and Pandas/3_Data_Plotting.ipynb as plain module-level functions.
+2. A registry (`CHARTS`) from chart name to function, so tools such as
+   batch_renderer.py can render them by name.
+
+Every chart function takes keyword arguments only, draws with pyplot the
+same way the notebook cell does, and leaves the figure current instead of
+calling plt.show(). Functions live at module level so they can be sent to
+worker processes.
+
+Usage:
+    from notebook_charts import CHARTS
+
+    CHARTS['sine_cosine']()
+    plt.savefig('sine_cosine.png')
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# ===============================================================
+# Section 1: Matplotlib Notebooks
+# ===============================================================
+
+
+def sine_wave(points=100):
+    """1_Introduction: simple sine wave."""
+    x = np.linspace(0, 10, points)
+    plt.figure(figsize=(10, 6))
+    plt.plot(x, np.sin(x))
+    plt.title('Simple Sine Wave')
+    plt.xlabel('X-axis')
+    plt.ylabel('Y-axis')
+
+
+def sine_cosine(points=100):
+    """1_Introduction: styled sine and cosine with grid and legend."""
+    x = np.linspace(0, 10, points)
+    plt.figure(figsize=(12, 6))
+    plt.plot(x, np.sin(x), 'r--', label='sin(x)', linewidth=2)
+    plt.plot(x, np.cos(x), 'b-', label='cos(x)', linewidth=2)
+    plt.title('Sine and Cosine Waves', fontsize=14)
+    plt.xlabel('X-axis', fontsize=12)
+    plt.ylabel('Y-axis', fontsize=12)
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.legend(fontsize=10)
+    plt.xlim(0, 10)
+    plt.ylim(-1.5, 1.5)
+
+
+def marker_types(points=15):
+    """2_Markers: one line per marker style."""
+    x = np.linspace(0, 10, points)
+    y = np.sin(x)
+    markers = ['.', 'o', 'v', '^', '<', '>', 's', 'p', '*', 'h', 'H', '+', 'x', 'D', 'd']
+    plt.figure(figsize=(12, 8))
+    for i, marker in enumerate(markers):
+        plt.plot(x + i, y, marker=marker, label=f'Marker: {marker}', linestyle='None', markersize=10)
+    plt.title('Demonstration of All Marker Types')
+    plt.xlabel('X-axis')
+    plt.ylabel('Y-axis')
+    plt.legend()
+    plt.grid(True)
+
+
+def annotation(points=100):
+    """3_Labels_and_Annotations: annotated peak of a sine wave."""
+    x = np.linspace(0, 10, points)
+    plt.figure()
+    plt.plot(x, np.sin(x), label="Sine Wave", color="orange")
+    plt.title("Annotation Example")
+    plt.xlabel("X-axis")
+    plt.ylabel("Y-axis")
+    max_x = np.pi / 2
+    plt.scatter(max_x, np.sin(max_x), color="red")
+    plt.annotate("Max Point", xy=(max_x, np.sin(max_x)), xytext=(2, 0.8),
+                 arrowprops=dict(facecolor='black', arrowstyle="->"), fontsize=10)
+    plt.legend()
+
+
+def grid_subplots(points=100):
+    """4_Grids: 2x2 subplots with different grid styles."""
+    x = np.linspace(0, 10, points)
+    fig, axs = plt.subplots(2, 2, figsize=(10, 8))
+    axs[0, 0].plot(x, np.sin(x))
+    axs[0, 0].set_title("Default Grid")
+    axs[0, 0].grid(True)
+    axs[0, 1].plot(x, np.cos(x))
+    axs[0, 1].set_title("Dashed Grid")
+    axs[0, 1].grid(visible=True, linestyle='--', color='green', alpha=0.8)
+    axs[1, 0].plot(x, np.tan(x))
+    axs[1, 0].set_title("Major and Minor Grids")
+    axs[1, 0].minorticks_on()
+    axs[1, 0].grid(visible=True, which='major', linestyle='-', color='blue')
+    axs[1, 0].grid(visible=True, which='minor', linestyle=':', color='gray')
+    axs[1, 1].plot(x, np.exp(-x))
+    axs[1, 1].set_title("No Grid")
+    fig.tight_layout()
+
+
+def function_subplots(points=100):
+    """5_Subplots: sine, cosine, quadratic and square root with a main title."""
+    x = np.linspace(0, 10, points)
+    fig, axs = plt.subplots(2, 2, figsize=(10, 8))
+    panels = [(np.sin(x), 'Sine', 'Sine Wave', None), (np.cos(x), 'Cosine', 'Cosine Wave', 'red'),
+              (x ** 2, 'Quadratic', 'Quadratic Function', 'green'),
+              (np.sqrt(x), 'Square Root', 'Square Root Function', 'purple')]
+    for ax, (y, label, title, color) in zip(axs.flat, panels):
+        ax.plot(x, y, label=label, color=color)
+        ax.set_title(title)
+        ax.legend()
+    fig.suptitle("Matplotlib Subplot Examples", fontsize=16)
+    fig.tight_layout()
+
+
+def scatter(points=50, seed=42):
+    """6_Scatter_Plot: customized scatter with a color bar."""
+    rng = np.random.RandomState(seed)
+    x, y = rng.rand(points), rng.rand(points)
+    sizes, colors = rng.rand(points) * 100, rng.rand(points)
+    plt.figure()
+    plt.scatter(x, y, c=colors, s=sizes, alpha=0.7, cmap='viridis', marker='o')
+    plt.title("Customized Scatter Plot")
+    plt.xlabel("X-axis")
+    plt.ylabel("Y-axis")
+    plt.colorbar(label="Color Intensity")
+
+
+def grouped_bars():
+    """7_Bar_Plot: grouped bar chart."""
+    categories = ['A', 'B', 'C', 'D', 'E']
+    group1, group2 = [23, 45, 56, 78, 33], [34, 44, 54, 65, 22]
+    x = np.arange(len(categories))
+    width = 0.4
+    fig, ax = plt.subplots()
+    ax.bar(x - width / 2, group1, width, label='Group 1', color='skyblue')
+    ax.bar(x + width / 2, group2, width, label='Group 2', color='orange')
+    ax.set_xticks(x)
+    ax.set_xticklabels(categories)
+    ax.set_title("Grouped Bar Chart")
+    ax.set_xlabel("Categories")
+    ax.set_ylabel("Values")
+    ax.legend()
+
+
+def histograms(points=1000, seed=42):
+    """8_Histogram: two overlapping histograms."""
+    rng = np.random.RandomState(seed)
+    data, data2 = rng.randn(points), rng.randn(points) + 1
+    plt.figure()
+    plt.hist(data, bins=20, alpha=0.5, label='Dataset 1', color='blue', edgecolor='black')
+    plt.hist(data2, bins=20, alpha=0.5, label='Dataset 2', color='red', edgecolor='black')
+    plt.title("Multiple Histograms")
+    plt.xlabel("Value")
+    plt.ylabel("Frequency")
+    plt.legend()
+
+
+def donut():
+    """9_Pie_Chart: donut chart."""
+    labels = ['Category A', 'Category B', 'Category C', 'Category D']
+    plt.figure()
+    plt.pie([15, 30, 45, 10], labels=labels, colors=['gold', 'lightblue', 'lightgreen', 'pink'],
+            autopct='%1.1f%%', startangle=90, wedgeprops={'width': 0.3})
+    plt.title('Donut Chart')
+
+
+# ===============================================================
+# Section 2: Pandas Plotting Notebook
+# ===============================================================
+
+
+def plotting_sample(periods=100, seed=42):
+    """The sample DataFrame of Pandas/3_Data_Plotting.ipynb."""
+    rng = np.random.RandomState(seed)
+    data = pd.DataFrame({
+        'Date': pd.date_range(start='2023-01-01', periods=periods),
+        'Category': rng.choice(['A', 'B', 'C'], size=periods),
+        'Value': rng.randint(1, 100, size=periods),
+        'Value2': rng.randint(50, 150, size=periods),
+    })
+    return data.set_index('Date')
+
+
+def pandas_line(periods=100):
+    """3_Data_Plotting: values over time."""
+    plotting_sample(periods)['Value'].plot(title='Line Plot: Values Over Time', xlabel='Date',
+                                           ylabel='Value', figsize=(10, 6), grid=True)
+
+
+def pandas_category_bars(periods=100):
+    """3_Data_Plotting: category counts."""
+    plotting_sample(periods)['Category'].value_counts().plot(
+        kind='bar', title='Bar Plot: Category Counts', xlabel='Category', ylabel='Frequency',
+        color='skyblue', figsize=(8, 6))
+
+
+def pandas_scatter(periods=100):
+    """3_Data_Plotting: Value against Value2."""
+    plotting_sample(periods).plot.scatter(x='Value', y='Value2', title='Scatter Plot: Value vs Value2',
+                                          color='purple', alpha=0.7, figsize=(8, 6))
+
+
+def pandas_hist(periods=100):
+    """3_Data_Plotting: distribution of Value."""
+    plotting_sample(periods)['Value'].plot.hist(bins=20, title='Histogram: Distribution of Values',
+                                                color='orange', alpha=0.75, figsize=(8, 6))
+
+
+def pandas_box(periods=100):
+    """3_Data_Plotting: Value distribution as a box plot."""
+    plotting_sample(periods)[['Value']].plot.box(
+        title='Box Plot: Value Distribution', patch_artist=True,
+        color=dict(boxes='cyan', whiskers='blue', medians='red', caps='black'), figsize=(8, 6))
+
+
+def pandas_area(periods=100):
+    """3_Data_Plotting: cumulative value as an area plot."""
+    plotting_sample(periods)['Value'].cumsum().plot.area(title='Area Plot: Cumulative Value',
+                                                         color='lightblue', alpha=0.6, figsize=(10, 6))
+
+
+def pandas_pie(periods=100):
+    """3_Data_Plotting: category share."""
+    plotting_sample(periods)['Category'].value_counts().plot.pie(
+        autopct='%1.1f%%', title='Pie Chart: Category Distribution', startangle=90,
+        colors=['gold', 'lightcoral', 'lightblue'], figsize=(6, 6))
+
+
+def pandas_heatmap(periods=100):
+    """3_Data_Plotting: mean Value by month and Category (imshow instead of seaborn)."""
+    data = plotting_sample(periods)
+    pivot = data.pivot_table(index=data.index.month, columns='Category', values='Value', aggfunc='mean')
+    fig, ax = plt.subplots()
+    image = ax.imshow(pivot.to_numpy(), cmap='coolwarm', aspect='auto')
+    for (row, column), value in np.ndenumerate(pivot.to_numpy()):
+        ax.text(column, row, f"{value:.1f}", ha='center', va='center')
+    ax.set_xticks(range(len(pivot.columns)), pivot.columns)
+    ax.set_yticks(range(len(pivot.index)), pivot.index)
+    ax.set_title("Heat Map: Average Value by Month and Category")
+    fig.colorbar(image)
+
+
+CHARTS = {
+    'sine_wave': sine_wave,
+    'sine_cosine': sine_cosine,
+    'marker_types': marker_types,
+    'annotation': annotation,
+    'grid_subplots': grid_subplots,
+    'function_subplots': function_subplots,
+    'scatter': scatter,
+    'grouped_bars': grouped_bars,
+    'histograms': histograms,
+    'donut': donut,
+    'pandas_line': pandas_line,
+    'pandas_category_bars': pandas_category_bars,
+    'pandas_scatter': pandas_scatter,
+    'pandas_hist': pandas_hist,
+    'pandas_box': pandas_box,
+    'pandas_area': pandas_area,
+    'pandas_pie': pandas_pie,
+    'pandas_heatmap': pandas_heatmap,
+}
@@ -0,0 +1,484 @@
+"""
+===============================================================
+Matplotlib Tooling: Content-Addressed Chart Render Cache
+===============================================================
+
+This module covers:
+1. Keys made from a hash of the input data (NumPy arrays, pandas objects,
+   lists and scalars) plus every plot parameter (kind, colors, bins,
+   figsize, title, ...), the output format/DPI and the matplotlib version.
+2. A disk cache of rendered images: identical inputs return the stored
+   file without importing pyplot or drawing anything.
+3. LRU eviction bounded by total size and/or number of images.
+4. Wrappers for both plotting styles used in the notebooks:
+   - `cached_plot()` for DataFrame/Series `.plot` calls (3_Data_Plotting),
+   - `RenderCache.chart` for functions that draw with pyplot (Matplotlib
+     notebooks, notebook_charts.py). The function's source is part of the
+     key, so editing a chart invalidates its images.
+
+Usage:
+    from render_cache import RenderCache, cached_plot
+
+    cache = RenderCache()
+    path = cached_plot(cache, data['Category'].value_counts(), kind='bar',
+                       title='Bar Plot: Category Counts', color='skyblue', figsize=(8, 6))
+
+    @cache.chart
+    def pie(sizes, labels, title):
+        plt.pie(sizes, labels=labels, autopct='%1.1f%%')
+        plt.title(title)
+
+    path = pie([15, 30, 45, 10], ['A', 'B', 'C', 'D'], title='Basic Pie Chart')
+"""
+
+import functools
+import hashlib
+import inspect
+import io
+import json
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+# ===============================================================
+# Section 1: Hashing Inputs
+# ===============================================================
+
+"""
+`fingerprint()` feeds a canonical byte representation of any argument into
+one blake2b digest:
+
+    ndarray            dtype, shape and the raw bytes (object arrays by repr)
+    Series/DataFrame   index, column names, dtypes and every value
+    dict               sorted items, each hashed recursively
+    list/tuple         length and items, each hashed recursively
+    Colormap           name, size and the RGBA lookup table
+    Normalize          class, vmin, vmax, clip and its public settings
+    functions          module, qualified name, source, constants, defaults
+                       and closure values (callables in a closure by name)
+    other callables    their pickle (unpicklable ones are rejected)
+    anything else      type name + repr (pickle when the repr holds a
+                       memory address, which changes from run to run)
+
+`RenderCache.key` also hashes the rcParams, so `plt.style.use(...)` or an
+rc_context gives new keys instead of stale images.
+
+Hashing is linear in the data size and much cheaper than drawing.
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(REPO_ROOT, 'Datasets', '.cache', 'renders')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# rcParams that do not change how an image looks
+RC_IGNORED = {'backend', 'backend_fallback', 'interactive', 'savefig.directory', 'figure.max_open_warning',
+              'webagg.address', 'webagg.port', 'webagg.port_retries', 'webagg.open_in_browser'}
+
+
+def _update(digest, value):
+    """Adds one value to the digest."""
+    import pandas as pd
+
+    if isinstance(value, np.ndarray):
+        digest.update(f"ndarray|{value.dtype.str}|{value.shape}|".encode())
+        if value.dtype.kind == 'O':
+            digest.update(repr(value.tolist()).encode())
+        else:
+            digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, pd.Index):
+        digest.update(f"Index|{value.dtype}|{list(value.names)!r}|".encode())
+        _update(digest, pd.util.hash_pandas_object(value).to_numpy())
+    elif isinstance(value, (pd.Series, pd.DataFrame)):
+        frame = value.to_frame() if isinstance(value, pd.Series) else value
+        digest.update(f"{type(value).__name__}|{list(frame.columns)!r}|{list(map(str, frame.dtypes))}|".encode())
+        _update(digest, value.index)
+        _update(digest, pd.util.hash_pandas_object(frame, index=False).to_numpy())
+    elif isinstance(value, dict):
+        digest.update(f"dict|{len(value)}|".encode())
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}|{len(value)}|".encode())
+        for item in value:
+            _update(digest, item)
+    elif callable(value):
+        _update_callable(digest, value)
+    else:
+        text = repr(value)
+        if ' at 0x' in text:
+            _update_pickle(digest, value)
+        else:
+            digest.update(f"{type(value).__name__}|{text}|".encode())
+
+
+def _update_pickle(digest, value):
+    """Adds an object by its pickle; objects that cannot be pickled cannot be keyed."""
+    try:
+        data = pickle.dumps(value, protocol=4)
+    except Exception as error:
+        raise TypeError(f"Cannot build a cache key from {type(value).__name__} objects: {error}") from error
+    digest.update(f"pickle|{type(value).__qualname__}|".encode())
+    digest.update(data)
+
+
+def _update_callable(digest, function, nested=False):
+    """Adds a callable: its name, and its code and captured values unless `nested`."""
+    # Instances (colormaps, norms) have no __qualname__; their repr holds an address
+    name = getattr(function, '__qualname__', None) or f"{type(function).__qualname__} instance"
+    digest.update(f"callable|{getattr(function, '__module__', '')}|{name}|".encode())
+    if nested:
+        return
+    if isinstance(function, functools.partial):
+        _update_callable(digest, function.func)
+        _update(digest, list(function.args))
+        _update(digest, function.keywords)
+        return
+    code = getattr(function, '__code__', None)
+    if code is None:
+        _update_opaque(digest, function)
+        return
+    digest.update(_source_of(function).encode())
+    digest.update(code.co_code)
+    digest.update(repr(code.co_consts).encode())
+    _update(digest, list(function.__defaults__ or ()))
+    for cell in function.__closure__ or ():
+        try:
+            contents = cell.cell_contents
+        except ValueError:  # empty cell
+            continue
+        if callable(contents):
+            _update_callable(digest, contents, nested=True)
+        else:
+            _update(digest, contents)
+
+
+def _update_opaque(digest, function):
+    """Adds a callable without Python code: colormaps, norms, builtins, callable objects."""
+    from matplotlib.colors import Colormap, Normalize
+
+    if isinstance(function, Colormap):
+        digest.update(f"Colormap|{function.name}|{function.N}|".encode())
+        _update(digest, function(np.linspace(0.0, 1.0, function.N)))
+        _update(digest, [function.get_under(), function.get_over(), function.get_bad()])
+    elif isinstance(function, Normalize):
+        settings = {name: value for name, value in vars(function).items()
+                    if not name.startswith('_') and name != 'callbacks'}
+        settings.update(vmin=function.vmin, vmax=function.vmax, clip=function.clip,
+                        vcenter=getattr(function, 'vcenter', None))
+        digest.update(f"Normalize|{type(function).__module__}.{type(function).__qualname__}|".encode())
+        _update(digest, settings)
+    elif inspect.isbuiltin(function):
+        return  # module and name identify it
+    else:
+        _update_pickle(digest, function)
+
+
+def fingerprint(*values):
+    """Hex digest identifying the given values."""
+    digest = hashlib.blake2b(digest_size=20)
+    for value in values:
+        _update(digest, value)
+    return digest.hexdigest()
+
+
+def _source_of(function):
+    """Source code of a chart function (bytecode when the source is unavailable)."""
+    try:
+        return inspect.getsource(function)
+    except (OSError, TypeError):
+        return function.__code__.co_code.hex()
+
+
+# ===============================================================
+# Section 2: The Cache
+# ===============================================================
+
+"""
+<cache dir>/
+    index.json          key -> file, bytes, created, last_used
+    <key>.<format>      the rendered image
+
+Every hit updates `last_used` in memory; the index is written on the next
+store, on `flush()` or once `flush_interval` seconds have passed since
+the first unwritten hit, so a run of hits does not rewrite index.json
+each time. After every store the least recently used images are removed
+until the cache is within `max_bytes` and `max_entries`; an image larger
+than `max_bytes` on its own is not stored at all and its bytes are
+returned instead of a path. Images and the index are written to temporary
+files and moved into place, so readers never see partial files.
+"""
+
+
+class RenderCache:
+    """Rendered chart images on disk, keyed by content, evicted LRU."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, max_entries=None,
+                 flush_interval=30.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self._unwritten_since = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._index = self._read_index()
+
+    # ---------------------------------------------------------------
+    # Index
+    # ---------------------------------------------------------------
+
+    def _read_index(self):
+        """Loads index.json, dropping entries whose image file is gone."""
+        try:
+            with open(os.path.join(self.directory, 'index.json')) as file:
+                index = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return {key: entry for key, entry in index.items()
+                if os.path.exists(os.path.join(self.directory, entry['file']))}
+
+    def _write_index(self):
+        """Writes index.json atomically."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.json')
+        with os.fdopen(fd, 'w') as file:
+            json.dump(self._index, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, os.path.join(self.directory, 'index.json'))
+        self._unwritten_since = None
+
+    def flush(self):
+        """Writes `last_used` times of hits not yet in index.json."""
+        if self._unwritten_since is not None:
+            self._write_index()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    @property
+    def total_bytes(self):
+        """Size of all cached images."""
+        return sum(entry['bytes'] for entry in self._index.values())
+
+    # ---------------------------------------------------------------
+    # Lookup and storage
+    # ---------------------------------------------------------------
+
+    def key(self, kind, data, params, fmt='png', dpi=100):
+        """Cache key for one chart: what is drawn, from which data, how, with which rcParams."""
+        import matplotlib
+
+        style = repr(sorted((name, value) for name, value in matplotlib.rcParams.items()
+                            if name not in RC_IGNORED))
+        return fingerprint(kind, data, params, fmt, dpi, matplotlib.__version__, style)
+
+    def get(self, key):
+        """Path of the cached image for `key`, or None."""
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        path = os.path.join(self.directory, entry['file'])
+        if not os.path.exists(path):
+            del self._index[key]
+            return None
+        now = time.time()
+        entry['last_used'] = now
+        if self._unwritten_since is None:
+            self._unwritten_since = now
+        elif now - self._unwritten_since >= self.flush_interval:
+            self._write_index()
+        return path
+
+    def put(self, key, figure, fmt='png', dpi=100):
+        """
+        Saves `figure` under `key` and evicts old images if needed.
+
+        Returns the image path, or the image bytes when the image alone is
+        larger than `max_bytes` and is therefore not cached.
+        """
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format=fmt, dpi=dpi)
+        image = buffer.getvalue()
+        if self.max_bytes is not None and len(image) > self.max_bytes:
+            return image
+        name = f"{key}.{fmt}"
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=f".{fmt}")
+        with os.fdopen(fd, 'wb') as file:
+            file.write(image)
+        path = os.path.join(self.directory, name)
+        os.replace(tmp_path, path)
+        now = time.time()
+        self._index[key] = {'file': name, 'bytes': len(image), 'created': now, 'last_used': now}
+        self.evict()
+        self._write_index()
+        return path
+
+    def get_or_render(self, key, render, fmt='png', dpi=100):
+        """
+        Returns the image path for `key`, calling `render()` only on a miss
+        (the image bytes when it is too large to cache, see `put`).
+
+        `render` draws the chart and returns a Figure, an Axes (or array of
+        Axes) or None for the current pyplot figure. The figure is closed
+        after saving.
+        """
+        path = self.get(key)
+        if path is not None:
+            self.hits += 1
+            return path
+
+        import matplotlib.pyplot as plt
+
+        self.misses += 1
+        result = render()
+        figure = _figure_of(result, plt)
+        try:
+            return self.put(key, figure, fmt, dpi)
+        finally:
+            plt.close(figure)
+
+    def evict(self):
+        """Removes least recently used images until within the bounds."""
+        by_age = sorted(self._index, key=lambda key: self._index[key]['last_used'])
+        total = self.total_bytes
+        while by_age and ((self.max_bytes is not None and total > self.max_bytes)
+                          or (self.max_entries is not None and len(self._index) > self.max_entries)):
+            key = by_age.pop(0)
+            entry = self._index.pop(key)
+            total -= entry['bytes']
+            try:
+                os.remove(os.path.join(self.directory, entry['file']))
+            except FileNotFoundError:
+                pass
+            self.evictions += 1
+
+    def clear(self):
+        """Deletes every cached image."""
+        for entry in self._index.values():
+            try:
+                os.remove(os.path.join(self.directory, entry['file']))
+            except FileNotFoundError:
+                pass
+        self._index = {}
+        self._write_index()
+
+    def stats(self):
+        """Hit/miss counters and size of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._index),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+        }
+
+    # ---------------------------------------------------------------
+    # Pyplot chart functions
+    # ---------------------------------------------------------------
+
+    def chart(self, function=None, fmt='png', dpi=100):
+        """
+        Decorator for chart functions that draw with pyplot.
+
+        The decorated function returns what get_or_render returns (the
+        image path). Its arguments and its source code form the key, so
+        unchanged data and code never re-render.
+        """
+        if function is None:
+            return functools.partial(self.chart, fmt=fmt, dpi=dpi)
+        source = _source_of(function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key = self.key(('pyplot', function.__module__, function.__qualname__, source),
+                           list(args), kwargs, fmt, dpi)
+            return self.get_or_render(key, lambda: function(*args, **kwargs), fmt, dpi)
+
+        return wrapper
+
+
+def _figure_of(result, plt):
+    """The Figure a render call produced."""
+    if result is None:
+        return plt.gcf()
+    if hasattr(result, 'savefig'):
+        return result
+    if isinstance(result, np.ndarray):
+        result = result.flat[0]
+    if hasattr(result, 'get_figure'):
+        return result.get_figure()
+    return plt.gcf()
+
+
+# ===============================================================
+# Section 3: DataFrame.plot Wrapper
+# ===============================================================
+
+
+def cached_plot(cache, data, kind='line', fmt='png', dpi=100, **plot_kwargs):
+    """
+    `data.plot(kind=kind, **plot_kwargs)` through the cache; returns the image path.
+
+    `data` is a Series or DataFrame; every keyword argument (title, color,
+    bins, figsize, ...) is part of the key.
+    """
+    key = cache.key(('pandas.plot', kind), data, plot_kwargs, fmt, dpi)
+    return cache.get_or_render(key, lambda: data.plot(kind=kind, **plot_kwargs), fmt, dpi)
+
+
+def cached_chart(cache, name, fmt='png', dpi=100, **kwargs):
+    """Renders a chart from notebook_charts.CHARTS through the cache."""
+    from notebook_charts import CHARTS
+
+    return cache.chart(CHARTS[name], fmt=fmt, dpi=dpi)(**kwargs)
+
+
+# ===============================================================
+# Section 4: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    import matplotlib
+
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from notebook_charts import plotting_sample
+
+    cache = RenderCache(os.path.join(tempfile.gettempdir(), 'render_cache_demo'), max_entries=50)
+    cache.clear()
+    data = plotting_sample()
+
+    def report():
+        paths = [
+            cached_plot(cache, data['Category'].value_counts(), kind='bar', title='Bar Plot: Category Counts',
+                        xlabel='Category', ylabel='Frequency', color='skyblue', figsize=(8, 6)),
+            cached_plot(cache, data['Value'], kind='hist', bins=20, title='Histogram: Distribution of Values',
+                        color='orange', alpha=0.75, figsize=(8, 6)),
+            cached_plot(cache, data['Category'].value_counts(), kind='pie', autopct='%1.1f%%',
+                        title='Pie Chart: Category Distribution', startangle=90,
+                        colors=['gold', 'lightcoral', 'lightblue'], figsize=(6, 6)),
+            cached_chart(cache, 'donut'),
+            cached_chart(cache, 'grouped_bars'),
+        ]
+        return paths
+
+    for attempt in ('cold', 'warm'):
+        start = time.perf_counter()
+        report()
+        print(f"{attempt}: {time.perf_counter() - start:.3f}s", cache.stats())
+
+    # Changing one value re-renders only the charts that use it
+    data.iloc[0, data.columns.get_loc('Value')] += 1
+    report()
+    cache.flush()  # hits since the last store only update last_used in memory
+    print("after a data change:", cache.stats())
+    # Output: the histogram misses once more, everything else hits
@@ -0,0 +1,339 @@
+"""
+===============================================================
+Matplotlib Tooling: Render-Time Instrumentation for Every Figure
+===============================================================
+
+This module covers:
+1. An opt-in profiling hook that wraps figure creation,
+   `Figure.tight_layout`, `Figure.savefig` and `pyplot.show`.
+2. Per figure: number of artists by type, data points per artist, build
+   time (creation until save), layout time, draw time and encode time.
+3. One JSON record per saved/shown figure, optionally appended to a JSON
+   Lines file, and a summary table of the slowest charts.
+
+Nothing is patched until `enable()` (or the `profile_renders` context
+manager, or RENDER_PROFILE=<path> with `enable_from_env()`) is called, and
+`disable()` restores the original methods.
+
+Timing model for one savefig call:
+    draw_s    time spent in Figure.draw (rendering all artists)
+    encode_s  savefig_s - draw_s (PNG/SVG/PDF encoding and file output)
+    layout_s  time spent in Figure.tight_layout since the figure was made
+              or its previous record
+    build_s   from figure creation to the start of savefig/show
+
+Usage:
+    from render_profiler import profile_renders
+
+    with profile_renders('render_profile.jsonl') as profiler:
+        ...  # run notebook cells / chart functions that call savefig
+    print(profiler.summary())
+"""
+
+import functools
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+
+# ===============================================================
+# Section 1: Inspecting a Figure
+# ===============================================================
+
+
+def artist_points(artist):
+    """Number of data points an artist carries (0 for text and decorations)."""
+    from matplotlib.collections import Collection
+    from matplotlib.image import AxesImage
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+
+    if isinstance(artist, Line2D):
+        return len(artist.get_xdata(orig=False))
+    if isinstance(artist, Collection):
+        offsets = artist.get_offsets()
+        if offsets is not None and len(offsets) > 1:
+            return len(offsets)
+        return sum(len(path.vertices) for path in artist.get_paths())
+    if isinstance(artist, AxesImage):
+        array = artist.get_array()
+        return 0 if array is None else int(np.prod(array.shape[:2]))
+    if isinstance(artist, Patch):
+        return len(artist.get_path().vertices)
+    return 0
+
+
+def inventory(fig, top=10):
+    """Artists by type and the data-carrying artists with the most points."""
+    artists = fig.findobj(include_self=False)
+    by_type = Counter(type(artist).__name__ for artist in artists)
+    data_artists = []
+    for ax in fig.axes:
+        for artist in ax.lines + ax.collections + ax.patches + ax.images:
+            data_artists.append({'type': type(artist).__name__, 'label': str(artist.get_label()),
+                                 'points': int(artist_points(artist))})
+    data_artists.sort(key=lambda entry: entry['points'], reverse=True)
+    return {
+        'artists': len(artists),
+        'artists_by_type': dict(by_type.most_common()),
+        'data_artists': len(data_artists),
+        'data_points': sum(entry['points'] for entry in data_artists),
+        'largest_artists': data_artists[:top],
+    }
+
+
+def figure_label(fig, path=None):
+    """A readable name for a figure: suptitle, first axes title or file name."""
+    if fig._suptitle is not None and fig._suptitle.get_text():
+        return fig._suptitle.get_text()
+    for ax in fig.axes:
+        if ax.get_title():
+            return ax.get_title()
+    if path is not None and isinstance(path, (str, os.PathLike)):
+        return os.path.basename(os.fspath(path))
+    return f"figure {fig.number}" if getattr(fig, 'number', None) else 'figure'
+
+
+# ===============================================================
+# Section 2: The Profiler
+# ===============================================================
+
+"""
+Per-figure state lives on the figure itself (`fig._render_profile`), so
+several figures can be built and saved in any order. Figure.draw is
+wrapped to add its time to the state of the figure being drawn; savefig
+and show read and reset that counter around their own call. The layout
+counters are reset after each record, so saving one figure twice does not
+report its tight_layout time twice.
+"""
+
+
+class RenderProfiler:
+    """Collects render timings and artist statistics for every figure."""
+
+    def __init__(self, output=None, top_artists=10):
+        self.output = output
+        self.top_artists = top_artists
+        self.records = []
+        self._originals = {}
+
+    @property
+    def enabled(self):
+        return bool(self._originals)
+
+    # ---------------------------------------------------------------
+    # Installing and removing the hooks
+    # ---------------------------------------------------------------
+
+    def enable(self):
+        """Wraps the matplotlib entry points; returns self."""
+        if self.enabled:
+            return self
+        import matplotlib.pyplot as plt
+        from matplotlib.figure import Figure
+
+        profiler = self
+        originals = {
+            'init': Figure.__init__,
+            'draw': Figure.draw,
+            'tight_layout': Figure.tight_layout,
+            'savefig': Figure.savefig,
+            'show': plt.show,
+        }
+
+        @functools.wraps(originals['init'])
+        def init(fig, *args, **kwargs):
+            originals['init'](fig, *args, **kwargs)
+            fig._render_profile = _new_state()
+
+        @functools.wraps(originals['draw'])
+        def draw(fig, renderer, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return originals['draw'](fig, renderer, *args, **kwargs)
+            finally:
+                _state(fig)['draw_s'] += time.perf_counter() - start
+
+        @functools.wraps(originals['tight_layout'])
+        def tight_layout(fig, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return originals['tight_layout'](fig, *args, **kwargs)
+            finally:
+                state = _state(fig)
+                state['layout_s'] += time.perf_counter() - start
+                state['layout_calls'] += 1
+
+        @functools.wraps(originals['savefig'])
+        def savefig(fig, fname, *args, **kwargs):
+            state = _state(fig)
+            state['draw_s'] = 0.0
+            started = time.perf_counter()
+            result = originals['savefig'](fig, fname, *args, **kwargs)
+            elapsed = time.perf_counter() - started
+            fmt = kwargs.get('format') or _format_of(fname)
+            profiler._record(fig, 'savefig', started, elapsed, fname, fmt, kwargs.get('dpi'))
+            return result
+
+        @functools.wraps(originals['show'])
+        def show(*args, **kwargs):
+            figures = [manager.canvas.figure for manager in plt._pylab_helpers.Gcf.get_all_fig_managers()]
+            for fig in figures:
+                _state(fig)['draw_s'] = 0.0
+            started = time.perf_counter()
+            result = originals['show'](*args, **kwargs)
+            elapsed = time.perf_counter() - started
+            for fig in figures:
+                profiler._record(fig, 'show', started, elapsed / max(len(figures), 1), None, None, None)
+            return result
+
+        Figure.__init__ = init
+        Figure.draw = draw
+        Figure.tight_layout = tight_layout
+        Figure.savefig = savefig
+        plt.show = show
+        self._originals = originals
+        return self
+
+    def disable(self):
+        """Restores the original matplotlib methods."""
+        if not self.enabled:
+            return
+        import matplotlib.pyplot as plt
+        from matplotlib.figure import Figure
+
+        Figure.__init__ = self._originals['init']
+        Figure.draw = self._originals['draw']
+        Figure.tight_layout = self._originals['tight_layout']
+        Figure.savefig = self._originals['savefig']
+        plt.show = self._originals['show']
+        self._originals = {}
+
+    # ---------------------------------------------------------------
+    # Records
+    # ---------------------------------------------------------------
+
+    def _record(self, fig, event, started, elapsed, path, fmt, dpi):
+        """Builds, stores and (optionally) writes one JSON record."""
+        state = _state(fig)
+        draw = state['draw_s']
+        record = {
+            'figure': figure_label(fig, path),
+            'event': event,
+            'path': os.fspath(path) if isinstance(path, (str, os.PathLike)) else None,
+            'format': fmt,
+            'dpi': dpi if dpi is not None else fig.dpi,
+            'size_inches': [round(float(value), 3) for value in fig.get_size_inches()],
+            'build_s': max(started - state['created'], 0.0),
+            'layout_s': state['layout_s'],
+            'layout_calls': state['layout_calls'],
+            'draw_s': draw,
+            'encode_s': max(elapsed - draw, 0.0),
+            'total_s': elapsed + state['layout_s'],
+            'timestamp': time.time(),
+        }
+        record.update(inventory(fig, self.top_artists))
+        state['layout_s'], state['layout_calls'] = 0.0, 0
+        self.records.append(record)
+        if self.output:
+            with open(self.output, 'a') as file:
+                file.write(json.dumps(record) + '\n')
+        return record
+
+    def summary(self, n=10):
+        """The n slowest renders as a DataFrame."""
+        import pandas as pd
+
+        columns = ['figure', 'event', 'format', 'total_s', 'build_s', 'layout_s', 'draw_s', 'encode_s',
+                   'artists', 'data_points']
+        table = pd.DataFrame(self.records, columns=columns)
+        return table.sort_values('total_s', ascending=False).head(n).reset_index(drop=True)
+
+
+def _new_state():
+    """Fresh per-figure counters."""
+    return {'created': time.perf_counter(), 'layout_s': 0.0, 'layout_calls': 0, 'draw_s': 0.0}
+
+
+def _state(fig):
+    """Per-figure counters (created lazily for figures made before enable())."""
+    if not hasattr(fig, '_render_profile'):
+        fig._render_profile = _new_state()
+    return fig._render_profile
+
+
+def _format_of(fname):
+    """Output format from a file name (savefig's default is PNG)."""
+    if isinstance(fname, (str, os.PathLike)):
+        extension = os.path.splitext(os.fspath(fname))[1].lstrip('.').lower()
+        if extension:
+            return extension
+    import matplotlib
+
+    return matplotlib.rcParams['savefig.format']
+
+
+def load_records(path):
+    """Reads a JSON Lines file written by the profiler."""
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+@contextmanager
+def profile_renders(output=None, top_artists=10):
+    """Context manager: profiling is on inside the block only."""
+    profiler = RenderProfiler(output, top_artists).enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+
+
+def enable_from_env(variable='RENDER_PROFILE'):
+    """Enables profiling when the environment variable names an output file."""
+    output = os.environ.get(variable)
+    return RenderProfiler(output).enable() if output else None
+
+
+# ===============================================================
+# Section 3: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    import io
+    import tempfile
+
+    import matplotlib
+
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    from notebook_charts import CHARTS
+
+    output = os.path.join(tempfile.gettempdir(), 'render_profile.jsonl')
+    if os.path.exists(output):
+        os.remove(output)
+
+    with profile_renders(output) as profiler:
+        for name, chart in CHARTS.items():
+            chart()
+            plt.savefig(io.BytesIO(), format='png')
+            plt.close('all')
+
+        # A chart with a lot of data, to show up at the top of the summary
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.plot(np.random.default_rng(0).normal(size=(200_000, 3)), marker='.', linestyle='None')
+        ax.set_title("Three series, 200,000 points each")
+        fig.tight_layout()
+        fig.savefig(io.BytesIO(), format='png')
+        plt.close(fig)
+
+    with pd.option_context('display.float_format', '{:.3f}'.format):
+        print(profiler.summary(5).to_string())
+    print("\nLargest artists of the last chart:", json.dumps(load_records(output)[-1]['largest_artists'][:2]))
+    print("Records written to", output)
+    # Output: the 600,000-point chart first, then the multi-axes subplot grids
@@ -0,0 +1,312 @@
+"""
+===============================================================
+Pandas Tooling: Benchmark Suite for the Pandas Notebooks at Scale
+===============================================================
+
+This module covers:
+1. Generating synthetic Uber trip files from 1k to 100M rows
+   (see synthetic_trips.py) and reusing them between runs.
+2. Timing every stage of 1_Introduction.ipynb and 2_Data_Cleaning.ipynb:
+   load, inspect (info/describe/isnull), profile, clean, outlier filter and
+   feature extraction, plus the streaming summary from streaming_loader.py.
+3. Reporting wall time (best and median of several repeats), throughput
+   (rows/s), the peak memory each stage allocates and the peak RSS.
+4. Writing machine-readable JSON and comparing two result files to catch
+   regressions between versions.
+
+Each size runs in a fresh process so peak RSS belongs to that size only.
+Peak RSS is the process high-water mark after the stage finished, so it
+never decreases from one stage to the next. The per-stage figure is
+`peak_alloc_mb`: the tracemalloc peak above the memory held when the stage
+started (NumPy and pandas buffers included), measured in one extra pass
+that is not timed, since tracing slows allocation down.
+
+The whole chain is repeated `repeats` times on fresh state and a stage's
+`seconds` is its best time; a regression needs both a relative and an
+absolute slowdown, so noise on millisecond stages does not fail a run.
+
+Command line:
+    python benchmark_suite.py --sizes 1k,10k,100k,1m --output results.json
+    python benchmark_suite.py --sizes 1m --compare baseline.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+# ===============================================================
+# Section 1: The Stages
+# ===============================================================
+
+"""
+The stages mirror the notebooks. They share one `state` dict: `load` puts
+the raw frame in it, `clean` reads that and stores the cleaned frame, and
+so on, so each stage is timed on exactly what the notebook would see.
+"""
+
+
+def stage_load(state):
+    """pd.read_csv as in both notebooks."""
+    state['df'] = pd.read_csv(state['path'])
+
+
+def stage_inspect(state):
+    """head/tail/info/describe/shape/dtypes/isnull from 1_Introduction."""
+    df = state['df']
+    df.head()
+    df.tail()
+    df.info(buf=io.StringIO())
+    df.describe()
+    _ = df.shape, df.columns, df.dtypes
+    df.isnull().sum()
+
+
+def stage_profile(state):
+    """The single-pass profiler from data_profiler.py."""
+    from data_profiler import profile_frame
+
+    profile_frame(state['df'])
+
+
+def stage_clean(state):
+    """Missing values, duplicates and type fixes from 2_Data_Cleaning."""
+    df = state['df'].copy()
+    df.isnull().sum()
+    df.dropna()
+    df.fillna('Unknown')
+    df = df.drop_duplicates()
+    df['START_DATE'] = pd.to_datetime(df['START_DATE'], errors='coerce', format='mixed')
+    df['MILES'] = pd.to_numeric(df['MILES'], errors='coerce')
+    state['clean'] = df
+
+
+def stage_outlier(state):
+    """The IQR outlier filter from 2_Data_Cleaning."""
+    df = state['clean']
+    Q1 = df['MILES'].quantile(0.25)
+    Q3 = df['MILES'].quantile(0.75)
+    IQR = Q3 - Q1
+    state['clean'] = df[(df['MILES'] >= Q1 - 1.5 * IQR) & (df['MILES'] <= Q3 + 1.5 * IQR)]
+
+
+def stage_features(state):
+    """String standardization and date features from 2_Data_Cleaning."""
+    df = state['clean'].copy()
+    df['CATEGORY'] = df['CATEGORY'].str.strip().str.lower()
+    df['PURPOSE'] = df['PURPOSE'].str.replace('/', ' & ', regex=False)
+    df['END_DATE'] = pd.to_datetime(df['END_DATE'], errors='coerce', format='mixed')
+    df['YEAR'] = df['START_DATE'].dt.year
+    df['MONTH'] = df['START_DATE'].dt.month
+
+
+def stage_stream_summary(state):
+    """Chunked info/describe/isnull report from streaming_loader.py."""
+    from streaming_loader import stream_summary
+
+    stream_summary(state['path']).report()
+
+
+STAGES = {
+    'load': stage_load,
+    'inspect': stage_inspect,
+    'profile': stage_profile,
+    'clean': stage_clean,
+    'outlier': stage_outlier,
+    'features': stage_features,
+    'stream_summary': stage_stream_summary,
+}
+
+
+# ===============================================================
+# Section 2: Measuring
+# ===============================================================
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def dataset_path(rows, data_dir, seed=0):
+    """Generates (once) and returns the synthetic file for `rows` trips."""
+    from synthetic_trips import TripModel
+
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"trips_{rows}_seed{seed}.csv")
+    if not os.path.exists(path):
+        tmp_path = path + '.tmp'
+        TripModel.fit().write_csv(tmp_path, rows, seed=seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def time_stages(path, stages):
+    """Seconds per stage for one pass of the chain on fresh state."""
+    state = {'path': path}
+    seconds = {}
+    for name in stages:
+        start = time.perf_counter()
+        STAGES[name](state)
+        seconds[name] = time.perf_counter() - start
+    return seconds
+
+
+def trace_stages(path, stages):
+    """Peak MB each stage allocates above what it started with (one traced pass)."""
+    state = {'path': path}
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for name in stages:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            STAGES[name](state)
+            peaks[name] = (tracemalloc.get_traced_memory()[1] - before) / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def run_size(rows, data_dir, stages, seed=0, repeats=3):
+    """Runs the stages on one dataset size (called in a fresh process)."""
+    path = dataset_path(rows, data_dir, seed)
+    timings = [time_stages(path, stages) for _ in range(max(repeats, 1))]
+    rss = peak_rss_mb()
+    peaks = trace_stages(path, stages)
+    results = []
+    for name in stages:
+        seconds = [timing[name] for timing in timings]
+        best = min(seconds)
+        results.append({
+            'rows': rows,
+            'stage': name,
+            'seconds': best,
+            'median_seconds': float(np.median(seconds)),
+            'repeats': len(seconds),
+            'rows_per_second': rows / best if best > 0 else float('inf'),
+            'peak_alloc_mb': peaks[name],
+            'peak_rss_mb': rss,
+        })
+    return results
+
+
+def environment():
+    """Versions and machine details stored next to the results."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_suite(sizes, data_dir, stages=None, seed=0, repeats=3):
+    """Runs every size in its own process and returns the full result document."""
+    stages = list(stages or STAGES)
+    results = []
+    for rows in sizes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+            results += pool.submit(run_size, rows, data_dir, stages, seed, repeats).result()
+    return {'environment': environment(), 'results': results}
+
+
+# ===============================================================
+# Section 3: Reporting and Regression Checks
+# ===============================================================
+
+
+def results_table(document):
+    """Results as a DataFrame, one row per (rows, stage)."""
+    return pd.DataFrame(document['results'])
+
+
+def compare(baseline, current, tolerance=0.10, min_delta=0.05):
+    """
+    Compares two result documents stage by stage.
+
+    A stage regresses when its best time became more than `tolerance` (10%)
+    and more than `min_delta` seconds slower. Returns a DataFrame with both
+    timings, the ratio and a flag.
+    """
+    keys = ['rows', 'stage']
+    merged = results_table(baseline)[keys + ['seconds']].merge(
+        results_table(current)[keys + ['seconds']], on=keys, suffixes=('_baseline', '_current'))
+    merged['ratio'] = merged['seconds_current'] / merged['seconds_baseline']
+    slower = merged['seconds_current'] - merged['seconds_baseline']
+    merged['regression'] = (merged['ratio'] > 1 + tolerance) & (slower > min_delta)
+    return merged
+
+
+def parse_size(text):
+    """'10k' -> 10_000, '1m' -> 1_000_000, '250' -> 250."""
+    text = text.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if multiplier > 1 else text) * multiplier)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Pandas notebook stages at scale")
+    parser.add_argument('--sizes', default='1k,10k,100k,1m',
+                        help="comma-separated row counts, e.g. 1k,10k,100k,1m,10m,100m")
+    parser.add_argument('--stages', default=','.join(STAGES), help="comma-separated stage names")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'uber_benchmark_data'))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="baseline JSON to compare against")
+    parser.add_argument('--repeats', type=int, default=3, help="timed passes per size; the best one counts")
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    parser.add_argument('--min-delta', type=float, default=0.05,
+                        help="seconds a stage must slow down by, on top of --tolerance, to regress")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    document = run_suite(sizes, args.data_dir, args.stages.split(','), args.seed, args.repeats)
+
+    table = results_table(document)
+    with pd.option_context('display.float_format', '{:,.3f}'.format, 'display.width', 120):
+        print(table.to_string(index=False))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(document, file, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        comparison = compare(baseline, document, args.tolerance, args.min_delta)
+        print("\nComparison with", args.compare)
+        print(comparison.to_string(index=False))
+        if comparison['regression'].any():
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
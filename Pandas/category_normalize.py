@@ -0,0 +1,169 @@
+"""
+===============================================================
+Pandas Tooling: Category-Level String Normalization
+===============================================================
+
+This module covers:
+1. Why `df['CATEGORY'].str.strip().str.lower()` is wasteful: the same few
+   strings are transformed once per row.
+2. Factorizing a column into integer codes + unique values, transforming
+   only the unique values and mapping the codes back.
+3. A chainable set of operations (strip, lower, upper, title, replace,
+   regex, custom function) that returns a categorical column.
+
+For a low-cardinality column the string work drops from "once per row" to
+"once per distinct value"; the per-row work is a single integer take.
+
+Usage:
+    from category_normalize import StringNormalizer
+
+    df['CATEGORY'] = StringNormalizer().strip().lower()(df['CATEGORY'])
+    df['PURPOSE'] = StringNormalizer().replace('/', ' & ')(df['PURPOSE'])
+"""
+
+import numpy as np
+import pandas as pd
+
+# ===============================================================
+# Section 1: The Normalizer
+# ===============================================================
+
+
+class StringNormalizer:
+    """A chain of string operations applied to the distinct values of a column."""
+
+    def __init__(self):
+        self.steps = []
+
+    def _add(self, name, *args):
+        """Records one step and returns self so calls can be chained."""
+        self.steps.append((name, args))
+        return self
+
+    # ---------------------------------------------------------------
+    # Chainable operations (same meaning as the pandas .str methods)
+    # ---------------------------------------------------------------
+
+    def strip(self, chars=None):
+        """Removes surrounding whitespace (or `chars`)."""
+        return self._add('strip', chars)
+
+    def lower(self):
+        """Lower-cases every value."""
+        return self._add('lower')
+
+    def upper(self):
+        """Upper-cases every value."""
+        return self._add('upper')
+
+    def title(self):
+        """Title-cases every value."""
+        return self._add('title')
+
+    def replace(self, pat, repl):
+        """Replaces a literal substring."""
+        return self._add('replace', pat, repl)
+
+    def regex(self, pat, repl):
+        """Replaces a regular expression match."""
+        return self._add('regex', pat, repl)
+
+    def apply(self, function):
+        """Applies any str -> str function."""
+        return self._add('apply', function)
+
+    # ---------------------------------------------------------------
+    # Running the chain
+    # ---------------------------------------------------------------
+
+    def transform_values(self, values):
+        """Runs the chain on a Series of (distinct) strings."""
+        values = pd.Series(values, dtype=object)
+        for name, args in self.steps:
+            if name == 'strip':
+                values = values.str.strip(*args)
+            elif name in ('lower', 'upper', 'title'):
+                values = getattr(values.str, name)()
+            elif name == 'replace':
+                values = values.str.replace(args[0], args[1], regex=False)
+            elif name == 'regex':
+                values = values.str.replace(args[0], args[1], regex=True)
+            elif name == 'apply':
+                values = values.map(args[0], na_action='ignore')
+        return values
+
+    def __call__(self, series, as_category=True):
+        """
+        Normalizes a column by transforming its distinct values only.
+
+        Values that become equal after the chain (e.g. ' Business' and
+        'business') share one category. Nulls stay null. Returns a
+        categorical Series unless `as_category` is False.
+        """
+        series = pd.Series(series)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+
+        transformed = self.transform_values(pd.Series(np.asarray(uniques, dtype=object)))
+        remap, categories = pd.factorize(transformed, use_na_sentinel=True)
+
+        # Codes of -1 (nulls, or values the chain turned into nulls) stay -1
+        remap = np.append(remap, -1)
+        new_codes = remap[np.where(codes < 0, len(remap) - 1, codes)]
+
+        result = pd.Categorical.from_codes(new_codes, categories=pd.Index(categories, dtype=object))
+        result = pd.Series(result, index=series.index, name=series.name)
+        return result if as_category else result.astype(object)
+
+
+def normalize_columns(df, normalizers, as_category=True):
+    """Applies {column: StringNormalizer} to a copy of `df`."""
+    df = df.copy()
+    for column, normalizer in normalizers.items():
+        df[column] = normalizer(df[column], as_category)
+    return df
+
+
+# ===============================================================
+# Section 2: Example and Timing
+# ===============================================================
+
+if __name__ == "__main__":
+    import time
+
+    from streaming_loader import UBER_CSV
+
+    df = pd.read_csv(UBER_CSV)
+    category = StringNormalizer().strip().lower()
+    purpose = StringNormalizer().replace('/', ' & ')
+
+    cleaned = normalize_columns(df, {'CATEGORY': category, 'PURPOSE': purpose})
+    print(cleaned[['CATEGORY', 'PURPOSE']].head())
+    print(cleaned['PURPOSE'].cat.categories.tolist())
+
+    # Same result as the notebook's per-row string operations
+    expected = df['CATEGORY'].str.strip().str.lower()
+    print("Matches .str.strip().str.lower():", cleaned['CATEGORY'].astype(object).equals(expected.astype(object)))
+
+    # Timing on 5M rows of a low-cardinality column
+    big = pd.Series(np.random.default_rng(0).choice(df['PURPOSE'].dropna().unique(), 5_000_000))
+
+    start = time.perf_counter()
+    big.str.replace('/', ' & ', regex=False)
+    per_row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    purpose(big)
+    per_category_seconds = time.perf_counter() - start
+
+    big_category = big.astype('category')
+    start = time.perf_counter()
+    purpose(big_category)
+    categorical_seconds = time.perf_counter() - start
+
+    print(f"\nPer-row .str.replace:         {per_row_seconds:.3f} s")
+    print(f"Per-category (from strings):  {per_category_seconds:.3f} s")
+    print(f"Per-category (already cat.):  {categorical_seconds:.4f} s")
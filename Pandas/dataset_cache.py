@@ -0,0 +1,379 @@
+"""
+===============================================================
+Pandas Tooling: Typed Columnar Cache for Datasets/*.csv
+===============================================================
+
+This module covers:
+1. Converting a CSV once into a typed binary columnar layout
+   (one `.npy` file per column plus a JSON manifest).
+2. Storing the Uber columns with real types: categoricals for
+   CATEGORY/START/STOP/PURPOSE, datetime64 for START_DATE/END_DATE and
+   float32 for MILES.
+3. Invalidating the cache automatically when the source file changes
+   (size/mtime first, then a content hash), and deleting the entries of the
+   old content.
+4. A benchmark comparing a cold CSV load against a cached load.
+
+Cache entries are keyed by the content hash of the source file plus a
+fingerprint of the schema and read_csv options, so identical copies
+(Pandas/UberDataset.csv and Datasets/UberDataset.csv) share one entry while
+different parse options never read each other's results.
+
+Usage:
+    from dataset_cache import load_dataset
+
+    df = load_dataset('UberDataset.csv')   # parses the CSV once, then cached
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from fast_datetime import parse_trip_datetimes
+from streaming_loader import CATEGORICAL_COLUMNS, DATE_COLUMNS, UBER_COLUMNS
+
+# ===============================================================
+# Section 1: Cache Layout and Schemas
+# ===============================================================
+
+"""
+<cache_dir>/
+    index.json                 source path -> size, mtime_ns, content hash
+    <content hash>-<options hash>/
+        manifest.json          column order, kinds, dtypes, row count
+        col000.npy             values, or integer codes for dictionary columns
+        col000.categories.npy  categories of a dictionary-encoded column
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASETS_DIR = os.path.join(REPO_ROOT, 'Datasets')
+CACHE_DIR = os.path.join(DATASETS_DIR, '.cache')
+
+CACHE_VERSION = 2
+
+# Column kinds understood by the cache
+#   'category' -> pd.Categorical (codes + categories on disk)
+#   'string'   -> plain strings (dictionary-encoded on disk, decoded on load)
+#   'datetime' -> datetime64[ns]
+#   anything else is a NumPy dtype name such as 'float32' or 'int64'
+UBER_SCHEMA = {column: 'category' for column in CATEGORICAL_COLUMNS}
+UBER_SCHEMA.update({column: 'datetime' for column in DATE_COLUMNS})
+UBER_SCHEMA['MILES'] = 'float32'
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+
+
+def infer_schema(df):
+    """Picks a cache kind for every column of a freshly parsed CSV."""
+    if list(df.columns) == UBER_COLUMNS:
+        return dict(UBER_SCHEMA)
+
+    schema = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_numeric_dtype(series.dtype):
+            schema[column] = series.dtype.name
+        elif series.nunique() <= CATEGORY_RATIO * max(len(series), 1):
+            schema[column] = 'category'
+        else:
+            schema[column] = 'string'
+    return schema
+
+
+# ===============================================================
+# Section 2: Source Fingerprints
+# ===============================================================
+
+
+def file_hash(path, block_size=1 << 20):
+    """Content hash of a file, read in 1 MB blocks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_index(cache_dir):
+    """Loads index.json (empty when the cache is new)."""
+    try:
+        with open(os.path.join(cache_dir, 'index.json')) as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_index(cache_dir, index):
+    """Writes index.json atomically."""
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.json')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(index, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, os.path.join(cache_dir, 'index.json'))
+
+
+def _remove_entries(cache_dir, source_hash):
+    """Deletes every cache entry built from the content `source_hash`."""
+    for name in os.listdir(cache_dir):
+        entry_dir = os.path.join(cache_dir, name)
+        if name.split('-')[0] == source_hash and os.path.isdir(entry_dir):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+
+def _remove_stale_versions(cache_dir):
+    """Deletes entries written by another CACHE_VERSION; they can never be read again."""
+    for name in os.listdir(cache_dir):
+        manifest_path = os.path.join(cache_dir, name, 'manifest.json')
+        try:
+            with open(manifest_path) as file:
+                stale = json.load(file).get('version') != CACHE_VERSION
+        except (FileNotFoundError, NotADirectoryError, json.JSONDecodeError):
+            continue
+        if stale:
+            shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+
+
+def source_key(path, cache_dir=CACHE_DIR):
+    """
+    Returns the content hash of `path`, re-hashing only if size/mtime changed.
+
+    When the content changed, the entries of the old content are deleted
+    unless another indexed path still has that content.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    index = _read_index(cache_dir)
+    entry = index.get(path)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['hash']
+
+    content_hash = file_hash(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    index[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': content_hash}
+    _write_index(cache_dir, index)
+
+    old_hash = entry['hash'] if entry else None
+    if old_hash and old_hash != content_hash and all(other['hash'] != old_hash for other in index.values()):
+        _remove_entries(cache_dir, old_hash)
+    return content_hash
+
+
+def options_key(schema=None, read_csv_kwargs=None):
+    """Fingerprint of the schema and read_csv options that shape a cache entry."""
+    options = {'schema': schema, 'read_csv': read_csv_kwargs or {}}
+    # default=str keeps dtype objects such as np.float32 stable across runs
+    text = json.dumps(options, sort_keys=True, default=str)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def entry_dir_for(path, cache_dir=CACHE_DIR, schema=None, read_csv_kwargs=None):
+    """Returns (entry_dir, source_hash, options_hash) for one source and set of options."""
+    source_hash = source_key(path, cache_dir)
+    options_hash = options_key(schema, read_csv_kwargs)
+    return os.path.join(cache_dir, f"{source_hash}-{options_hash}"), source_hash, options_hash
+
+
+# ===============================================================
+# Section 3: Writing and Reading Cache Entries
+# ===============================================================
+
+
+def _to_column(series, kind):
+    """Converts a parsed CSV column to its cached type."""
+    if kind == 'category':
+        return series.astype('category')
+    if kind == 'string':
+        return series.astype(object)
+    if kind == 'datetime':
+        return parse_trip_datetimes(series)
+    return pd.to_numeric(series, errors='coerce').astype(kind)
+
+
+def convert_frame(df, schema):
+    """Applies a cache schema to a freshly parsed DataFrame."""
+    return pd.DataFrame({column: _to_column(df[column], schema[column]) for column in df.columns})
+
+
+def _column_file(entry_dir, index, suffix='.npy'):
+    """Column files are numbered so any column name is a safe file name."""
+    return os.path.join(entry_dir, f"col{index:03d}{suffix}")
+
+
+def write_entry(df, schema, entry_dir, source_hash, options_hash=None):
+    """Writes a typed DataFrame as one .npy file per column."""
+    parent = os.path.dirname(entry_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent)
+
+    for index, column in enumerate(df.columns):
+        kind = schema[column]
+        values = df[column]
+        if kind in ('category', 'string'):
+            categorical = pd.Categorical(values)
+            np.save(_column_file(tmp_dir, index), categorical.codes)
+            np.save(_column_file(tmp_dir, index, '.categories.npy'),
+                    np.asarray(categorical.categories.astype(str), dtype=str))
+        elif kind == 'datetime':
+            np.save(_column_file(tmp_dir, index), values.to_numpy(dtype='datetime64[ns]'))
+        else:
+            np.save(_column_file(tmp_dir, index), values.to_numpy())
+
+    manifest = {
+        'version': CACHE_VERSION,
+        'source_hash': source_hash,
+        'options_hash': options_hash,
+        'rows': len(df),
+        'columns': list(df.columns),
+        'schema': {column: schema[column] for column in df.columns},
+    }
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as file:
+        json.dump(manifest, file, indent=2)
+
+    # Publish the finished entry in one step so readers never see half of it
+    if os.path.isdir(entry_dir):
+        shutil.rmtree(entry_dir)
+    os.replace(tmp_dir, entry_dir)
+
+
+def read_entry(entry_dir, columns=None):
+    """Loads a cache entry (optionally only some columns) into a DataFrame."""
+    with open(os.path.join(entry_dir, 'manifest.json')) as file:
+        manifest = json.load(file)
+
+    wanted = manifest['columns'] if columns is None else list(columns)
+    data = {}
+    for column in wanted:
+        index = manifest['columns'].index(column)
+        kind = manifest['schema'][column]
+        values = np.load(_column_file(entry_dir, index), mmap_mode='r')
+        if kind in ('category', 'string'):
+            categories = np.load(_column_file(entry_dir, index, '.categories.npy'))
+            categorical = pd.Categorical.from_codes(np.asarray(values), categories)
+            data[column] = categorical if kind == 'category' else np.asarray(categorical, dtype=object)
+        else:
+            data[column] = np.array(values)
+    return pd.DataFrame(data, columns=wanted)
+
+
+def _entry_is_valid(entry_dir, source_hash, options_hash=None):
+    """True when an entry exists, is complete and belongs to this source and these options."""
+    try:
+        with open(os.path.join(entry_dir, 'manifest.json')) as file:
+            manifest = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return (
+        manifest.get('version') == CACHE_VERSION
+        and manifest.get('source_hash') == source_hash
+        and manifest.get('options_hash') == options_hash
+    )
+
+
+# ===============================================================
+# Section 4: Public API
+# ===============================================================
+
+
+def build_cache(path, cache_dir=CACHE_DIR, schema=None, **read_csv_kwargs):
+    """Parses `path` once and (re)writes its cache entry. Returns the typed frame."""
+    entry_dir, source_hash, options_hash = entry_dir_for(path, cache_dir, schema, read_csv_kwargs)
+    raw = pd.read_csv(path, **read_csv_kwargs)
+    # The key uses the schema as passed, so an inferred one is recomputed identically
+    typed_schema = schema if schema is not None else infer_schema(raw)
+    df = convert_frame(raw, typed_schema)
+    write_entry(df, typed_schema, entry_dir, source_hash, options_hash)
+    _remove_stale_versions(cache_dir)
+    return df
+
+
+def load_dataset(path, cache_dir=CACHE_DIR, schema=None, columns=None, refresh=False,
+                 **read_csv_kwargs):
+    """Loads a CSV through the cache, rebuilding the entry when the source changed."""
+    entry_dir, source_hash, options_hash = entry_dir_for(path, cache_dir, schema, read_csv_kwargs)
+    if refresh or not _entry_is_valid(entry_dir, source_hash, options_hash):
+        df = build_cache(path, cache_dir, schema, **read_csv_kwargs)
+        return df if columns is None else df[list(columns)]
+    return read_entry(entry_dir, columns)
+
+
+def is_cached(path, cache_dir=CACHE_DIR, schema=None, **read_csv_kwargs):
+    """True when `path` has an up-to-date cache entry for these options."""
+    entry_dir, source_hash, options_hash = entry_dir_for(path, cache_dir, schema, read_csv_kwargs)
+    return _entry_is_valid(entry_dir, source_hash, options_hash)
+
+
+def clear_cache(cache_dir=CACHE_DIR):
+    """Deletes every cache entry and the index."""
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
+
+
+def cache_all(datasets_dir=DATASETS_DIR, cache_dir=CACHE_DIR):
+    """Warms the cache for every CSV directly under Datasets/."""
+    cached = {}
+    for name in sorted(os.listdir(datasets_dir)):
+        if name.endswith('.csv'):
+            path = os.path.join(datasets_dir, name)
+            cached[name] = load_dataset(path, cache_dir).shape
+    return cached
+
+
+# ===============================================================
+# Section 5: Benchmark
+# ===============================================================
+
+
+def benchmark_load(path, cache_dir=CACHE_DIR, repeat=5):
+    """Times a cold CSV load (parse + typing) against a cached load."""
+    def best_of(function):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    def cold_load():
+        raw = pd.read_csv(path)
+        return convert_frame(raw, infer_schema(raw))
+
+    load_dataset(path, cache_dir)  # make sure the entry exists
+    csv_seconds = best_of(cold_load)
+    cached_seconds = best_of(lambda: load_dataset(path, cache_dir))
+    return {
+        'path': path,
+        'csv_seconds': csv_seconds,
+        'cached_seconds': cached_seconds,
+        'speedup': csv_seconds / cached_seconds if cached_seconds else np.inf,
+    }
+
+
+# ===============================================================
+# Section 6: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    uber_path = os.path.join(DATASETS_DIR, 'UberDataset.csv')
+    df = load_dataset(uber_path)
+    print(df.dtypes)
+    # Output:
+    # START_DATE    datetime64[ns]
+    # END_DATE      datetime64[ns]
+    # CATEGORY            category
+    # START               category
+    # STOP                category
+    # MILES                float32
+    # PURPOSE             category
+
+    result = benchmark_load(uber_path)
+    print(f"\nCold CSV load: {result['csv_seconds'] * 1000:.1f} ms")
+    print(f"Cached load:   {result['cached_seconds'] * 1000:.1f} ms")
+    print(f"Speedup:       {result['speedup']:.1f}x")
+
+    print("\nCached datasets:", cache_all())
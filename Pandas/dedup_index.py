@@ -0,0 +1,415 @@
+"""
+===============================================================
+Pandas Tooling: Persistent Row-Hash Index for Incremental Deduplication
+===============================================================
+
+This module covers:
+1. Fingerprinting normalized rows as 64-bit hashes.
+2. Keeping the fingerprints of every row seen so far on disk as sorted
+   uint64 segments that are memory-mapped, not loaded.
+3. Deduplicating a new batch of trips against the whole history with
+   binary searches, so the cost grows with the batch, not the history.
+4. Compaction (merge all segments into one) and a full rebuild, available
+   from Python and from the command line.
+5. `SeenHashes`, the same tiered sorted runs in memory, for one streaming
+   pass (lazy_frame.py, data_profiler.py).
+
+`df.drop_duplicates()` in 2_Data_Cleaning.ipynb rescans everything on each
+append; with the index only the new day of trips is read.
+
+Usage:
+    from dedup_index import RowHashIndex
+
+    index = RowHashIndex('trip_index')
+    new_rows = index.append(todays_trips)   # rows never seen before
+
+Command line:
+    python dedup_index.py append  trip_index new_trips.csv --output new_only.csv
+    python dedup_index.py rebuild trip_index history_*.csv
+    python dedup_index.py compact trip_index
+    python dedup_index.py stats   trip_index
+    python dedup_index.py check
+"""
+
+import argparse
+import io
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from streaming_loader import DEFAULT_CHUNKSIZE, UBER_COLUMNS, iter_chunks
+
+# ===============================================================
+# Section 1: Row Fingerprints
+# ===============================================================
+
+"""
+Rows are normalized before hashing so cosmetic differences do not hide
+duplicates, and so the fingerprint does not depend on the dtypes pandas
+happens to infer for a batch. Every column is turned into the same
+canonical values whatever its dtype:
+- numbers (int, float, bool, numeric objects, or text that parses as a
+  number) become float64, so 12, 12.0 and '12' hash alike whether the
+  column was inferred as numeric or as text;
+- other text is stripped of surrounding whitespace;
+- missing values (NaN, None, NaT, pd.NA) become None, so an all-missing
+  column parsed as float64 hashes like a missing string;
+- datetimes become their 'YYYY-MM-DD HH:MM:SS' text.
+Columns are put in a fixed order and each row becomes one 64-bit hash.
+With n stored rows the chance of any false duplicate is about
+n**2 / 2**65 (about 3e-6 for a billion rows).
+"""
+
+
+def canonical_values(values):
+    """Object array of canonical values for one column (see above)."""
+    values = pd.Series(values)
+    if pd.api.types.is_bool_dtype(values.dtype) or pd.api.types.is_numeric_dtype(values.dtype):
+        numbers = values.to_numpy(dtype='float64', na_value=np.nan)
+        canonical = numbers.astype(object)
+        canonical[np.isnan(numbers)] = None
+        return canonical
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        canonical = values.dt.strftime('%Y-%m-%d %H:%M:%S').to_numpy(dtype=object, copy=True)
+        canonical[values.isna().to_numpy()] = None
+        return canonical
+
+    values = values.astype(object)
+    missing = values.isna().to_numpy()
+    stripped = values.str.strip()
+    text = stripped.notna().to_numpy()
+    canonical = stripped.to_numpy(dtype=object, copy=True)
+    if text.any():
+        # Numeric-looking text, as in a column that one bad row turned into text
+        numbers = pd.to_numeric(stripped[text], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        numeric = ~np.isnan(numbers)
+        canonical[np.flatnonzero(text)[numeric]] = numbers[numeric]
+    others = ~text & ~missing
+    if others.any():
+        # Numbers (and booleans) stored in an object column
+        numbers = pd.to_numeric(values[others], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        canonical[others] = np.where(np.isnan(numbers), values[others].astype(str).to_numpy(), numbers)
+    canonical[missing] = None
+    return canonical
+
+
+def normalize_rows(df, columns=None):
+    """Canonical values of every column, in a fixed column order."""
+    columns = list(df.columns) if columns is None else list(columns)
+    # dtype=object keeps pandas from re-inferring a string dtype per batch
+    return pd.DataFrame({column: pd.Series(canonical_values(df[column]), dtype=object) for column in columns},
+                        columns=columns)
+
+
+def row_fingerprints(df, columns=None):
+    """One uint64 hash per row of `df`."""
+    if len(df) == 0:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_pandas_object(normalize_rows(df, columns), index=False).to_numpy()
+
+
+# ===============================================================
+# Section 2: The On-Disk Index
+# ===============================================================
+
+"""
+<directory>/
+    manifest.json    columns, segment file names, stored row count
+    seg-000001.npy   sorted, unique uint64 fingerprints
+    seg-000002.npy   ...
+
+Each append writes one small sorted segment. A lookup is one
+`np.searchsorted` per segment on memory-mapped arrays, touching
+O(batch * log(history)) pages.
+
+Segments are merged by size tier, like a binary counter: after an append,
+the newest segment is merged with the one before it while that one is no
+larger than it. Merging two sorted runs costs their combined size and a
+fingerprint is rewritten only when its segment at least doubles, so each
+append costs amortized O(batch * log(history / batch)). There are at most
+about log2(history / batch) segments and the whole history is never
+rewritten at once. An explicit `compact()` still merges everything into
+one segment on demand. Memory use is 8 bytes per distinct row on disk and
+only the touched pages in RAM.
+"""
+
+
+class RowHashIndex:
+    """Persistent set of row fingerprints stored as sorted segments."""
+
+    def __init__(self, directory, columns=None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        manifest_path = os.path.join(directory, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as file:
+                self.manifest = json.load(file)
+            if columns is not None and list(columns) != self.manifest['columns']:
+                raise ValueError(f"Index was built for columns {self.manifest['columns']}")
+        else:
+            self.manifest = {
+                'columns': list(columns) if columns is not None else list(UBER_COLUMNS),
+                'segments': [],
+                'rows': 0,
+                'next_segment': 1,
+            }
+            self._save_manifest()
+
+    @property
+    def columns(self):
+        """Columns that take part in the fingerprint."""
+        return self.manifest['columns']
+
+    def __len__(self):
+        return self.manifest['rows']
+
+    def _save_manifest(self):
+        """Writes manifest.json atomically."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.json')
+        with os.fdopen(fd, 'w') as file:
+            json.dump(self.manifest, file, indent=2)
+        os.replace(tmp_path, os.path.join(self.directory, 'manifest.json'))
+
+    def _segment(self, name):
+        """Memory-maps one segment."""
+        return np.load(os.path.join(self.directory, name), mmap_mode='r')
+
+    def _write_segment(self, hashes):
+        """Stores sorted unique hashes as a new segment and returns its name."""
+        name = f"seg-{self.manifest['next_segment']:06d}.npy"
+        self.manifest['next_segment'] += 1
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.npy')
+        with os.fdopen(fd, 'wb') as file:
+            np.save(file, hashes)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+        return name
+
+    # ---------------------------------------------------------------
+    # Lookups
+    # ---------------------------------------------------------------
+
+    def contains(self, hashes):
+        """Boolean mask of the hashes already stored in the index."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(hashes.shape, dtype=bool)
+        for name in self.manifest['segments']:
+            segment = self._segment(name)
+            if segment.size == 0:
+                continue
+            positions = np.searchsorted(segment, hashes)
+            hit = positions < segment.size
+            found[hit] |= segment[positions[hit]] == hashes[hit]
+        return found
+
+    def new_row_mask(self, batch):
+        """True for rows of `batch` that are neither in the index nor repeated earlier in the batch."""
+        hashes = row_fingerprints(batch, self.columns)
+        first_in_batch = ~pd.Series(hashes).duplicated().to_numpy()
+        return first_in_batch & ~self.contains(hashes)
+
+    def deduplicate(self, batch):
+        """Rows of `batch` not seen before (the index is not changed)."""
+        return batch[self.new_row_mask(batch)]
+
+    # ---------------------------------------------------------------
+    # Updates
+    # ---------------------------------------------------------------
+
+    def add(self, hashes):
+        """Stores fingerprints that are not in the index yet."""
+        hashes = np.unique(np.asarray(hashes, dtype=np.uint64))
+        hashes = hashes[~self.contains(hashes)]
+        if hashes.size == 0:
+            return 0
+        self.manifest['segments'].append(self._write_segment(hashes))
+        self.manifest['rows'] += int(hashes.size)
+        self._merge_tiers()
+        return int(hashes.size)
+
+    def _merge_tiers(self):
+        """Merges the newest segments while the previous one is no larger than the newest."""
+        segments = self.manifest['segments']
+        obsolete = []
+        while len(segments) >= 2:
+            older, newer = self._segment(segments[-2]), self._segment(segments[-1])
+            if older.size > newer.size:
+                break
+            # Stored segments are disjoint, so sorting the two runs is enough
+            merged = np.sort(np.concatenate([older, newer]), kind='stable')
+            obsolete += segments[-2:]
+            segments[-2:] = [self._write_segment(merged)]
+        # Old files are removed only after the manifest no longer lists them
+        self._save_manifest()
+        for name in obsolete:
+            os.remove(os.path.join(self.directory, name))
+
+    def append(self, batch):
+        """Deduplicates `batch` against the history, records it and returns the new rows."""
+        mask = self.new_row_mask(batch)
+        new_rows = batch[mask]
+        self.add(row_fingerprints(new_rows, self.columns))
+        return new_rows
+
+    def compact(self):
+        """Merges all segments into a single sorted segment."""
+        old_segments = list(self.manifest['segments'])
+        if len(old_segments) <= 1:
+            return
+        merged = np.unique(np.concatenate([np.asarray(self._segment(name)) for name in old_segments]))
+        self.manifest['segments'] = [self._write_segment(merged)]
+        self.manifest['rows'] = int(merged.size)
+        self._save_manifest()
+        for name in old_segments:
+            os.remove(os.path.join(self.directory, name))
+
+    def clear(self):
+        """Removes every stored fingerprint."""
+        old_segments = list(self.manifest['segments'])
+        self.manifest['segments'] = []
+        self.manifest['rows'] = 0
+        self._save_manifest()
+        for name in old_segments:
+            os.remove(os.path.join(self.directory, name))
+
+    def rebuild(self, chunks):
+        """Recreates the index from the full history (an iterable of DataFrame chunks)."""
+        self.clear()
+        for chunk in chunks:
+            self.add(row_fingerprints(chunk, self.columns))
+        self.compact()
+
+    def stats(self):
+        """Row count, segment count and bytes on disk."""
+        size = sum(os.path.getsize(os.path.join(self.directory, name))
+                   for name in self.manifest['segments'])
+        return {'rows': len(self), 'segments': len(self.manifest['segments']), 'bytes': size}
+
+
+class SeenHashes:
+    """
+    Fingerprints seen so far, as sorted runs merged by size tier.
+
+    The in-memory version of RowHashIndex: each chunk adds one sorted run,
+    and the newest run is merged with the one before it while that one is
+    no larger, so a chunk costs O(chunk * log(history)) instead of
+    re-sorting the whole history.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(run.size for run in self.runs)
+
+    def contains(self, hashes):
+        """Boolean mask of the hashes already seen."""
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.searchsorted(run, hashes)
+            hit = positions < run.size
+            found[hit] |= run[positions[hit]] == hashes[hit]
+        return found
+
+    def add(self, hashes):
+        """Records hashes that are distinct and not seen yet."""
+        if len(hashes) == 0:
+            return
+        self.runs.append(np.sort(hashes))
+        while len(self.runs) >= 2 and self.runs[-2].size <= self.runs[-1].size:
+            # Runs are disjoint, so sorting the two is enough
+            self.runs[-2:] = [np.sort(np.concatenate(self.runs[-2:]), kind='stable')]
+
+    def update(self, hashes):
+        """Records any hashes (repeats and known ones are skipped)."""
+        hashes = np.unique(np.asarray(hashes, dtype=np.uint64))
+        self.add(hashes[~self.contains(hashes)])
+
+    def union(self, other):
+        """A new set with the hashes of both; the larger set's runs are reused, not copied."""
+        large, small = (self, other) if len(self) >= len(other) else (other, self)
+        merged = SeenHashes()
+        merged.runs = list(large.runs)
+        for run in small.runs:
+            merged.update(run)
+        return merged
+
+
+# ===============================================================
+# Section 3: Command Line
+# ===============================================================
+
+
+def _iter_files(paths, chunksize):
+    """Chunks of several CSV files, one after another."""
+    for path in paths:
+        yield from iter_chunks(path, chunksize)
+
+
+def check_batch_dtypes(directory):
+    """Asserts that a row repeated across batches with different inferred dtypes is caught."""
+    first = pd.read_csv(io.StringIO("CATEGORY,MILES\nBusiness,12\nPersonal,5.5\n"))
+    second = pd.read_csv(io.StringIO("CATEGORY,MILES\nBusiness,12\nPersonal,unknown\n"))
+    assert first['MILES'].dtype.kind == 'f' and second['MILES'].dtype.kind != 'f'
+
+    index = RowHashIndex(directory, columns=['CATEGORY', 'MILES'])
+    index.clear()
+    index.append(first)
+    new_rows = index.append(second)
+    assert new_rows['MILES'].tolist() == ['unknown'], new_rows
+    return new_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Persistent row-hash index for trip files")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    append = commands.add_parser('append', help="deduplicate a CSV against the index and record it")
+    append.add_argument('directory')
+    append.add_argument('csv')
+    append.add_argument('--output', help="where to write the new rows (CSV)")
+    append.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+
+    rebuild = commands.add_parser('rebuild', help="recreate the index from history files")
+    rebuild.add_argument('directory')
+    rebuild.add_argument('csv', nargs='+')
+    rebuild.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+
+    compact = commands.add_parser('compact', help="merge all segments into one")
+    compact.add_argument('directory')
+
+    stats = commands.add_parser('stats', help="show index size")
+    stats.add_argument('directory')
+
+    check = commands.add_parser('check', help="verify fingerprints across batches with different dtypes")
+    check.add_argument('directory', nargs='?')
+
+    args = parser.parse_args(argv)
+    if args.command == 'check':
+        with tempfile.TemporaryDirectory() as directory:
+            new_rows = check_batch_dtypes(args.directory or directory)
+        print("Duplicate across a float and a text MILES batch dropped; new rows:", new_rows.to_dict('records'))
+        return
+    index = RowHashIndex(args.directory)
+
+    if args.command == 'append':
+        total = kept = 0
+        for chunk in iter_chunks(args.csv, args.chunksize):
+            new_rows = index.append(chunk)
+            if args.output:
+                new_rows.to_csv(args.output, mode='a' if kept else 'w', header=not kept, index=False)
+            total += len(chunk)
+            kept += len(new_rows)
+        print(f"{kept} new rows out of {total}")
+    elif args.command == 'rebuild':
+        index.rebuild(_iter_files(args.csv, args.chunksize))
+    elif args.command == 'compact':
+        index.compact()
+    print(index.stats())
+
+
+if __name__ == "__main__":
+    main()
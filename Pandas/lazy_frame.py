@@ -0,0 +1,663 @@
+"""
+===============================================================
+Pandas Tooling: Lazy Query Plans for the Cleaning Chain
+===============================================================
+
+This module covers:
+1. A lazy frame that records the cleaning steps of 2_Data_Cleaning.ipynb
+   (dropna, fillna, type conversion, drop_duplicates, filters, string
+   standardization, derived columns) as a plan instead of running them.
+2. A small expression language (`col('MILES') >= 3`) so the plan knows
+   which columns every step reads and writes.
+3. Three optimizer passes:
+   - predicate pushdown: row filters move towards the reader, past steps
+     that do not touch their columns, and are applied to each raw chunk,
+   - projection pruning: columns nobody reads are never parsed
+     (`usecols`) and steps whose output is unused are dropped,
+   - fusion: consecutive elementwise steps, and consecutive row filters,
+     run as one stage.
+4. Executing the optimized plan in a single streaming pass over chunks.
+5. `explain()` output and a peak-memory comparison with the eager notebook.
+
+The notebook keeps `df`, `df_dropped`, `df_filled`, `df_interpolated`,
+`df_no_duplicates` and `df_no_outliers` alive at once; the lazy plan holds
+one chunk plus the duplicate-row fingerprints.
+
+Usage:
+    from lazy_frame import LazyFrame, col
+
+    trips = (LazyFrame.scan_csv('UberDataset.csv')
+             .to_datetime('START_DATE')
+             .to_numeric('MILES')
+             .filter(col('CATEGORY') == 'Business')
+             .select(['START_DATE', 'MILES']))
+    print(trips.explain())
+    df = trips.collect()
+"""
+
+import operator
+import os
+
+import numpy as np
+import pandas as pd
+
+from category_normalize import StringNormalizer
+from dedup_index import SeenHashes, row_fingerprints
+from fast_datetime import parse_trip_datetimes
+from streaming_loader import DEFAULT_CHUNKSIZE
+
+# ===============================================================
+# Section 1: Column Expressions
+# ===============================================================
+
+
+class Expr:
+    """A vectorized expression over the columns of a chunk."""
+
+    columns = frozenset()
+
+    def evaluate(self, chunk):
+        raise NotImplementedError
+
+    def _binary(self, symbol, function, other):
+        return BinaryExpr(symbol, function, self, _as_expr(other))
+
+    def __eq__(self, other):
+        return self._binary('==', operator.eq, other)
+
+    def __ne__(self, other):
+        return self._binary('!=', operator.ne, other)
+
+    def __lt__(self, other):
+        return self._binary('<', operator.lt, other)
+
+    def __le__(self, other):
+        return self._binary('<=', operator.le, other)
+
+    def __gt__(self, other):
+        return self._binary('>', operator.gt, other)
+
+    def __ge__(self, other):
+        return self._binary('>=', operator.ge, other)
+
+    def __and__(self, other):
+        return self._binary('&', operator.and_, other)
+
+    def __or__(self, other):
+        return self._binary('|', operator.or_, other)
+
+    def __invert__(self):
+        return CallExpr('~', lambda values: ~values, self)
+
+    __hash__ = object.__hash__
+
+    def isin(self, values):
+        """True where the value is one of `values`."""
+        values = list(values)
+        return CallExpr(f"isin({values!r})", lambda series: series.isin(values), self)
+
+    def notna(self):
+        """True where the value is present."""
+        return CallExpr('notna()', lambda series: series.notna(), self)
+
+    def between(self, lower, upper):
+        """True where lower <= value <= upper."""
+        return (self >= lower) & (self <= upper)
+
+
+class Col(Expr):
+    """Reference to a column."""
+
+    def __init__(self, name):
+        self.name = name
+        self.columns = frozenset([name])
+
+    def evaluate(self, chunk):
+        return chunk[self.name]
+
+    def __repr__(self):
+        return f"col({self.name!r})"
+
+
+class Lit(Expr):
+    """A constant."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def evaluate(self, chunk):
+        return self.value
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+class BinaryExpr(Expr):
+    """Comparison or boolean combination of two expressions."""
+
+    def __init__(self, symbol, function, left, right):
+        self.symbol, self.function = symbol, function
+        self.left, self.right = left, right
+        self.columns = left.columns | right.columns
+
+    def evaluate(self, chunk):
+        return self.function(self.left.evaluate(chunk), self.right.evaluate(chunk))
+
+    def __repr__(self):
+        return f"({self.left!r} {self.symbol} {self.right!r})"
+
+
+class CallExpr(Expr):
+    """A method applied to one expression."""
+
+    def __init__(self, label, function, argument):
+        self.label, self.function, self.argument = label, function, argument
+        self.columns = argument.columns
+
+    def evaluate(self, chunk):
+        return self.function(self.argument.evaluate(chunk))
+
+    def __repr__(self):
+        if self.label == '~':
+            return f"~{self.argument!r}"
+        return f"{self.argument!r}.{self.label}"
+
+
+def col(name):
+    """Starts an expression on column `name`."""
+    return Col(name)
+
+
+def _as_expr(value):
+    """Wraps plain Python values as literals."""
+    return value if isinstance(value, Expr) else Lit(value)
+
+
+# ===============================================================
+# Section 2: Plan Nodes
+# ===============================================================
+
+"""
+Every node declares the columns it reads and writes and whether it is
+- row-local (keeps or drops whole rows, one row at a time), or
+- elementwise (rewrites columns row by row without dropping rows).
+The optimizer only needs those facts to reorder, prune and fuse.
+"""
+
+
+class Node:
+    """One recorded step."""
+
+    reads = frozenset()
+    writes = frozenset()
+    row_local = False
+    elementwise = False
+
+
+class Filter(Node):
+    """Keeps rows where `predicate` is true."""
+
+    row_local = True
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+        self.reads = predicate.columns
+
+    def mask(self, chunk):
+        return np.asarray(self.predicate.evaluate(chunk), dtype=bool)
+
+    def __repr__(self):
+        return f"Filter {self.predicate!r}"
+
+
+class DropNA(Node):
+    """Drops rows with a null in any of `subset`."""
+
+    row_local = True
+
+    def __init__(self, subset):
+        self.subset = list(subset)
+        self.reads = frozenset(subset)
+
+    def mask(self, chunk):
+        return chunk[self.subset].notna().all(axis=1).to_numpy()
+
+    def __repr__(self):
+        return f"DropNA subset={self.subset}"
+
+
+class Assign(Node):
+    """Elementwise rewrite of one column."""
+
+    elementwise = True
+
+    def __init__(self, target, inputs, function, label):
+        self.target = target
+        self.function = function
+        self.label = label
+        self.reads = frozenset(inputs)
+        self.writes = frozenset([target])
+
+    def apply(self, chunk):
+        chunk[self.target] = self.function(chunk)
+
+    def __repr__(self):
+        return self.label
+
+
+class DropDuplicates(Node):
+    """Keeps the first occurrence of each row across all chunks (fingerprints in SeenHashes)."""
+
+    def __init__(self, subset):
+        self.subset = list(subset)
+        self.reads = frozenset(subset)
+
+    def __repr__(self):
+        return f"DropDuplicates subset={self.subset}"
+
+
+class Select(Node):
+    """Keeps only `columns`, in that order."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.reads = frozenset(columns)
+
+    def __repr__(self):
+        return f"Select {self.columns}"
+
+
+class MaskStage(Node):
+    """Fused row filters: one combined mask, one copy."""
+
+    row_local = True
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.reads = frozenset().union(*(node.reads for node in nodes))
+
+    def mask(self, chunk):
+        mask = np.ones(len(chunk), dtype=bool)
+        for node in self.nodes:
+            mask &= node.mask(chunk)
+        return mask
+
+    def __repr__(self):
+        return "Mask[" + ", ".join(map(repr, self.nodes)) + "]"
+
+
+class FusedStage(Node):
+    """Fused elementwise steps, applied to the chunk in place."""
+
+    elementwise = True
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.reads = frozenset().union(*(node.reads for node in nodes))
+        self.writes = frozenset().union(*(node.writes for node in nodes))
+
+    def apply(self, chunk):
+        for node in self.nodes:
+            node.apply(chunk)
+
+    def __repr__(self):
+        return "Fused[" + ", ".join(map(repr, self.nodes)) + "]"
+
+
+# ===============================================================
+# Section 3: The Lazy Frame
+# ===============================================================
+
+
+class LazyFrame:
+    """A CSV scan plus a list of recorded steps."""
+
+    def __init__(self, path, columns, nodes=(), chunksize=DEFAULT_CHUNKSIZE):
+        self.path = path
+        self.source_columns = list(columns)
+        self.nodes = list(nodes)
+        self.chunksize = chunksize
+
+    @classmethod
+    def scan_csv(cls, path, chunksize=DEFAULT_CHUNKSIZE):
+        """Starts a plan; only the header is read now."""
+        return cls(path, pd.read_csv(path, nrows=0).columns, chunksize=chunksize)
+
+    def _then(self, node):
+        """New LazyFrame with one more step (plans are immutable)."""
+        return LazyFrame(self.path, self.source_columns, self.nodes + [node], self.chunksize)
+
+    @property
+    def columns(self):
+        """Columns available after the last recorded step."""
+        return _columns_after(self.source_columns, self.nodes)
+
+    # ---------------------------------------------------------------
+    # Recorded operations
+    # ---------------------------------------------------------------
+
+    def filter(self, predicate):
+        """Keeps rows where the expression is true."""
+        return self._then(Filter(predicate))
+
+    def dropna(self, subset=None):
+        """Drops rows with nulls in `subset` (all current columns by default)."""
+        return self._then(DropNA(subset if subset is not None else self.columns))
+
+    def fillna(self, value, columns=None):
+        """Fills nulls in `columns` (all current columns by default)."""
+        frame = self
+        for column in (columns if columns is not None else self.columns):
+            frame = frame._then(Assign(column, [column], lambda chunk, c=column: chunk[c].fillna(value),
+                                       f"FillNA {column}={value!r}"))
+        return frame
+
+    def to_datetime(self, column):
+        """Parses trip datetimes with the fixed-layout fast path."""
+        return self._then(Assign(column, [column], lambda chunk: parse_trip_datetimes(chunk[column]),
+                                 f"ToDatetime {column}"))
+
+    def to_numeric(self, column):
+        """Converts to numbers, coercing failures to NaN."""
+        return self._then(Assign(column, [column],
+                                 lambda chunk: pd.to_numeric(chunk[column], errors='coerce'),
+                                 f"ToNumeric {column}"))
+
+    def normalize(self, column, normalizer):
+        """Applies a StringNormalizer (category-level string operations)."""
+        steps = ".".join(name for name, _ in normalizer.steps)
+        return self._then(Assign(column, [column], lambda chunk: normalizer(chunk[column]),
+                                 f"Normalize {column} [{steps}]"))
+
+    def with_column(self, name, function, inputs, label=None):
+        """Adds or replaces `name` with function(chunk), which reads `inputs`."""
+        return self._then(Assign(name, inputs, function, label or f"WithColumn {name} <- {list(inputs)}"))
+
+    def drop_duplicates(self, subset=None):
+        """Drops repeated rows (all current columns by default)."""
+        return self._then(DropDuplicates(subset if subset is not None else self.columns))
+
+    def select(self, columns):
+        """Keeps only `columns`."""
+        return self._then(Select(columns))
+
+    # ---------------------------------------------------------------
+    # Optimizing and running
+    # ---------------------------------------------------------------
+
+    def optimize(self):
+        """Returns the physical plan: (usecols, pushed filters, stages)."""
+        nodes = _push_down_filters(self.nodes)
+        pushed = []
+        while nodes and isinstance(nodes[0], Filter):
+            pushed.append(nodes.pop(0))
+        nodes, usecols = _prune(self.source_columns, pushed, nodes)
+        return usecols, pushed, _fuse(nodes)
+
+    def explain(self):
+        """Logical plan and optimized plan as text."""
+        usecols, pushed, stages = self.optimize()
+        lines = ["== Logical plan ==", f"Scan {self.path!r} columns={self.source_columns}"]
+        lines += [f"  {node!r}" for node in self.nodes]
+        lines += ["", "== Optimized plan ==", f"Scan {self.path!r} usecols={usecols}"]
+        lines += [f"  pushed to reader: {node!r}" for node in pushed]
+        lines += [f"  {stage!r}" for stage in stages]
+        return "\n".join(lines)
+
+    def iter_chunks(self):
+        """Runs the optimized plan, yielding one result chunk at a time."""
+        usecols, pushed, stages = self.optimize()
+        scan_mask = MaskStage(pushed) if pushed else None
+        needed_after_scan = _columns_needed(stages, self.columns)
+        seen = {id(stage): SeenHashes() for stage in stages if isinstance(stage, DropDuplicates)}
+
+        with pd.read_csv(self.path, usecols=usecols, chunksize=self.chunksize) as reader:
+            for chunk in reader:
+                if scan_mask is not None:
+                    chunk = chunk.loc[scan_mask.mask(chunk), [c for c in usecols if c in needed_after_scan]]
+                for stage in stages:
+                    chunk = _run_stage(stage, chunk, seen)
+                    if chunk.empty:
+                        break
+                if not chunk.empty:
+                    yield chunk
+
+    def collect(self):
+        """Runs the plan and concatenates the result."""
+        chunks = list(self.iter_chunks())
+        if not chunks:
+            return pd.DataFrame(columns=self.columns)
+        return _concat_chunks(chunks)
+
+    def sink_csv(self, output_path):
+        """Runs the plan and writes the result to a CSV chunk by chunk."""
+        rows = 0
+        for chunk in self.iter_chunks():
+            chunk.to_csv(output_path, mode='a' if rows else 'w', header=not rows, index=False)
+            rows += len(chunk)
+        return rows
+
+
+# ===============================================================
+# Section 4: Optimizer Passes
+# ===============================================================
+
+
+def _columns_after(source_columns, nodes):
+    """Forward schema: the columns that exist after `nodes`."""
+    columns = list(source_columns)
+    for node in nodes:
+        if isinstance(node, Select):
+            columns = list(node.columns)
+        else:
+            columns += [column for column in sorted(node.writes) if column not in columns]
+    return columns
+
+
+def _can_swap(node, predicate_columns):
+    """True when a filter on `predicate_columns` may move in front of `node`."""
+    if node.row_local or isinstance(node, Select):
+        return True
+    if node.elementwise:
+        return not (node.writes & predicate_columns)
+    if isinstance(node, DropDuplicates):
+        # Duplicates agree on the subset, so a filter on it keeps or drops all copies
+        return predicate_columns <= node.reads
+    return False
+
+
+def _push_down_filters(nodes):
+    """Moves every Filter as early as it can legally go."""
+    nodes = list(nodes)
+    for index in range(len(nodes)):
+        if not isinstance(nodes[index], Filter):
+            continue
+        position = index
+        while position > 0 and _can_swap(nodes[position - 1], nodes[position].reads):
+            nodes[position - 1], nodes[position] = nodes[position], nodes[position - 1]
+            position -= 1
+    return nodes
+
+
+def _needed_before(node, needed):
+    """Columns that must exist before `node` so `needed` exists after it."""
+    if isinstance(node, Select):
+        return set(node.columns) & needed
+    if node.elementwise:
+        return (needed - (node.writes - node.reads)) | node.reads
+    return needed | node.reads
+
+
+def _columns_needed(nodes, output_columns):
+    """Columns that must exist before `nodes` to produce `output_columns`."""
+    needed = set(output_columns)
+    for node in reversed(nodes):
+        needed = _needed_before(node, needed)
+    return needed
+
+
+def _prune(source_columns, pushed, nodes):
+    """Drops elementwise steps whose output is unused and computes usecols."""
+    needed = set(_columns_after(source_columns, nodes))
+    kept = []
+    for node in reversed(nodes):
+        if node.elementwise and not (node.writes & needed):
+            continue
+        needed = _needed_before(node, needed)
+        kept.append(node)
+    kept.reverse()
+
+    for node in pushed:
+        needed |= node.reads
+    usecols = [column for column in source_columns if column in needed]
+    return kept, usecols
+
+
+def _fuse(nodes):
+    """Groups runs of row filters and runs of elementwise steps."""
+    stages = []
+    for node in nodes:
+        previous = stages[-1] if stages else None
+        if isinstance(node, (Filter, DropNA)):
+            if isinstance(previous, MaskStage):
+                previous.nodes.append(node)
+                previous.reads = previous.reads | node.reads
+            else:
+                stages.append(MaskStage([node]))
+        elif isinstance(node, Assign):
+            if isinstance(previous, FusedStage):
+                previous.nodes.append(node)
+                previous.reads = previous.reads | node.reads
+                previous.writes = previous.writes | node.writes
+            else:
+                stages.append(FusedStage([node]))
+        else:
+            stages.append(node)
+    return stages
+
+
+def _concat_chunks(chunks):
+    """
+    Concatenates result chunks, keeping categorical columns categorical.
+
+    Each chunk's categorical has only the categories of that chunk, and
+    pd.concat falls back to object when they differ, so the categories of
+    such columns are unioned first.
+    """
+    from pandas.api.types import union_categoricals
+
+    combined = pd.concat(chunks)
+    for column in chunks[0].columns:
+        if all(isinstance(chunk[column].dtype, pd.CategoricalDtype) for chunk in chunks):
+            values = union_categoricals([chunk[column] for chunk in chunks])
+            combined[column] = pd.Categorical(values, categories=values.categories)
+    return combined
+
+
+def _run_stage(stage, chunk, seen):
+    """Applies one physical stage to a chunk."""
+    if isinstance(stage, MaskStage):
+        return chunk[stage.mask(chunk)]
+    if isinstance(stage, FusedStage):
+        chunk = chunk.copy()
+        stage.apply(chunk)
+        return chunk
+    if isinstance(stage, DropDuplicates):
+        # Canonical fingerprints: the same row hashes alike whatever dtypes its chunk was parsed with
+        hashes = row_fingerprints(chunk, stage.subset)
+        fresh = ~pd.Series(hashes).duplicated().to_numpy() & ~seen[id(stage)].contains(hashes)
+        seen[id(stage)].add(hashes[fresh])
+        return chunk[fresh]
+    if isinstance(stage, Select):
+        return chunk[stage.columns]
+    raise TypeError(f"Unknown stage {stage!r}")
+
+
+# ===============================================================
+# Section 5: Peak Memory Against the Eager Notebook
+# ===============================================================
+
+
+def eager_notebook_chain(path, lower, upper):
+    """The notebook's steps, each producing a full copy."""
+    df = pd.read_csv(path)
+    df_dropped = df.dropna()
+    df_filled = df.fillna('Unknown')
+    df_no_duplicates = df.drop_duplicates()
+    df['START_DATE'] = pd.to_datetime(df['START_DATE'], errors='coerce', format='mixed')
+    df['MILES'] = pd.to_numeric(df['MILES'], errors='coerce')
+    df_no_outliers = df[(df['MILES'] >= lower) & (df['MILES'] <= upper)]
+    df['CATEGORY'] = df['CATEGORY'].str.strip().str.lower()
+    df['PURPOSE'] = df['PURPOSE'].str.replace('/', ' & ', regex=False)
+    df['END_DATE'] = pd.to_datetime(df['END_DATE'], errors='coerce', format='mixed')
+    df['YEAR'] = df['START_DATE'].dt.year
+    df['MONTH'] = df['START_DATE'].dt.month
+    return df, df_dropped, df_filled, df_no_duplicates, df_no_outliers
+
+
+def cleaning_plan(path, lower, upper, chunksize=DEFAULT_CHUNKSIZE):
+    """The same chain as a lazy plan."""
+    return (LazyFrame.scan_csv(path, chunksize)
+            .to_datetime('START_DATE')
+            .to_numeric('MILES')
+            .dropna(['START_DATE', 'END_DATE', 'CATEGORY', 'START', 'STOP', 'MILES'])
+            .fillna('Unknown', ['PURPOSE'])
+            .drop_duplicates()
+            .filter(col('MILES').between(lower, upper))
+            .normalize('CATEGORY', StringNormalizer().strip().lower())
+            .normalize('PURPOSE', StringNormalizer().replace('/', ' & '))
+            .to_datetime('END_DATE')
+            .with_column('YEAR', lambda chunk: chunk['START_DATE'].dt.year, ['START_DATE'])
+            .with_column('MONTH', lambda chunk: chunk['START_DATE'].dt.month, ['START_DATE']))
+
+
+def compare_peak_memory(path, lower, upper, chunksize=DEFAULT_CHUNKSIZE):
+    """Peak traced allocations (bytes) of the eager notebook and the lazy plan."""
+    import tracemalloc
+
+    def peak(function):
+        tracemalloc.start()
+        function()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak_bytes
+
+    eager = peak(lambda: eager_notebook_chain(path, lower, upper))
+    lazy = peak(lambda: cleaning_plan(path, lower, upper, chunksize).sink_csv(os.devnull))
+    return {'eager_bytes': eager, 'lazy_bytes': lazy, 'ratio': eager / lazy if lazy else np.inf}
+
+
+# ===============================================================
+# Section 6: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    import tempfile
+
+    from quantile_sketch import iqr_bounds
+    from streaming_loader import UBER_CSV, iter_chunks
+
+    bounds = iqr_bounds(iter_chunks(UBER_CSV))
+
+    # A query that only needs a few columns: pruning and pushdown kick in
+    business_miles = (LazyFrame.scan_csv(UBER_CSV, chunksize=300)
+                      .to_datetime('START_DATE')
+                      .to_datetime('END_DATE')
+                      .to_numeric('MILES')
+                      .normalize('PURPOSE', StringNormalizer().replace('/', ' & '))
+                      .filter(col('CATEGORY') == 'Business')
+                      .filter(col('MILES').between(bounds['lower'], bounds['upper']))
+                      .with_column('MONTH', lambda chunk: chunk['START_DATE'].dt.month, ['START_DATE'])
+                      .select(['MONTH', 'MILES']))
+    print(business_miles.explain())
+    print(business_miles.collect().groupby('MONTH')['MILES'].sum().head())
+
+    # The full cleaning chain, and its memory against the eager notebook
+    print()
+    print(cleaning_plan(UBER_CSV, bounds['lower'], bounds['upper']).explain())
+
+    scratch = os.path.join(tempfile.mkdtemp(), 'UberDataset.csv')
+    pd.concat([pd.read_csv(UBER_CSV)] * 50).to_csv(scratch, index=False)
+    memory = compare_peak_memory(scratch, bounds['lower'], bounds['upper'], chunksize=5_000)
+    print(f"\nPeak memory, eager notebook: {memory['eager_bytes'] / 1e6:.1f} MB")
+    print(f"Peak memory, lazy plan:      {memory['lazy_bytes'] / 1e6:.1f} MB")
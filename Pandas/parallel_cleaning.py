@@ -0,0 +1,299 @@
+"""
+===============================================================
+Pandas Tooling: Month-Partitioned Parallel Cleaning Pipeline
+===============================================================
+
+This module covers:
+1. The cleaning chain from 2_Data_Cleaning.ipynb as two reusable steps:
+   - prepare: type conversion, dropna/fillna, drop_duplicates,
+   - finish:  IQR outlier filter, string standardization, YEAR/MONTH.
+2. Splitting a trip file into YEAR/MONTH partitions by START_DATE.
+3. Running both steps per partition on a `ProcessPoolExecutor`.
+4. A two-phase scheme for the one global statistic (the IQR bounds):
+   phase 1 prepares every partition and returns its MILES values, the
+   parent computes Q1/Q3, phase 2 applies the same bounds everywhere.
+5. Partitioned output that is merged lazily.
+
+Duplicate rows always share a START_DATE and therefore a partition, so
+per-partition deduplication equals global deduplication, and the result
+matches `clean_trips()` on the whole file exactly.
+
+Usage:
+    from parallel_cleaning import clean_partitioned
+
+    result = clean_partitioned('UberDataset.csv', 'cleaned_trips')
+    january = result.load(2016, 1)
+    everything = result.collect()
+"""
+
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from category_normalize import StringNormalizer
+from dataset_cache import read_entry, write_entry
+from fast_datetime import parse_trip_datetimes
+from quantile_sketch import DEFAULT_K, KLLSketch
+from streaming_loader import CATEGORICAL_COLUMNS, DEFAULT_CHUNKSIZE, UBER_COLUMNS, iter_chunks
+
+# ===============================================================
+# Section 1: The Cleaning Chain
+# ===============================================================
+
+REQUIRED_COLUMNS = ['START_DATE', 'END_DATE', 'CATEGORY', 'START', 'STOP', 'MILES']
+ROW_ID = '_row'
+
+CATEGORY_NORMALIZER = StringNormalizer().strip().lower()
+PURPOSE_NORMALIZER = StringNormalizer().replace('/', ' & ')
+
+PREPARED_SCHEMA = {
+    'START_DATE': 'datetime', 'END_DATE': 'datetime',
+    'CATEGORY': 'string', 'START': 'string', 'STOP': 'string', 'PURPOSE': 'string',
+    'MILES': 'float64', ROW_ID: 'int64',
+}
+CLEANED_SCHEMA = dict(PREPARED_SCHEMA, CATEGORY='category', PURPOSE='category',
+                      YEAR='int64', MONTH='int64')
+
+
+def prepare(df):
+    """Type conversion, missing values and duplicates (row-local steps)."""
+    df = df.copy()
+    df['START_DATE'] = parse_trip_datetimes(df['START_DATE'])
+    df['END_DATE'] = parse_trip_datetimes(df['END_DATE'])
+    df['MILES'] = pd.to_numeric(df['MILES'], errors='coerce')
+    df = df.dropna(subset=REQUIRED_COLUMNS)
+    df['PURPOSE'] = df['PURPOSE'].fillna('Unknown')
+    return df.drop_duplicates(subset=UBER_COLUMNS)
+
+
+def iqr_from_values(miles, whisker=1.5):
+    """Exact IQR bounds, computed like `Series.quantile` does."""
+    q1, q3 = np.quantile(miles, [0.25, 0.75])
+    iqr = q3 - q1
+    return float(q1 - whisker * iqr), float(q3 + whisker * iqr)
+
+
+def finish(df, lower, upper):
+    """Outlier filter, string standardization and feature extraction."""
+    df = df[(df['MILES'] >= lower) & (df['MILES'] <= upper)].copy()
+    df['CATEGORY'] = CATEGORY_NORMALIZER(df['CATEGORY'])
+    df['PURPOSE'] = PURPOSE_NORMALIZER(df['PURPOSE'])
+    df['YEAR'] = df['START_DATE'].dt.year.astype('int64')
+    df['MONTH'] = df['START_DATE'].dt.month.astype('int64')
+    return df
+
+
+def clean_trips(df, whisker=1.5):
+    """Single-process reference: the whole chain on one DataFrame."""
+    prepared = prepare(df)
+    lower, upper = iqr_from_values(prepared['MILES'].to_numpy(), whisker)
+    return finish(prepared, lower, upper)
+
+
+# ===============================================================
+# Section 2: Partitioning the Input
+# ===============================================================
+
+
+def partition_key(start_dates):
+    """YEAR * 100 + MONTH for each parsed START_DATE (-1 when unparseable)."""
+    parsed = parse_trip_datetimes(start_dates)
+    keys = parsed.dt.year * 100 + parsed.dt.month
+    return keys.fillna(-1).astype('int64')
+
+
+def split_by_month(path, staging_dir, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Streams `path` and appends each row to staging/<YYYYMM>.csv.
+
+    Values are kept as the original text (dtype=str) so every partition
+    parses exactly like the whole file would. Rows whose START_DATE cannot
+    be parsed are skipped: `prepare` would drop them anyway.
+    """
+    os.makedirs(staging_dir, exist_ok=True)
+    written = set()
+    offset = 0
+    for chunk in iter_chunks(path, chunksize, dtype=str):
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk), name=ROW_ID)
+        offset += len(chunk)
+        for key, rows in chunk.groupby(partition_key(chunk['START_DATE']).to_numpy(), sort=False):
+            if key < 0:
+                continue
+            staging_path = os.path.join(staging_dir, f"{key}.csv")
+            rows.to_csv(staging_path, mode='a' if key in written else 'w', header=key not in written)
+            written.add(key)
+    return sorted(written)
+
+
+# ===============================================================
+# Section 3: Per-Partition Workers
+# ===============================================================
+
+
+def _partition_dir(output_dir, key):
+    """Hive-style directory for one partition."""
+    return os.path.join(output_dir, f"YEAR={key // 100}", f"MONTH={key % 100:02d}")
+
+
+def _prepare_partition(args):
+    """Phase 1 worker: prepares one partition and returns its MILES summary."""
+    staging_dir, prepared_dir, key, exact, k = args
+    raw = pd.read_csv(os.path.join(staging_dir, f"{key}.csv"), dtype=str, index_col=ROW_ID)
+    prepared = prepare(raw)
+    prepared[ROW_ID] = prepared.index.to_numpy(dtype='int64')
+    write_entry(prepared.reset_index(drop=True), PREPARED_SCHEMA,
+                os.path.join(prepared_dir, str(key)), str(key))
+
+    miles = prepared['MILES'].to_numpy(dtype='float64')
+    return miles if exact else KLLSketch(k, seed=key).update(miles)
+
+
+def _finish_partition(args):
+    """Phase 2 worker: applies the global bounds and writes the partition."""
+    prepared_dir, output_dir, key, lower, upper = args
+    prepared = read_entry(os.path.join(prepared_dir, str(key)))
+    cleaned = finish(prepared, lower, upper)
+    write_entry(cleaned.reset_index(drop=True), CLEANED_SCHEMA, _partition_dir(output_dir, key), str(key))
+    return key, len(cleaned)
+
+
+# ===============================================================
+# Section 4: Lazily Merged Output
+# ===============================================================
+
+
+class PartitionedTrips:
+    """Cleaned trips stored as YEAR=/MONTH= partitions; nothing is loaded up front."""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+
+    def keys(self):
+        """(year, month) of every stored partition, in order."""
+        found = []
+        for year_dir in sorted(os.listdir(self.output_dir)):
+            if not year_dir.startswith('YEAR='):
+                continue
+            for month_dir in sorted(os.listdir(os.path.join(self.output_dir, year_dir))):
+                if month_dir.startswith('MONTH='):
+                    found.append((int(year_dir[5:]), int(month_dir[6:])))
+        return found
+
+    def load(self, year, month, columns=None):
+        """One partition as a DataFrame indexed by the original row number."""
+        frame = read_entry(_partition_dir(self.output_dir, year * 100 + month), columns)
+        if ROW_ID in frame.columns:
+            frame = frame.set_index(ROW_ID).rename_axis(None)
+        return frame
+
+    def iter_partitions(self, columns=None):
+        """Yields ((year, month), DataFrame) one partition at a time."""
+        for year, month in self.keys():
+            yield (year, month), self.load(year, month, columns)
+
+    def collect(self, columns=None):
+        """All partitions concatenated back into original row order."""
+        frames = [frame for _, frame in self.iter_partitions(columns)]
+        merged = pd.concat(frames).sort_index()
+        for column in ('CATEGORY', 'PURPOSE'):
+            if column in merged.columns:
+                merged[column] = merged[column].astype('category')
+        return merged
+
+
+# ===============================================================
+# Section 5: Running the Pipeline
+# ===============================================================
+
+
+OUTPUT_MARKER = '_partitioned.json'
+
+
+def _clear_output(output_dir, overwrite):
+    """Removes a previous output; refuses any other non-empty directory."""
+    if not os.path.exists(output_dir):
+        return
+    if not os.path.isdir(output_dir):
+        raise FileExistsError(f"{output_dir} exists and is not a directory")
+    previous = os.path.exists(os.path.join(output_dir, OUTPUT_MARKER))
+    if os.listdir(output_dir) and not (previous or overwrite):
+        raise FileExistsError(f"{output_dir} is not empty and not a previous clean_partitioned output; "
+                              "pass overwrite=True to replace it")
+    shutil.rmtree(output_dir)
+
+
+def clean_partitioned(path, output_dir, workers=None, chunksize=DEFAULT_CHUNKSIZE, whisker=1.5,
+                      exact=True, k=DEFAULT_K, overwrite=False):
+    """
+    Runs the cleaning chain per YEAR/MONTH partition on a process pool.
+
+    With `exact=True` phase 1 returns each partition's MILES values (8 bytes
+    per row) and Q1/Q3 match the single-process result exactly. With
+    `exact=False` each partition returns a KLL sketch instead, so the parent
+    only ever holds a few thousand values.
+
+    An existing output_dir is replaced only if it is empty, holds a previous
+    output (marked by OUTPUT_MARKER, written before any partition) or
+    `overwrite=True` is passed.
+    """
+    _clear_output(output_dir, overwrite)
+    os.makedirs(output_dir)
+    with open(os.path.join(output_dir, OUTPUT_MARKER), 'w') as file:
+        json.dump({'source': os.fspath(path), 'whisker': whisker, 'exact': exact}, file)
+    staging_dir = os.path.join(output_dir, '_staging')
+    prepared_dir = os.path.join(output_dir, '_prepared')
+
+    keys = split_by_month(path, staging_dir, chunksize)
+    if not keys:
+        raise ValueError(f"No rows with a valid START_DATE in {path}")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        summaries = list(pool.map(_prepare_partition,
+                                  [(staging_dir, prepared_dir, key, exact, k) for key in keys]))
+        if exact:
+            lower, upper = iqr_from_values(np.concatenate(summaries), whisker)
+        else:
+            sketch = summaries[0]
+            for other in summaries[1:]:
+                sketch = sketch.merge(other)
+            q1, q3 = sketch.quantile([0.25, 0.75])
+            lower, upper = q1 - whisker * (q3 - q1), q3 + whisker * (q3 - q1)
+
+        list(pool.map(_finish_partition,
+                      [(prepared_dir, output_dir, key, lower, upper) for key in keys]))
+
+    shutil.rmtree(staging_dir)
+    shutil.rmtree(prepared_dir)
+    return PartitionedTrips(output_dir)
+
+
+def as_plain_frame(df):
+    """Categoricals as plain objects, for comparing results."""
+    df = df.copy()
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype) or column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype(object)
+    return df
+
+
+# ===============================================================
+# Section 6: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    import tempfile
+
+    from streaming_loader import UBER_CSV
+
+    output_dir = os.path.join(tempfile.gettempdir(), 'cleaned_trips')
+    result = clean_partitioned(UBER_CSV, output_dir, workers=4, chunksize=200)
+    print("Partitions:", result.keys()[:3], "...")
+    print(result.load(2016, 1)[['START_DATE', 'CATEGORY', 'PURPOSE', 'MILES', 'MONTH']].head())
+
+    reference = clean_trips(pd.read_csv(UBER_CSV, dtype=str))
+    parallel = result.collect()
+    pd.testing.assert_frame_equal(as_plain_frame(parallel), as_plain_frame(reference), check_dtype=False)
+    print("\nMatches the single-process chain:", parallel.shape)
@@ -0,0 +1,257 @@
+"""
+===============================================================
+Pandas Tooling: Quantile Sketches and an Out-of-Core IQR Filter
+===============================================================
+
+This module covers:
+1. A mergeable KLL quantile sketch with configurable accuracy.
+2. Its error bounds and memory footprint.
+3. The IQR outlier step from 2_Data_Cleaning.ipynb as two streaming passes:
+   - pass 1 feeds MILES chunk by chunk into the sketch to get Q1/Q3,
+   - pass 2 streams the file again and keeps rows inside the bounds.
+
+Neither pass holds more than one chunk plus the sketch, so filtering a
+500M-row MILES column needs a few hundred KB instead of several GB.
+
+Usage:
+    from quantile_sketch import filter_outliers
+
+    result = filter_outliers('UberDataset.csv', 'UberDataset_no_outliers.csv')
+"""
+
+import numpy as np
+import pandas as pd
+
+from streaming_loader import DEFAULT_CHUNKSIZE, UBER_CSV, iter_chunks
+
+# ===============================================================
+# Section 1: The KLL Sketch
+# ===============================================================
+
+"""
+KLL (Karnin, Lang & Liberty, 2016) keeps a stack of "compactors". Level h
+holds items that each stand for 2**h original values. When a level grows
+past its capacity it is sorted and every other item (random odd/even
+offset) is promoted to the next level, halving its size. Capacities shrink
+by a factor of 2/3 per level below the top, so the total footprint is about
+3k items regardless of how many values were added.
+
+Error bounds:
+- The normalized rank error of a quantile query is about
+      epsilon(k) = 2.296 / k ** 0.9723
+  with ~99% confidence (the constant comes from the Apache DataSketches
+  KLL implementation). k=200 gives ~1.3%, k=1000 gives ~0.3%.
+- The error is on ranks: the returned Q1 has a true rank within
+  0.25 +/- epsilon of the data.
+- Until the first compaction (fewer than k values) the sketch holds every
+  value and quantiles are exact, with the same linear interpolation as
+  `Series.quantile`.
+- Merging sketches keeps the same guarantee as sketching the combined data.
+"""
+
+DEFAULT_K = 200
+CAPACITY_DECAY = 2.0 / 3.0
+MIN_CAPACITY = 2
+
+
+def rank_error(k):
+    """Normalized rank error of a KLL sketch with parameter k (~99% confidence)."""
+    return 2.296 / k ** 0.9723
+
+
+class KLLSketch:
+    """Mergeable streaming quantile sketch."""
+
+    def __init__(self, k=DEFAULT_K, seed=None):
+        if k < MIN_CAPACITY:
+            raise ValueError(f"k must be at least {MIN_CAPACITY}")
+        self.k = k
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        """Capacity of `level` given the current height of the stack."""
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * CAPACITY_DECAY ** depth)), MIN_CAPACITY)
+
+    def _compress(self):
+        """Compacts every level that is over capacity, bottom-up."""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind so no weight is lost
+                keep = items[:1] if len(items) % 2 else items[:0]
+                pairs = items[len(keep):]
+                promoted = pairs[self.rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        """Adds an array of values (NaN is ignored)."""
+        values = np.asarray(values, dtype='float64').ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.count += int(values.size)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Combines two sketches into a new one."""
+        merged = KLLSketch(min(self.k, other.k))
+        merged.rng = self.rng
+        merged.count = self.count + other.count
+        merged.min = min(self.min, other.min)
+        merged.max = max(self.max, other.max)
+        height = max(len(self.levels), len(other.levels))
+        merged.levels = [
+            np.concatenate([
+                self.levels[level] if level < len(self.levels) else np.empty(0),
+                other.levels[level] if level < len(other.levels) else np.empty(0),
+            ])
+            for level in range(height)
+        ]
+        merged._compress()
+        return merged
+
+    @property
+    def is_exact(self):
+        """True while no compaction has happened."""
+        return all(len(items) == 0 for items in self.levels[1:])
+
+    @property
+    def retained(self):
+        """Number of items currently stored."""
+        return sum(len(items) for items in self.levels)
+
+    @property
+    def error_bound(self):
+        """Normalized rank error of quantile answers (0 while exact)."""
+        return 0.0 if self.is_exact else rank_error(self.k)
+
+    def quantile(self, q):
+        """Estimated q-quantile (a scalar or an array of quantiles)."""
+        if self.count == 0:
+            return np.nan if np.isscalar(q) else np.full(np.shape(q), np.nan)
+        if self.is_exact:
+            return np.quantile(self.levels[0], q)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2.0 ** level)
+                                  for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+
+        ranks = np.asarray(q, dtype='float64') * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(items) - 1)
+        answer = np.clip(items[positions], self.min, self.max)
+        return float(answer) if np.isscalar(q) else answer
+
+
+# ===============================================================
+# Section 2: Out-of-Core IQR Outlier Filter
+# ===============================================================
+
+
+def iqr_bounds(chunks, column='MILES', k=DEFAULT_K, whisker=1.5, seed=None):
+    """
+    Pass 1: sketches `column` over an iterable of chunks.
+
+    Returns a dict with q1, q3, iqr, lower, upper, the sketch and its error bound.
+    """
+    sketch = KLLSketch(k, seed)
+    for chunk in chunks:
+        sketch.update(pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype='float64', na_value=np.nan))
+
+    q1, q3 = sketch.quantile([0.25, 0.75])
+    iqr = q3 - q1
+    return {
+        'q1': float(q1),
+        'q3': float(q3),
+        'iqr': float(iqr),
+        'lower': float(q1 - whisker * iqr),
+        'upper': float(q3 + whisker * iqr),
+        'rank_error': sketch.error_bound,
+        'sketch': sketch,
+    }
+
+
+def within_bounds(chunk, lower, upper, column='MILES'):
+    """Rows of one chunk with lower <= column <= upper (NaN is dropped, as in the notebook)."""
+    values = pd.to_numeric(chunk[column], errors='coerce')
+    return chunk[(values >= lower) & (values <= upper)]
+
+
+def filter_chunks(chunks, lower, upper, column='MILES'):
+    """Pass 2: yields each chunk restricted to the bounds."""
+    for chunk in chunks:
+        yield within_bounds(chunk, lower, upper, column)
+
+
+def filter_outliers(path=UBER_CSV, output_path=None, column='MILES', chunksize=DEFAULT_CHUNKSIZE,
+                    k=DEFAULT_K, whisker=1.5, seed=None, **read_csv_kwargs):
+    """
+    Streams `path` twice to drop IQR outliers in `column`.
+
+    The kept rows are appended to `output_path` (a CSV) when given. Returns
+    the bounds from pass 1 plus the row counts before and after filtering.
+    """
+    bounds = iqr_bounds(iter_chunks(path, chunksize, **read_csv_kwargs), column, k, whisker, seed)
+
+    rows_in = rows_out = 0
+    write_header = True
+    for chunk in iter_chunks(path, chunksize, **read_csv_kwargs):
+        kept = within_bounds(chunk, bounds['lower'], bounds['upper'], column)
+        rows_in += len(chunk)
+        rows_out += len(kept)
+        if output_path is not None:
+            kept.to_csv(output_path, mode='w' if write_header else 'a', header=write_header, index=False)
+            write_header = False
+
+    bounds.update(rows_in=rows_in, rows_out=rows_out)
+    return bounds
+
+
+# ===============================================================
+# Section 3: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    # Exact for the small course dataset: same bounds as the notebook
+    result = filter_outliers(UBER_CSV, chunksize=200, k=2000)
+    print("Q1, Q3:", result['q1'], result['q3'])              # Output: Q1, Q3: 2.9 10.4
+    print("Bounds:", result['lower'], result['upper'])        # Output: Bounds: -8.35 21.65
+    print("Rows before/after:", result['rows_in'], result['rows_out'])
+
+    df = pd.read_csv(UBER_CSV)
+    Q1, Q3 = df['MILES'].quantile(0.25), df['MILES'].quantile(0.75)
+    IQR = Q3 - Q1
+    expected = df[(df['MILES'] >= Q1 - 1.5 * IQR) & (df['MILES'] <= Q3 + 1.5 * IQR)]
+    print("Matches the in-memory filter:", len(expected) == result['rows_out'])
+
+    # Accuracy and footprint at scale
+    rng = np.random.default_rng(0)
+    sketch = KLLSketch(k=200, seed=0)
+    exact = []
+    for _ in range(20):
+        miles = rng.lognormal(mean=2.0, sigma=1.0, size=500_000)
+        sketch.update(miles)
+        exact.append(miles)
+    exact = np.concatenate(exact)
+
+    for q in (0.25, 0.75):
+        estimate = sketch.quantile(q)
+        true_rank = np.mean(exact <= estimate)
+        print(f"q={q}: estimate={estimate:.3f}, true rank={true_rank:.4f}, bound=+/-{sketch.error_bound:.4f}")
+    print(f"Values seen: {sketch.count:,}, items retained: {sketch.retained}")
@@ -0,0 +1,448 @@
+"""
+===============================================================
+Pandas Tooling: Heavy-Hitter Sketches for Spotify History
+===============================================================
+
+This module covers:
+1. A weighted Space-Saving summary: a fixed number of counters that finds
+   the top keys by total weight, with a lower and an upper bound per key.
+2. A Count-Min sketch with a candidate set: fixed-size hashed counters
+   for point estimates, plus the current top candidates.
+3. An exact counter with the same interface, for validating the sketches
+   on small inputs.
+4. `HeavyHitters`, an aggregator keyed on a column (artist_name) or on the
+   128-bit track id of spotify_ingest.py, weighted by a column
+   (ms_played, skipped) or by play count. `top_artists` and
+   `most_skipped_tracks` build on it.
+
+All three are mergeable: summaries built from different files or in
+different processes combine into the summary of all the data, with the
+same guarantees. Each chunk is first reduced to one weight per distinct
+key (factorize + bincount), so the per-row work is vectorized and the
+sketches only see distinct keys.
+
+Usage:
+    from spotify_heavy_hitters import top_artists, most_skipped_tracks
+
+    artists = top_artists(chunks, n=10)                # Space-Saving by default
+    tracks = most_skipped_tracks(chunks, n=10, method='count-min')
+    exact = top_artists(small_chunks, n=10, method='exact')
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CAPACITY = 1_000
+
+# ===============================================================
+# Section 1: Reducing a Chunk to Weights per Key
+# ===============================================================
+
+
+def track_keys(high, low):
+    """128-bit integer keys from the two uint64 words of a track id."""
+    return (np.asarray(high, dtype='uint64').astype(object) << 64) | np.asarray(low, dtype='uint64').astype(object)
+
+
+def track_key_uris(keys):
+    """`spotify:track:` URIs of 128-bit track keys."""
+    from spotify_ingest import encode_track_ids
+
+    keys = [int(key) for key in keys]
+    high = np.array([key >> 64 for key in keys], dtype='uint64')
+    low = np.array([key & 0xFFFFFFFFFFFFFFFF for key in keys], dtype='uint64')
+    return encode_track_ids(high, low)
+
+
+def aggregate(keys, weights=None):
+    """
+    (distinct keys, summed weights) of one batch; missing keys are dropped.
+
+    `keys` is a 1D array-like (strings, categoricals, integers) or a pair
+    (high, low) of uint64 track-id words, whose zero id marks an invalid URI.
+    """
+    if isinstance(keys, tuple):
+        high, low = (np.asarray(words, dtype='uint64') for words in keys)
+        weights = np.ones(len(high)) if weights is None else np.asarray(weights, dtype='float64')
+        valid = (high != 0) | (low != 0)
+        sums = pd.Series(weights[valid]).groupby([high[valid], low[valid]], sort=False).sum()
+        return track_keys(sums.index.get_level_values(0), sums.index.get_level_values(1)), sums.to_numpy()
+
+    codes, uniques = pd.factorize(keys)
+    weights = np.ones(len(codes)) if weights is None else np.asarray(weights, dtype='float64')
+    valid = codes >= 0
+    sums = np.bincount(codes[valid], weights=weights[valid], minlength=len(uniques))
+    return np.asarray(uniques, dtype=object), sums
+
+
+def _top_table(keys, estimates, lower, upper, n, max_error):
+    """The n keys with the largest estimates, with their bounds."""
+    table = pd.DataFrame({'key': keys, 'estimate': estimates, 'lower': lower, 'upper': upper})
+    table = table.sort_values('estimate', ascending=False, kind='stable').reset_index(drop=True)
+    # A key is surely in the true top n if its lower bound beats every upper bound outside
+    outside = table['upper'].iloc[n] if len(table) > n else 0.0
+    top = table.head(n).copy()
+    top['guaranteed'] = top['lower'] >= max(outside, max_error)
+    top['max_error'] = max_error
+    return top
+
+
+# ===============================================================
+# Section 2: Weighted Space-Saving
+# ===============================================================
+
+"""
+Space-Saving (Metwally, Agrawal & El Abbadi, 2005) keeps `capacity`
+counters (key, count, error). Here batches are merged in as whole
+summaries, following the parallel/mergeable variant (Cafaro et al., 2016):
+
+- Each side has a floor: an upper bound on the weight of any key it does
+  not monitor (0 until it has dropped a key).
+- In the union, a key missing on one side borrows that side's floor
+  for both its count and its error. The combined counts are sorted and
+  the top `capacity` kept. The new floor is the larger of the summed
+  floors and the largest dropped count.
+
+Guarantees, for total weight W:
+- For every monitored key: count - error <= true weight <= count.
+- Every other key has true weight <= floor, and every error <= floor.
+- The floor is typically at most W / capacity, so any key heavier than
+  W / capacity is monitored.
+"""
+
+
+class SpaceSaving:
+    """Mergeable weighted Space-Saving summary."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.keys = np.empty(0, dtype=object)
+        self.counts = np.empty(0)
+        self.errors = np.empty(0)
+        self.floor = 0.0
+        self.total = 0.0
+
+    @classmethod
+    def from_counts(cls, keys, counts, capacity=DEFAULT_CAPACITY):
+        """Exact per-key weights cut down to a summary of `capacity` counters."""
+        summary = cls(capacity)
+        keys, counts = np.asarray(keys, dtype=object), np.asarray(counts, dtype='float64')
+        order = np.argsort(-counts, kind='stable')
+        kept, dropped = order[:capacity], order[capacity:]
+        summary.keys, summary.counts = keys[kept], counts[kept]
+        summary.errors = np.zeros(len(kept))
+        summary.floor = float(counts[dropped].max()) if len(dropped) else 0.0
+        summary.total = float(counts.sum())
+        return summary
+
+    def update(self, keys, weights=None):
+        """Adds a batch of keys (and non-negative weights)."""
+        batch = SpaceSaving.from_counts(*aggregate(keys, weights), capacity=self.capacity)
+        merged = self.merge(batch)
+        self.keys, self.counts, self.errors = merged.keys, merged.counts, merged.errors
+        self.floor, self.total = merged.floor, merged.total
+        return self
+
+    def merge(self, other):
+        """Combines two summaries into a new one."""
+        capacity = min(self.capacity, other.capacity)
+        left = pd.DataFrame({'count': self.counts, 'error': self.errors}, index=pd.Index(self.keys, dtype=object))
+        right = pd.DataFrame({'count': other.counts, 'error': other.errors}, index=pd.Index(other.keys, dtype=object))
+        union = left.join(right, how='outer', lsuffix='_left', rsuffix='_right')
+        counts = (union['count_left'].fillna(self.floor) + union['count_right'].fillna(other.floor)).to_numpy()
+        errors = (union['error_left'].fillna(self.floor) + union['error_right'].fillna(other.floor)).to_numpy()
+
+        merged = SpaceSaving(capacity)
+        order = np.argsort(-counts, kind='stable')
+        kept, dropped = order[:capacity], order[capacity:]
+        merged.keys = np.asarray(union.index, dtype=object)[kept]
+        merged.counts, merged.errors = counts[kept], errors[kept]
+        merged.floor = max(self.floor + other.floor, float(counts[dropped].max()) if len(dropped) else 0.0)
+        merged.total = self.total + other.total
+        return merged
+
+    @property
+    def error_bound(self):
+        """Largest possible overestimate of any key (and weight of any unmonitored key)."""
+        return self.floor
+
+    def estimate(self, keys):
+        """Upper-bound estimates for keys (the floor for unmonitored keys)."""
+        counts = pd.Series(self.counts, index=pd.Index(self.keys, dtype=object))
+        return counts.reindex(pd.Index(np.asarray(keys, dtype=object), dtype=object)).fillna(self.floor).to_numpy()
+
+    def top(self, n=10):
+        """The n heaviest keys with lower/upper bounds."""
+        return _top_table(self.keys, self.counts, self.counts - self.errors, self.counts, n, self.floor)
+
+
+# ===============================================================
+# Section 3: Count-Min with Candidates
+# ===============================================================
+
+"""
+Count-Min (Cormode & Muthukrishnan, 2005) adds each weight to one counter
+in each of `depth` rows of `width` counters and answers with the minimum
+over the rows. With width = ceil(e / epsilon) and depth = ceil(ln(1 / delta)):
+
+- estimate >= true weight, always;
+- estimate <= true weight + epsilon * W with probability >= 1 - delta.
+
+Row hashes are h1 + i * h2 (mod width) from two seeded 64-bit hashes of the
+key (`pd.util.hash_array`, stable across processes), so sketches with the
+same width, depth and seed merge by adding their tables. To answer top-n
+queries the sketch also keeps the `capacity` keys with the largest
+estimates seen so far; a merge re-estimates the union of both candidate
+sets against the merged table.
+"""
+
+
+class CountMinSketch:
+    """Mergeable Count-Min sketch with a heavy-hitter candidate set."""
+
+    def __init__(self, epsilon=1e-4, delta=1e-3, capacity=DEFAULT_CAPACITY, seed=0):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.capacity = capacity
+        self.seed = seed
+        self.width = int(np.ceil(np.e / epsilon))
+        self.depth = int(np.ceil(np.log(1.0 / delta)))
+        self.table = np.zeros((self.depth, self.width))
+        self.candidates = np.empty(0, dtype=object)
+        self.total = 0.0
+
+    def _columns(self, keys):
+        """(depth, len(keys)) counter columns of each key."""
+        keys = np.asarray(keys, dtype=object)
+        first = pd.util.hash_array(keys, hash_key=f"cm{self.seed:014d}"[-16:])
+        second = pd.util.hash_array(keys, hash_key=f"cm{self.seed + 1:014d}"[-16:]) | np.uint64(1)
+        rows = np.arange(self.depth, dtype='uint64')[:, np.newaxis]
+        return ((first + rows * second) % np.uint64(self.width)).astype('int64')
+
+    def estimate(self, keys):
+        """Estimated weight of each key (never below the true weight)."""
+        if len(keys) == 0:
+            return np.empty(0)
+        columns = self._columns(keys)
+        return self.table[np.arange(self.depth)[:, np.newaxis], columns].min(axis=0)
+
+    def _keep_top(self, keys):
+        """Keeps the `capacity` keys with the largest estimates as candidates."""
+        keys = pd.unique(np.asarray(keys, dtype=object))
+        order = np.argsort(-self.estimate(keys), kind='stable')
+        self.candidates = keys[order[:self.capacity]]
+
+    def update(self, keys, weights=None):
+        """Adds a batch of keys (and non-negative weights)."""
+        keys, sums = aggregate(keys, weights)
+        columns = self._columns(keys)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[row], weights=sums, minlength=self.width)
+        self.total += float(sums.sum())
+        self._keep_top(np.concatenate([self.candidates, keys]))
+        return self
+
+    def merge(self, other):
+        """Combines two sketches with the same width, depth and seed."""
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("Count-Min sketches need the same width, depth and seed to merge")
+        merged = CountMinSketch(self.epsilon, self.delta, max(self.capacity, other.capacity), self.seed)
+        merged.table = self.table + other.table
+        merged.total = self.total + other.total
+        merged._keep_top(np.concatenate([self.candidates, other.candidates]))
+        return merged
+
+    @property
+    def error_bound(self):
+        """Overestimate bound epsilon * W, holding with probability 1 - delta."""
+        return self.epsilon * self.total
+
+    def top(self, n=10):
+        """The n candidates with the largest estimates, with bounds."""
+        estimates = self.estimate(self.candidates)
+        lower = np.maximum(estimates - self.error_bound, 0.0)
+        return _top_table(self.candidates, estimates, lower, estimates, n, self.error_bound)
+
+
+# ===============================================================
+# Section 4: Exact Fallback
+# ===============================================================
+
+
+class ExactCounter:
+    """Exact per-key weights with the sketch interface (for validation)."""
+
+    def __init__(self):
+        self.sums = pd.Series(dtype='float64', index=pd.Index([], dtype=object))
+        self.total = 0.0
+
+    def update(self, keys, weights=None):
+        keys, sums = aggregate(keys, weights)
+        self.sums = self.sums.add(pd.Series(sums, index=pd.Index(keys, dtype=object)), fill_value=0.0)
+        self.total += float(sums.sum())
+        return self
+
+    def merge(self, other):
+        merged = ExactCounter()
+        merged.sums = self.sums.add(other.sums, fill_value=0.0)
+        merged.total = self.total + other.total
+        return merged
+
+    @property
+    def error_bound(self):
+        return 0.0
+
+    def estimate(self, keys):
+        return self.sums.reindex(pd.Index(np.asarray(keys, dtype=object), dtype=object)).fillna(0.0).to_numpy()
+
+    def top(self, n=10):
+        values = self.sums.to_numpy()
+        return _top_table(np.asarray(self.sums.index, dtype=object), values, values, values, n, 0.0)
+
+
+SKETCHES = {
+    'space-saving': SpaceSaving,
+    'count-min': CountMinSketch,
+    'exact': ExactCounter,
+}
+
+
+def make_sketch(method='space-saving', **params):
+    """A Space-Saving, Count-Min or exact aggregator by name."""
+    if method not in SKETCHES:
+        raise ValueError(f"method must be one of {sorted(SKETCHES)}")
+    return SKETCHES[method](**params)
+
+
+# ===============================================================
+# Section 5: Heavy Hitters of the Spotify History
+# ===============================================================
+
+
+def play_weights(values):
+    """float64 weights from numbers, booleans or TRUE/FALSE text; missing values weigh 0."""
+    from spotify_ingest import parse_flags
+
+    values = pd.Series(values)
+    if pd.api.types.is_bool_dtype(values.dtype):
+        return values.fillna(False).to_numpy(dtype='float64')
+    weights = pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64', na_value=np.nan, copy=True)
+    text = np.isnan(weights)
+    if text.any():
+        truth, _ = parse_flags(values[text])
+        weights[text] = truth
+    return weights
+
+
+class HeavyHitters:
+    """
+    Top keys of a play stream by a weight column.
+
+    `key` is a column name, or a (high, low) pair of column names for
+    128-bit track ids; `weight` is a column name or None to count plays.
+    """
+
+    def __init__(self, key='artist_name', weight='ms_played', method='space-saving', **params):
+        self.key = key
+        self.weight = weight
+        self.method = method
+        self.params = params
+        self.sketch = make_sketch(method, **params)
+        self.rows = 0
+
+    def update(self, chunk):
+        """Adds one DataFrame chunk of plays."""
+        if isinstance(self.key, tuple):
+            keys = tuple(chunk[column].to_numpy() for column in self.key)
+        else:
+            keys = chunk[self.key]
+        weights = None
+        if self.weight is not None:
+            weights = play_weights(chunk[self.weight])
+        self.sketch.update(keys, weights)
+        self.rows += len(chunk)
+        return self
+
+    def merge(self, other):
+        """Combines aggregators built from different files or processes."""
+        merged = HeavyHitters(self.key, self.weight, self.method, **self.params)
+        merged.sketch = self.sketch.merge(other.sketch)
+        merged.rows = self.rows + other.rows
+        return merged
+
+    def top(self, n=10):
+        """
+        The n heaviest keys as a DataFrame.
+
+        estimate/lower/upper bound each key's true weight and `max_error`
+        bounds any estimate's overcount (with probability 1 - delta for
+        Count-Min); `guaranteed` marks keys certain to be in the true top n.
+        """
+        table = self.sketch.top(n)
+        if isinstance(self.key, tuple) and len(table):
+            table.insert(1, 'spotify_track_uri', track_key_uris(table['key']))
+        table.attrs.update({'method': self.method, 'rows': self.rows, 'total_weight': self.sketch.total})
+        return table
+
+
+def _collect(aggregator, chunks):
+    """Feeds every chunk into an aggregator."""
+    for chunk in chunks:
+        aggregator.update(chunk)
+    return aggregator
+
+
+def top_artists(chunks, n=10, method='space-saving', **params):
+    """Top n artists by ms_played."""
+    return _collect(HeavyHitters('artist_name', 'ms_played', method, **params), chunks).top(n)
+
+
+def most_skipped_tracks(chunks, n=10, method='space-saving', **params):
+    """Top n tracks by number of skips."""
+    aggregator = HeavyHitters(('track_high', 'track_low'), 'skipped', method, **params)
+    return _collect(aggregator, chunks).top(n)
+
+
+# ===============================================================
+# Section 6: Example
+# ===============================================================
+
+
+def _sketch_file(rows, seed):
+    """One 'file' of plays summarized in a worker process."""
+    from spotify_ingest import SpotifyHistory, synthetic_history
+
+    frame = SpotifyHistory().append(synthetic_history(rows, tracks=50_000, seed=seed)).to_frame()
+    artists = HeavyHitters('artist_name', 'ms_played', 'space-saving', capacity=500)
+    tracks = HeavyHitters(('track_high', 'track_low'), 'skipped', 'count-min', epsilon=1e-4, capacity=500)
+    exact = HeavyHitters('artist_name', 'ms_played', 'exact')
+    for start in range(0, len(frame), 100_000):
+        chunk = frame.iloc[start:start + 100_000]
+        artists.update(chunk)
+        tracks.update(chunk)
+        exact.update(chunk)
+    return artists, tracks, exact
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import reduce
+
+    # Four export files summarized in separate processes, then merged
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        parts = list(pool.map(_sketch_file, [250_000] * 4, range(4)))
+    artists, tracks, exact = (reduce(lambda a, b: a.merge(b), group) for group in zip(*parts))
+
+    top = artists.top(5)
+    truth = exact.sketch.estimate(top['key'])
+    with pd.option_context('display.float_format', '{:,.0f}'.format, 'display.width', 140):
+        print(top.assign(exact=truth).to_string())
+    print("Exact weights inside the bounds:", bool(((top['lower'] <= truth) & (truth <= top['upper'])).all()))
+    print("Same top 5 as the exact counter:", set(top['key']) == set(exact.top(5)['key']))
+    print(f"Floor {artists.sketch.error_bound:,.0f} vs W/capacity {artists.sketch.total / 500:,.0f}")
+
+    print()
+    print(tracks.top(5)[['spotify_track_uri', 'estimate', 'lower', 'upper', 'guaranteed', 'max_error']].to_string())
+    # Output: the same top artists as the exact counter, every true weight inside its bounds
@@ -0,0 +1,506 @@
+"""
+===============================================================
+Pandas Tooling: Compact Streaming Ingester for Spotify History
+===============================================================
+
+This module covers:
+1. The Spotify streaming-history schema from
+   Datasets/Spotify+Streaming+History/spotify_data_dictionary.csv, plus
+   the field names used by Spotify's own JSON exports.
+2. Decoding the base-62 track id of `spotify:track:<id>` to a fixed-width
+   128-bit integer (two uint64 words), vectorized over a whole chunk.
+3. Compact columns: ts as int64 epoch seconds, ms_played as uint32,
+   shuffle/skipped bit-packed (8 rows per byte), and the text fields
+   dictionary-encoded into the narrowest integer codes.
+4. Reading CSV files with `pd.read_csv(chunksize=...)` and JSON-array
+   files with an incremental decoder, so a multi-GB export is never held
+   in memory as text or Python objects.
+
+A naive DataFrame keeps every text field as a Python string per row
+(hundreds of bytes per row). Here a row costs about 40 bytes: 16 for the
+track id, 8 for ts, 4 for ms_played, a few bytes of codes and half a byte
+of flags. Each distinct string is stored once, in its dictionary.
+
+Usage:
+    from spotify_ingest import SpotifyHistory
+
+    history = SpotifyHistory.from_csv('spotify_history.csv')
+    history = SpotifyHistory.from_json('endsong_0.json')
+    print(history.memory_usage())
+    df = history.to_frame()
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# ===============================================================
+# Section 1: The Spotify History Schema
+# ===============================================================
+
+SPOTIFY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Datasets',
+                           'Spotify+Streaming+History')
+SPOTIFY_DICTIONARY = os.path.join(SPOTIFY_DIR, 'spotify_data_dictionary.csv')
+SPOTIFY_CSV = os.path.join(SPOTIFY_DIR, 'spotify_history.csv')
+
+SPOTIFY_COLUMNS = ['spotify_track_uri', 'ts', 'platform', 'ms_played', 'track_name', 'artist_name',
+                   'album_name', 'reason_start', 'reason_end', 'shuffle', 'skipped']
+TEXT_COLUMNS = ['platform', 'track_name', 'artist_name', 'album_name', 'reason_start', 'reason_end']
+FLAG_COLUMNS = ['shuffle', 'skipped']
+
+# Field names of Spotify's "extended streaming history" JSON export
+JSON_ALIASES = {
+    'master_metadata_track_name': 'track_name',
+    'master_metadata_album_artist_name': 'artist_name',
+    'master_metadata_album_album_name': 'album_name',
+}
+
+TRACK_PREFIX = 'spotify:track:'
+# ts of a row whose timestamp is missing or unparseable (never a real play time)
+MISSING_TS = np.iinfo('int64').min
+DEFAULT_CHUNKSIZE = 500_000
+
+
+def read_data_dictionary(path=SPOTIFY_DICTIONARY):
+    """Field descriptions of the dataset as a Series."""
+    return pd.read_csv(path, encoding='utf-8-sig', index_col='Field')['Description']
+
+
+# ===============================================================
+# Section 2: Base-62 Track Ids as 128-bit Integers
+# ===============================================================
+
+"""
+A Spotify id is a 128-bit number written as 22 base-62 digits
+(0-9, a-z, A-Z). Decoding keeps four 32-bit limbs per row in uint64
+arrays: for each of the 22 digit positions, every limb is multiplied by 62
+and the carry is passed up, all rows at once. The result is split into a
+high and a low uint64 word.
+
+Rows whose URI is missing or malformed get the id (0, 0), which is not a
+real track, and are counted as invalid. Ids that are not 22 ASCII
+characters are blanked before the byte view, so non-ASCII text cannot
+fail the cast and a longer string cannot be truncated into a valid id.
+"""
+
+BASE62 = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+ID_LENGTH = 22
+
+_DIGITS = np.full(256, -1, dtype='int16')
+_DIGITS[np.frombuffer(BASE62.encode('ascii'), dtype='uint8')] = np.arange(62)
+_ALPHABET = np.frombuffer(BASE62.encode('ascii'), dtype='uint8')
+_LIMB = np.uint64(0xFFFFFFFF)
+
+
+def decode_track_ids(uris):
+    """(high, low, valid) arrays for `spotify:track:<id>` strings or bare ids."""
+    ids = pd.Series(uris, dtype=object).fillna('').astype(str)
+    ids = ids.where(~ids.str.startswith(TRACK_PREFIX), ids.str.slice(len(TRACK_PREFIX)))
+    shaped = ((ids.str.len() == ID_LENGTH) & ids.str.isascii()).to_numpy(dtype=bool)
+    ids = ids.where(shaped, '')
+    raw = np.asarray(ids.to_numpy(dtype=str), dtype=f'S{ID_LENGTH}')
+    digits = _DIGITS[raw.view('uint8').reshape(len(raw), ID_LENGTH)].astype('int64')
+    valid = shaped & (digits >= 0).all(axis=1)
+
+    limbs = [np.zeros(len(raw), dtype='uint64') for _ in range(4)]
+    for position in range(ID_LENGTH):
+        carry = np.where(valid, digits[:, position], 0).astype('uint64')
+        for k in range(4):
+            value = limbs[k] * np.uint64(62) + carry
+            limbs[k] = value & _LIMB
+            carry = value >> np.uint64(32)
+        valid &= carry == 0
+
+    high = (limbs[3] << np.uint64(32)) | limbs[2]
+    low = (limbs[1] << np.uint64(32)) | limbs[0]
+    high[~valid] = 0
+    low[~valid] = 0
+    return high, low, valid
+
+
+def encode_track_ids(high, low, prefix=TRACK_PREFIX):
+    """Inverse of `decode_track_ids`: URIs from the two uint64 words."""
+    high = np.asarray(high, dtype='uint64')
+    low = np.asarray(low, dtype='uint64')
+    limbs = [low & _LIMB, low >> np.uint64(32), high & _LIMB, high >> np.uint64(32)]
+    digits = np.empty((len(high), ID_LENGTH), dtype='uint8')
+    for position in range(ID_LENGTH - 1, -1, -1):
+        remainder = np.zeros(len(high), dtype='uint64')
+        for k in range(3, -1, -1):
+            value = (remainder << np.uint64(32)) | limbs[k]
+            limbs[k] = value // np.uint64(62)
+            remainder = value % np.uint64(62)
+        digits[:, position] = _ALPHABET[remainder]
+    ids = digits.view(f'S{ID_LENGTH}').ravel().astype(str)
+    return np.char.add(prefix, ids) if prefix else ids
+
+
+# ===============================================================
+# Section 3: Compact Column Builders
+# ===============================================================
+
+"""
+Columns are built chunk by chunk:
+- fixed-width values are kept as a list of per-chunk arrays and joined once;
+- text goes through a running dictionary (a pd.Index of every string seen,
+  in first-seen order); each chunk is encoded with Index.get_indexer and
+  unseen strings are appended, as in incremental_pivot.py;
+- flags are packed with np.packbits; bits that do not fill a byte at the
+  end of a chunk are carried over to the next one.
+"""
+
+
+class DictionaryColumn:
+    """Text column stored as integer codes into a dictionary of strings."""
+
+    def __init__(self):
+        self.labels = pd.Index([], dtype=object)
+        self.parts = []
+
+    def append(self, values):
+        values = pd.Series(values, dtype=object).to_numpy()
+        missing = pd.isna(values)
+        codes = np.full(len(values), -1, dtype='int32')
+        present = values[~missing]
+        found = self.labels.get_indexer(present)
+        unseen = found < 0
+        if unseen.any():
+            self.labels = self.labels.append(pd.Index(pd.unique(present[unseen]), dtype=object))
+            found[unseen] = self.labels.get_indexer(present[unseen])
+        codes[~missing] = found
+        self.parts.append(codes)
+
+    def codes(self):
+        """All codes in the narrowest signed dtype (-1 marks a missing value)."""
+        codes = np.concatenate(self.parts) if self.parts else np.empty(0, dtype='int32')
+        self.parts = [codes]
+        return codes.astype(np.min_scalar_type(-max(len(self.labels), 1)))
+
+
+class BitColumn:
+    """Boolean column packed 8 rows per byte, with a packed missing-value mask."""
+
+    def __init__(self):
+        self.value_bytes = []
+        self.known_bytes = []
+        self.carry_values = np.empty(0, dtype=bool)
+        self.carry_known = np.empty(0, dtype=bool)
+        self.rows = 0
+
+    def append(self, values, known):
+        self.rows += len(values)
+        values = np.concatenate([self.carry_values, values])
+        known = np.concatenate([self.carry_known, known])
+        full = len(values) // 8 * 8
+        self.value_bytes.append(np.packbits(values[:full]))
+        self.known_bytes.append(np.packbits(known[:full]))
+        self.carry_values, self.carry_known = values[full:], known[full:]
+
+    def packed(self):
+        """(values, known) packed bytes; the last byte may be partly used."""
+        values = np.concatenate(self.value_bytes + [np.packbits(self.carry_values)])
+        known = np.concatenate(self.known_bytes + [np.packbits(self.carry_known)])
+        return values, known
+
+
+def parse_flags(values):
+    """(values, known) boolean arrays from TRUE/FALSE strings or booleans."""
+    text = pd.Series(values, dtype=object).astype(str).str.strip().str.upper()
+    truth = text.isin(['TRUE', '1', 'T', 'YES']).to_numpy()
+    known = (truth | text.isin(['FALSE', '0', 'F', 'NO']).to_numpy())
+    return truth, known
+
+
+def parse_epoch_seconds(values):
+    """int64 epoch seconds (UTC) from ISO timestamps; missing ones become MISSING_TS."""
+    stamps = pd.to_datetime(pd.Series(values, dtype=object), format='ISO8601', utc=True, errors='coerce')
+    seconds = stamps.dt.tz_convert(None).to_numpy(dtype='datetime64[s]').astype('int64')
+    seconds[stamps.isna().to_numpy()] = MISSING_TS
+    return seconds
+
+
+def parse_ms_played(values):
+    """uint32 milliseconds; missing or negative values become 0."""
+    numbers = pd.to_numeric(pd.Series(values), errors='coerce').fillna(0).to_numpy(dtype='float64')
+    return np.clip(numbers, 0, np.iinfo('uint32').max).astype('uint32')
+
+
+# ===============================================================
+# Section 4: The Compact History
+# ===============================================================
+
+
+class SpotifyHistory:
+    """Streaming history in compact columns, built one chunk at a time."""
+
+    def __init__(self):
+        self.rows = 0
+        self.invalid_uris = 0
+        self.missing_ts = 0
+        self._fixed = {'track_high': [], 'track_low': [], 'ts': [], 'ms_played': []}
+        self._text = {column: DictionaryColumn() for column in TEXT_COLUMNS}
+        self._flags = {column: BitColumn() for column in FLAG_COLUMNS}
+        self._columns = None
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """History from an iterable of DataFrames with the SPOTIFY_COLUMNS."""
+        history = cls()
+        for chunk in chunks:
+            history.append(chunk)
+        return history
+
+    @classmethod
+    def from_csv(cls, path=SPOTIFY_CSV, chunksize=DEFAULT_CHUNKSIZE):
+        """Reads a CSV export chunk by chunk."""
+        return cls.from_chunks(iter_csv(path, chunksize))
+
+    @classmethod
+    def from_json(cls, path, chunksize=DEFAULT_CHUNKSIZE):
+        """Reads a JSON-array export chunk by chunk."""
+        return cls.from_chunks(iter_json(path, chunksize))
+
+    def append(self, chunk):
+        """Encodes one chunk of raw rows into the compact columns."""
+        chunk = chunk.rename(columns=JSON_ALIASES)
+        missing = [column for column in SPOTIFY_COLUMNS if column not in chunk.columns]
+        if missing:
+            raise KeyError(f"Missing columns: {missing}")
+
+        high, low, valid = decode_track_ids(chunk['spotify_track_uri'])
+        self._fixed['track_high'].append(high)
+        self._fixed['track_low'].append(low)
+        ts = parse_epoch_seconds(chunk['ts'])
+        self._fixed['ts'].append(ts)
+        self._fixed['ms_played'].append(parse_ms_played(chunk['ms_played']))
+        for column in TEXT_COLUMNS:
+            self._text[column].append(chunk[column])
+        for column in FLAG_COLUMNS:
+            self._flags[column].append(*parse_flags(chunk[column]))
+
+        self.rows += len(chunk)
+        self.invalid_uris += int((~valid).sum())
+        self.missing_ts += int((ts == MISSING_TS).sum())
+        self._columns = None
+        return self
+
+    # ---------------------------------------------------------------
+    # Reading the compact columns
+    # ---------------------------------------------------------------
+
+    @property
+    def columns(self):
+        """
+        name -> array of the compact columns.
+
+        Flag columns are (values, known) packed byte arrays; text columns
+        are integer codes into `dictionary(name)`.
+        """
+        if self._columns is None:
+            columns = {name: np.concatenate(parts) if parts else np.empty(0)
+                       for name, parts in self._fixed.items()}
+            # Joined once; later appends add to the single joined part
+            for name, values in columns.items():
+                self._fixed[name] = [values]
+            for name, column in self._text.items():
+                columns[name] = column.codes()
+            for name, column in self._flags.items():
+                columns[name] = column.packed()
+            self._columns = columns
+        return self._columns
+
+    def dictionary(self, column):
+        """The distinct strings of a text column, indexed by code."""
+        return self._text[column].labels
+
+    def flag(self, column):
+        """A flag column unpacked to a nullable boolean array."""
+        values, known = self.columns[column]
+        values = np.unpackbits(values, count=self.rows).astype(bool)
+        known = np.unpackbits(known, count=self.rows).astype(bool)
+        return pd.arrays.BooleanArray(values, ~known)
+
+    def track_uris(self):
+        """The original `spotify:track:` URIs (None for invalid rows)."""
+        columns = self.columns
+        uris = encode_track_ids(columns['track_high'], columns['track_low']).astype(object)
+        uris[(columns['track_high'] == 0) & (columns['track_low'] == 0)] = None
+        return uris
+
+    def memory_usage(self):
+        """Bytes per compact column (dictionaries included) and per row."""
+        usage = {}
+        for name, values in self.columns.items():
+            if name in FLAG_COLUMNS:
+                usage[name] = sum(part.nbytes for part in values)
+            else:
+                usage[name] = values.nbytes
+        for name in TEXT_COLUMNS:
+            usage[name] += int(self.dictionary(name).memory_usage(deep=True))
+        usage = pd.Series(usage, name='bytes')
+        usage['total'] = usage.sum()
+        usage['per_row'] = usage['total'] / max(self.rows, 1)
+        return usage
+
+    def to_frame(self, uris=False):
+        """
+        A DataFrame of the compact columns.
+
+        Text columns become categoricals over their dictionaries, the flags
+        nullable booleans and ts stays int64 seconds (MISSING_TS where the
+        timestamp was missing). With uris=True the
+        URI strings are rebuilt as well (costly: one string per row).
+        """
+        columns = self.columns
+        data = {'track_high': columns['track_high'], 'track_low': columns['track_low']}
+        if uris:
+            data['spotify_track_uri'] = self.track_uris()
+        data['ts'] = columns['ts']
+        data['ms_played'] = columns['ms_played']
+        for name in TEXT_COLUMNS:
+            data[name] = pd.Categorical.from_codes(columns[name], self.dictionary(name))
+        for name in FLAG_COLUMNS:
+            data[name] = self.flag(name)
+        return pd.DataFrame(data)
+
+
+# ===============================================================
+# Section 5: Reading CSV and JSON-Array Exports
+# ===============================================================
+
+"""
+JSON exports are one top-level array of objects. `iter_json` reads the
+file in blocks and decodes one object at a time with
+`json.JSONDecoder.raw_decode`, keeping only the unparsed tail of the
+current block and the objects of the current chunk in memory.
+"""
+
+
+def iter_csv(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yields raw DataFrame chunks of a CSV export (all columns as text)."""
+    yield from pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False,
+                           na_values=[''], encoding='utf-8-sig')
+
+
+def iter_json_records(path, block_size=1 << 22):
+    """Yields the objects of a top-level JSON array without loading the file."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8-sig') as file:
+        buffer = file.read(block_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{path} is not a JSON array")
+        position = 1
+        while True:
+            # Skip separators; refill when the block runs out
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer) and buffer[position] == ']':
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                block = file.read(block_size)
+                if not block:
+                    raise
+                buffer = buffer[position:] + block
+                position = 0
+                continue
+            if end == len(buffer):
+                # The object may continue in the next block (e.g. a number)
+                block = file.read(block_size)
+                if block:
+                    buffer = buffer[position:] + block
+                    position = 0
+                    continue
+            yield record
+            position = end
+
+
+def iter_json(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yields raw DataFrame chunks of a JSON-array export."""
+    records = []
+    for record in iter_json_records(path):
+        records.append(record)
+        if len(records) == chunksize:
+            yield pd.DataFrame.from_records(records)
+            records = []
+    if records:
+        yield pd.DataFrame.from_records(records)
+
+
+# ===============================================================
+# Section 6: Synthetic Exports
+# ===============================================================
+
+
+def synthetic_history(rows, tracks=5_000, seed=0):
+    """A raw DataFrame shaped like the Kaggle export, for demos and benchmarks."""
+    rng = np.random.default_rng(seed)
+    words = rng.integers(0, np.iinfo('uint64').max, size=(2, tracks), dtype='uint64', endpoint=True)
+    catalog = encode_track_ids(words[0], words[1]).astype(object)
+    artists = np.array([f"Artist {i}" for i in range(tracks // 10 + 1)], dtype=object)
+    pick = rng.zipf(1.3, size=rows) % tracks
+    start = pd.Timestamp('2013-07-08').value // 10**9
+    ts = np.sort(start + rng.integers(0, 10 * 365 * 86_400, size=rows))
+
+    return pd.DataFrame({
+        'spotify_track_uri': catalog[pick],
+        'ts': pd.to_datetime(ts, unit='s').strftime('%Y-%m-%d %H:%M:%S'),
+        'platform': rng.choice(['android', 'iOS', 'windows', 'mac', 'web player'], size=rows),
+        'ms_played': rng.integers(0, 400_000, size=rows),
+        'track_name': np.array([f"Track {i}" for i in range(tracks)], dtype=object)[pick],
+        'artist_name': artists[pick // 10],
+        'album_name': np.array([f"Album {i}" for i in range(tracks // 5 + 1)], dtype=object)[pick // 5],
+        'reason_start': rng.choice(['trackdone', 'fwdbtn', 'clickrow', 'backbtn', 'playbtn'], size=rows),
+        'reason_end': rng.choice(['trackdone', 'fwdbtn', 'endplay', 'logout', 'backbtn'], size=rows),
+        'shuffle': rng.choice(['TRUE', 'FALSE'], size=rows),
+        'skipped': rng.choice(['TRUE', 'FALSE', None], size=rows, p=[0.3, 0.68, 0.02]),
+    })
+
+
+def write_json_array(df, path):
+    """Writes rows as one JSON array of objects (the export layout)."""
+    with open(path, 'w') as file:
+        file.write('[\n')
+        for index, record in enumerate(df.to_dict(orient='records')):
+            if index:
+                file.write(',\n')
+            file.write(json.dumps(record, default=str))
+        file.write('\n]\n')
+
+
+# ===============================================================
+# Section 7: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    print(read_data_dictionary().head(3).to_string())
+
+    raw = synthetic_history(200_000)
+    raw_bytes = raw.memory_usage(deep=True).sum()
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'spotify_history.csv')
+        json_path = os.path.join(directory, 'spotify_history.json')
+        raw.to_csv(csv_path, index=False)
+        write_json_array(raw, json_path)
+
+        start = time.perf_counter()
+        history = SpotifyHistory.from_csv(csv_path, chunksize=50_000)
+        csv_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        from_json = SpotifyHistory.from_json(json_path, chunksize=50_000)
+        json_seconds = time.perf_counter() - start
+
+    usage = history.memory_usage()
+    print(f"\nRows: {history.rows:,} (CSV {csv_seconds:.2f}s, JSON {json_seconds:.2f}s)")
+    print(f"Naive DataFrame: {raw_bytes / len(raw):.0f} bytes/row; compact: {usage['per_row']:.1f} bytes/row")
+    print("URIs round-trip:", bool((history.track_uris() == raw['spotify_track_uri'].to_numpy()).all()))
+    print("CSV and JSON agree:", history.to_frame().equals(from_json.to_frame()))
+    print(history.to_frame().head(3).to_string())
+    # Output: roughly 40 compact bytes per row against several hundred for the naive frame
+
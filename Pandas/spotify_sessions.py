@@ -0,0 +1,367 @@
+"""
+===============================================================
+Pandas Tooling: Vectorized Sessionization of Spotify Plays
+===============================================================
+
+This module covers:
+1. Splitting each listener's plays into listening sessions wherever the gap
+   between consecutive `ts` values exceeds an idle threshold.
+2. Per session: start, end, duration, track count, ms played, skip ratio
+   and the dominant platform.
+3. Sorted-array kernels only: boundaries from `np.diff`, session ids from
+   `np.cumsum`, totals from `np.add.reduceat` and platform counts from one
+   `np.bincount`. There are no Python loops over plays or sessions and no
+   groupby-apply.
+4. Processing ts-sorted chunks of any size. The sessions still open at the
+   end of a chunk are carried as partial aggregates and continued by the
+   next chunk, so results do not depend on where chunks are cut.
+
+`ts` is the time a track stopped playing, so a session starts at its first
+play's ts minus that play's ms_played and ends at its last play's ts.
+
+Usage:
+    from spotify_ingest import SpotifyHistory
+    from spotify_sessions import history_chunks, sessionize
+
+    history = SpotifyHistory.from_csv('spotify_history.csv')
+    sessions = sessionize(history_chunks(history), gap='30min')
+"""
+
+import numpy as np
+import pandas as pd
+
+from spotify_ingest import MISSING_TS
+
+# ===============================================================
+# Section 1: Partial Session Aggregates
+# ===============================================================
+
+"""
+A set of sessions is a dict of equal-length arrays:
+
+    listener      integer code of the listener (0 when there is only one)
+    first, end    ts of the first and the last play (epoch seconds)
+    start         first play's ts minus its ms_played
+    tracks, ms_played, skips, known
+                  plays, total ms, skipped plays, plays with a known skip flag
+    platforms     2D (sessions x platform codes) play counts
+
+first/start keep the earlier value, end the later one and every other field
+adds up, so an open session and its continuation merge exactly.
+"""
+
+SUM_FIELDS = ['tracks', 'ms_played', 'skips', 'known']
+
+
+def _empty_sessions(platforms=1):
+    """A set of zero sessions."""
+    sessions = {name: np.empty(0, dtype='int64') for name in ['listener', 'first', 'start', 'end'] + SUM_FIELDS}
+    sessions['platforms'] = np.zeros((0, platforms), dtype='int64')
+    return sessions
+
+
+def _take(sessions, mask):
+    """The sessions selected by a boolean mask or index array."""
+    return {name: values[mask] for name, values in sessions.items()}
+
+
+def _widen(platforms, width):
+    """Pads platform counts with zero columns up to `width` codes."""
+    if platforms.shape[1] >= width:
+        return platforms
+    return np.pad(platforms, ((0, 0), (0, width - platforms.shape[1])))
+
+
+def _concat(first, second):
+    """Both sets of sessions as one."""
+    width = max(first['platforms'].shape[1], second['platforms'].shape[1])
+    joined = {name: np.concatenate([first[name], second[name]]) for name in first if name != 'platforms'}
+    joined['platforms'] = np.concatenate([_widen(first['platforms'], width), _widen(second['platforms'], width)])
+    return joined
+
+
+# ===============================================================
+# Section 2: The Chunk Kernel
+# ===============================================================
+
+
+def chunk_sessions(listener, ts, ms_played, skipped, known, platform, gap, platforms):
+    """
+    Sessions of one chunk of plays sorted by (listener, ts).
+
+    A play opens a session when its listener differs from the previous
+    play's or its ts is more than `gap` seconds after it. `platform` holds
+    codes below `platforms` (-1 for missing).
+    """
+    n = len(ts)
+    new = np.ones(n, dtype=bool)
+    new[1:] = (listener[1:] != listener[:-1]) | (np.diff(ts) > gap)
+
+    bounds = np.flatnonzero(new)
+    last = np.r_[bounds[1:] - 1, n - 1]
+    session_of_play = np.cumsum(new) - 1
+    counts = np.bincount(session_of_play * platforms + platform.clip(0),
+                         weights=(platform >= 0).astype('float64'), minlength=len(bounds) * platforms)
+
+    return {
+        'listener': listener[bounds],
+        'first': ts[bounds],
+        'start': ts[bounds] - ms_played[bounds] // 1000,
+        'end': ts[last],
+        'tracks': np.diff(np.r_[bounds, n]),
+        'ms_played': np.add.reduceat(ms_played, bounds),
+        'skips': np.add.reduceat(skipped.astype('int64'), bounds),
+        'known': np.add.reduceat(known.astype('int64'), bounds),
+        'platforms': counts.reshape(len(bounds), platforms).astype('int64'),
+    }
+
+
+# ===============================================================
+# Section 3: The Streaming Sessionizer
+# ===============================================================
+
+"""
+Carry-over between chunks: chunks arrive in ts order, so every later play
+has ts >= T, the largest ts seen so far. An open session whose end is more
+than `gap` before T can never be continued and is emitted; the others stay
+open (at most one per listener). The first session of a listener in a new
+chunk absorbs that listener's open session when the gap between them is
+within the threshold; otherwise the open session is emitted.
+
+Plays whose ts is missing (NaT, or MISSING_TS from spotify_ingest.py) are
+dropped before the order check and counted in `missing_ts`. The listener
+column of every returned table has the dtype of the first chunk's column.
+
+Platform codes follow the order in which chunks first show each platform,
+so they depend on chunking. The dominant platform of a session therefore
+breaks ties by label (the lowest sorted label wins), and the platform
+column is a categorical over the sorted labels, not over the codes.
+"""
+
+
+def _codes_for(values, labels):
+    """Codes of `values` in `labels`, extending `labels` with unseen values."""
+    codes = labels.get_indexer(values)
+    unseen = codes < 0
+    if unseen.any():
+        labels = labels.append(pd.Index(values[unseen], dtype=object))
+        codes[unseen] = labels.get_indexer(values[unseen])
+    return codes, labels
+
+
+class Sessionizer:
+    """Turns ts-sorted chunks of plays into closed listening sessions."""
+
+    def __init__(self, gap='30min', listener=None):
+        # A number is seconds; strings and Timedeltas are converted
+        self.gap = int(gap) if isinstance(gap, (int, float)) else int(pd.Timedelta(gap).total_seconds())
+        self.listener = listener
+        self.listeners = pd.Index([], dtype=object)
+        # dtype of the listener column in the output, taken from the first chunk
+        self.listener_dtype = np.dtype(object)
+        self.platform_labels = pd.Index([], dtype=object)
+        self.open = _empty_sessions()
+        self.latest = None
+        self.plays = 0
+        self.missing_ts = 0
+
+    @staticmethod
+    def _encode(values, labels):
+        """Integer codes of a column against a growing label index (-1 for missing)."""
+        categorical = pd.Categorical(values)
+        codes, labels = _codes_for(np.asarray(categorical.categories, dtype=object), labels)
+        codes = np.append(codes, -1)
+        return codes[categorical.codes], labels
+
+    @property
+    def platform_dtype(self):
+        """Categorical dtype of the platform column: every label seen so far, sorted."""
+        return pd.CategoricalDtype(self.platform_labels.sort_values())
+
+    def _columns(self, chunk):
+        """Plain arrays for the fields sessionization needs (NaT becomes MISSING_TS)."""
+        ts = chunk['ts']
+        if pd.api.types.is_datetime64_any_dtype(ts):
+            ts = pd.to_datetime(ts, utc=True).dt.tz_convert(None).to_numpy(dtype='datetime64[s]')
+        ts = np.asarray(ts).astype('int64')
+        skipped = pd.Series(chunk['skipped'])
+        known = skipped.notna().to_numpy()
+        skipped = skipped.fillna(False).to_numpy(dtype=bool)
+        platform, self.platform_labels = self._encode(chunk['platform'], self.platform_labels)
+        if self.listener is None:
+            listener = np.zeros(len(chunk), dtype='int64')
+        else:
+            if not self.plays:
+                values = chunk[self.listener]
+                dtype = values.dtype
+                self.listener_dtype = dtype.categories.dtype if isinstance(dtype, pd.CategoricalDtype) else dtype
+            listener, self.listeners = self._encode(chunk[self.listener], self.listeners)
+        ms_played = np.asarray(chunk['ms_played'], dtype='int64')
+        return listener, ts, ms_played, skipped, known, platform
+
+    def update(self, chunk):
+        """Adds a chunk of plays; returns the sessions that closed (a DataFrame)."""
+        if len(chunk) == 0:
+            return self._table(_empty_sessions())
+        listener, ts, ms_played, skipped, known, platform = self._columns(chunk)
+        # Plays without a timestamp cannot be placed in a session; they are only counted
+        present = ts != MISSING_TS
+        if not present.all():
+            self.missing_ts += int((~present).sum())
+            listener, ts, ms_played, skipped, known, platform = (
+                values[present] for values in (listener, ts, ms_played, skipped, known, platform))
+            if len(ts) == 0:
+                return self._table(_empty_sessions())
+        if np.any(np.diff(ts) < 0) or (self.latest is not None and ts[0] < self.latest):
+            raise ValueError("Plays must arrive sorted by ts")
+        self.latest = int(ts[-1])
+        self.plays += len(ts)
+
+        order = np.lexsort((ts, listener)) if self.listener is not None else slice(None)
+        sessions = chunk_sessions(listener[order], ts[order], ms_played[order], skipped[order],
+                                  known[order], platform[order], self.gap, max(len(self.platform_labels), 1))
+        sessions, closed = self._continue_open(sessions)
+
+        # The last session of each listener stays open while it may still continue
+        last_of_listener = np.ones(len(sessions['listener']), dtype=bool)
+        last_of_listener[:-1] = sessions['listener'][1:] != sessions['listener'][:-1]
+        keep_open = last_of_listener & (sessions['end'] >= self.latest - self.gap)
+        self.open = _concat(self.open, _take(sessions, keep_open))
+        return self._table(_concat(closed, _take(sessions, ~keep_open)))
+
+    def _continue_open(self, sessions):
+        """
+        Merges open sessions into the chunk sessions that continue them.
+
+        Returns the chunk sessions and the open sessions that closed; the
+        open sessions of listeners absent from the chunk that may still
+        continue stay in `self.open`.
+        """
+        open_sessions = self.open
+        listeners = sessions['listener']
+        first_of_listener = np.ones(len(listeners), dtype=bool)
+        first_of_listener[1:] = listeners[1:] != listeners[:-1]
+
+        # Row of each listener's open session (at most one per listener)
+        open_row = np.full(max(len(self.listeners), 1), -1, dtype='int64')
+        open_row[open_sessions['listener']] = np.arange(len(open_sessions['listener']))
+        heads = np.flatnonzero(first_of_listener)
+        rows = open_row[listeners[heads]]
+        joins = (rows >= 0)
+        joins[joins] = sessions['first'][heads[joins]] - open_sessions['end'][rows[joins]] <= self.gap
+        heads, rows = heads[joins], rows[joins]
+
+        width = sessions['platforms'].shape[1]
+        open_platforms = _widen(open_sessions['platforms'], width)
+        for name in SUM_FIELDS:
+            sessions[name][heads] += open_sessions[name][rows]
+        sessions['platforms'][heads] += open_platforms[rows]
+        sessions['first'][heads] = open_sessions['first'][rows]
+        sessions['start'][heads] = open_sessions['start'][rows]
+
+        absorbed = np.zeros(len(open_sessions['listener']), dtype=bool)
+        absorbed[rows] = True
+        in_chunk = np.isin(open_sessions['listener'], listeners)
+        expired = open_sessions['end'] < self.latest - self.gap
+        self.open = _take(open_sessions, ~absorbed & ~in_chunk & ~expired)
+        return sessions, _take(open_sessions, ~absorbed & (in_chunk | expired))
+
+    def finish(self):
+        """Closes and returns every session still open."""
+        closed, self.open = self.open, _empty_sessions()
+        return self._table(closed)
+
+    def _table(self, sessions):
+        """Closed sessions as a DataFrame, ordered by listener and start."""
+        labels = self.platform_labels
+        # argmax keeps the first maximum, so columns in label order break ties by label
+        by_label = labels.argsort()
+        platforms = _widen(sessions['platforms'], len(labels))[:, by_label]
+        played = platforms.sum(axis=1) > 0
+        dominant = np.full(len(played), None, dtype=object)
+        if played.any():
+            dominant[played] = np.asarray(labels, dtype=object)[by_label[platforms[played].argmax(axis=1)]]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            skip_ratio = np.where(sessions['known'] > 0, sessions['skips'] / sessions['known'], np.nan)
+
+        table = pd.DataFrame({
+            'start': sessions['start'].astype('datetime64[s]'),
+            'end': sessions['end'].astype('datetime64[s]'),
+            'duration_s': sessions['end'] - sessions['start'],
+            'tracks': sessions['tracks'],
+            'ms_played': sessions['ms_played'],
+            'skips': sessions['skips'],
+            'skip_ratio': skip_ratio,
+            'platform': pd.Categorical(dominant, dtype=self.platform_dtype),
+        })
+        if self.listener is not None:
+            values = (np.asarray(self.listeners, dtype=object)[sessions['listener']]
+                      if len(self.listeners) else np.empty(0, dtype=object))
+            table.insert(0, self.listener, pd.Series(values, dtype=object).astype(self.listener_dtype))
+        order = ['start'] if self.listener is None else [self.listener, 'start']
+        return table.sort_values(order, kind='stable').reset_index(drop=True)
+
+
+# ===============================================================
+# Section 4: Public API
+# ===============================================================
+
+
+def sessionize(chunks, gap='30min', listener=None):
+    """All sessions of an iterable of ts-sorted chunks as one DataFrame."""
+    sessionizer = Sessionizer(gap, listener)
+    tables = [sessionizer.update(chunk) for chunk in chunks]
+    tables.append(sessionizer.finish())
+    # Earlier tables saw fewer platforms; one dtype keeps the concatenated column categorical
+    for table in tables:
+        table['platform'] = table['platform'].astype(sessionizer.platform_dtype)
+    order = ['start'] if listener is None else [listener, 'start']
+    return pd.concat(tables, ignore_index=True).sort_values(order, kind='stable').reset_index(drop=True)
+
+
+def history_chunks(history, chunk_rows=1 << 20):
+    """
+    ts/ms_played/platform/skipped chunks of a SpotifyHistory (spotify_ingest.py).
+
+    Slices the compact columns directly; `chunk_rows` is rounded to a
+    multiple of 8 so the packed skip flags split on byte boundaries.
+    """
+    chunk_rows = max(chunk_rows // 8 * 8, 8)
+    columns = history.columns
+    values, known = columns['skipped']
+    platforms = history.dictionary('platform')
+    for start in range(0, history.rows, chunk_rows):
+        stop = min(start + chunk_rows, history.rows)
+        byte_slice = slice(start // 8, (stop + 7) // 8)
+        skipped = np.unpackbits(values[byte_slice], count=stop - start).astype(bool)
+        missing = ~np.unpackbits(known[byte_slice], count=stop - start).astype(bool)
+        yield pd.DataFrame({
+            'ts': columns['ts'][start:stop],
+            'ms_played': columns['ms_played'][start:stop],
+            'platform': pd.Categorical.from_codes(columns['platform'][start:stop], platforms),
+            'skipped': pd.arrays.BooleanArray(skipped, missing),
+        })
+
+
+# ===============================================================
+# Section 5: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    import time
+
+    from spotify_ingest import SpotifyHistory, synthetic_history
+
+    # Two million plays over ten years: about one play every 2.6 minutes
+    history = SpotifyHistory().append(synthetic_history(2_000_000, seed=1))
+
+    start = time.perf_counter()
+    sessions = sessionize(history_chunks(history, chunk_rows=250_000), gap='5min')
+    elapsed = time.perf_counter() - start
+    print(f"{history.rows:,} plays -> {len(sessions):,} sessions in {elapsed:.2f}s")
+    print(sessions.head().to_string())
+
+    # Chunk boundaries do not change the result
+    single = sessionize(history_chunks(history, chunk_rows=history.rows), gap='5min')
+    print("Same sessions with one chunk:", sessions.equals(single))
+    # Output: identical session tables whatever the chunk size
@@ -0,0 +1,318 @@
+"""
+===============================================================
+Pandas Tooling: Streaming Loader for the Uber Trip Data
+===============================================================
+
+This module covers:
+1. The Uber trip schema shared by the Pandas tooling modules.
+2. Reading a CSV in fixed-size chunks with `pd.read_csv(chunksize=...)`.
+3. Mergeable per-chunk summaries (row counts, nulls, dtypes, moments, samples).
+4. Producing the same info / describe / isnull / shape report as
+   1_Introduction.ipynb without materializing the whole file.
+
+Only one chunk is held in memory at a time and every partial result has a
+fixed size, so memory stays flat no matter how large the trip log is.
+
+Usage:
+    from streaming_loader import stream_summary
+
+    summary = stream_summary('UberDataset.csv', chunksize=100_000)
+    print(summary.report())
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# ===============================================================
+# Section 1: The Uber Trip Schema
+# ===============================================================
+
+UBER_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'UberDataset.csv')
+
+UBER_COLUMNS = ['START_DATE', 'END_DATE', 'CATEGORY', 'START', 'STOP', 'MILES', 'PURPOSE']
+DATE_COLUMNS = ['START_DATE', 'END_DATE']
+CATEGORICAL_COLUMNS = ['CATEGORY', 'START', 'STOP', 'PURPOSE']
+NUMERIC_COLUMNS = ['MILES']
+
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_SAMPLE_SIZE = 10_000
+
+# ===============================================================
+# Section 2: Mergeable Numeric Statistics
+# ===============================================================
+
+"""
+`df.describe()` needs count, mean, std, min, max and the 25/50/75% quantiles.
+- count/mean/std are merged exactly with Chan's parallel variance formula.
+- min/max are merged exactly.
+- Quantiles come from a bottom-k sample: every value gets a random key and
+  only the k smallest keys are kept. The union of two bottom-k samples, cut
+  back to k, is again a uniform sample, so the sample merges like the rest.
+  While the column has at most k values the sample holds all of them and the
+  quantiles are exact.
+"""
+
+
+class NumericStats:
+    """Mergeable summary of one numeric column."""
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sample_keys = np.empty(0)
+        self.sample_values = np.empty(0)
+
+    @classmethod
+    def from_values(cls, values, sample_size=DEFAULT_SAMPLE_SIZE, rng=None):
+        """Builds the summary of a single chunk (nulls are ignored)."""
+        stats = cls(sample_size)
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return stats
+
+        stats.count = int(values.size)
+        stats.mean = float(values.mean())
+        stats.m2 = float(((values - stats.mean) ** 2).sum())
+        stats.min = float(values.min())
+        stats.max = float(values.max())
+
+        rng = rng if rng is not None else np.random.default_rng()
+        keys = rng.random(values.size)
+        stats.sample_keys, stats.sample_values = _bottom_k(keys, values, sample_size)
+        return stats
+
+    def merge(self, other):
+        """Combines two summaries into a new one."""
+        merged = NumericStats(min(self.sample_size, other.sample_size))
+        merged.count = self.count + other.count
+        if merged.count == 0:
+            return merged
+
+        delta = other.mean - self.mean
+        merged.mean = self.mean + delta * other.count / merged.count
+        merged.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / merged.count
+        merged.min = min(self.min, other.min)
+        merged.max = max(self.max, other.max)
+        merged.sample_keys, merged.sample_values = _bottom_k(
+            np.concatenate([self.sample_keys, other.sample_keys]),
+            np.concatenate([self.sample_values, other.sample_values]),
+            merged.sample_size,
+        )
+        return merged
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1, same as pandas)."""
+        if self.count < 2:
+            return np.nan
+        return float(np.sqrt(self.m2 / (self.count - 1)))
+
+    def quantile(self, q):
+        """Quantile estimated from the sample (exact while count <= sample_size)."""
+        if self.count == 0:
+            return np.nan
+        return float(np.quantile(self.sample_values, q))
+
+
+def _bottom_k(keys, values, k):
+    """Keeps the k values with the smallest random keys."""
+    if keys.size <= k:
+        return keys, values
+    keep = np.argpartition(keys, k)[:k]
+    return keys[keep], values[keep]
+
+
+# ===============================================================
+# Section 3: Mergeable Frame Summary
+# ===============================================================
+
+
+def _is_describable(dtype):
+    """True for the dtypes `df.describe()` summarizes by default."""
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def merge_dtypes(left, right):
+    """Widens two chunk dtypes the way a single `read_csv` would."""
+    if left is None:
+        return right
+    if right is None or left == right:
+        return left
+    if _is_describable(left) and _is_describable(right):
+        return np.result_type(left, right)
+    return np.dtype(object)
+
+
+class StreamSummary:
+    """Shape, dtypes, null counts and numeric stats merged across chunks."""
+
+    def __init__(self, columns, sample_size=DEFAULT_SAMPLE_SIZE):
+        self.columns = list(columns)
+        self.sample_size = sample_size
+        self.rows = 0
+        self.chunks = 0
+        self.memory_bytes = 0
+        self.non_null = {column: 0 for column in self.columns}
+        self.dtypes = {column: None for column in self.columns}
+        self.numeric = {}
+
+    @classmethod
+    def from_chunk(cls, chunk, sample_size=DEFAULT_SAMPLE_SIZE, rng=None):
+        """Summarizes one DataFrame chunk."""
+        summary = cls(chunk.columns, sample_size)
+        summary.rows = len(chunk)
+        summary.chunks = 1
+        summary.memory_bytes = int(chunk.memory_usage(deep=True).sum())
+
+        counts = chunk.notna().sum()
+        for column in summary.columns:
+            summary.non_null[column] = int(counts[column])
+            # An all-null chunk says nothing about the column's real dtype
+            if counts[column] > 0:
+                summary.dtypes[column] = chunk[column].dtype
+            if _is_describable(chunk[column].dtype):
+                summary.numeric[column] = NumericStats.from_values(
+                    chunk[column].to_numpy(dtype='float64', na_value=np.nan), sample_size, rng
+                )
+        return summary
+
+    def merge(self, other):
+        """Combines two summaries into a new one."""
+        if other.columns != self.columns:
+            raise ValueError(f"Column mismatch: {self.columns} != {other.columns}")
+
+        merged = StreamSummary(self.columns, min(self.sample_size, other.sample_size))
+        merged.rows = self.rows + other.rows
+        merged.chunks = self.chunks + other.chunks
+        merged.memory_bytes = self.memory_bytes + other.memory_bytes
+        for column in self.columns:
+            merged.non_null[column] = self.non_null[column] + other.non_null[column]
+            merged.dtypes[column] = merge_dtypes(self.dtypes[column], other.dtypes[column])
+
+        for column in set(self.numeric) | set(other.numeric):
+            left = self.numeric.get(column, NumericStats(merged.sample_size))
+            right = other.numeric.get(column, NumericStats(merged.sample_size))
+            merged.numeric[column] = left.merge(right)
+        return merged
+
+    # ---------------------------------------------------------------
+    # The same views 1_Introduction.ipynb prints
+    # ---------------------------------------------------------------
+
+    @property
+    def shape(self):
+        """Equivalent of `df.shape`."""
+        return (self.rows, len(self.columns))
+
+    def column_dtypes(self):
+        """Equivalent of `df.dtypes` (all-null columns read as float64)."""
+        return pd.Series(
+            {column: dtype if dtype is not None else np.dtype('float64')
+             for column, dtype in self.dtypes.items()},
+            dtype=object,
+        )
+
+    def isnull(self):
+        """Equivalent of `df.isnull().sum()`."""
+        return pd.Series({column: self.rows - self.non_null[column] for column in self.columns})
+
+    def describe(self):
+        """Equivalent of `df.describe()` for the numeric columns."""
+        dtypes = self.column_dtypes()
+        table = {}
+        for column in self.columns:
+            if not _is_describable(dtypes[column]):
+                continue
+            stats = self.numeric.get(column, NumericStats(self.sample_size))
+            table[column] = [
+                stats.count,
+                stats.mean if stats.count else np.nan,
+                stats.std,
+                stats.min if stats.count else np.nan,
+                stats.quantile(0.25),
+                stats.quantile(0.50),
+                stats.quantile(0.75),
+                stats.max if stats.count else np.nan,
+            ]
+        index = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        return pd.DataFrame(table, index=index, dtype='float64')
+
+    def info(self):
+        """Equivalent of the text printed by `df.info()`."""
+        dtypes = self.column_dtypes()
+        table = pd.DataFrame({
+            'Column': self.columns,
+            'Non-Null Count': [f"{self.non_null[column]} non-null" for column in self.columns],
+            'Dtype': [str(dtypes[column]) for column in self.columns],
+        })
+        dtype_counts = dtypes.astype(str).value_counts(sort=False)
+        lines = [
+            f"Streamed {self.rows} entries in {self.chunks} chunk(s)",
+            f"Data columns (total {len(self.columns)} columns):",
+            table.to_string(),
+            "dtypes: " + ", ".join(f"{name}({count})" for name, count in dtype_counts.items()),
+            f"memory usage (full frame, deep): {self.memory_bytes / 1024:.1f} KB",
+        ]
+        return "\n".join(lines)
+
+    def report(self):
+        """Full report in the order used by 1_Introduction.ipynb."""
+        sections = [
+            "Dataset Info:", self.info(), "",
+            "Statistical Summary:", self.describe().to_string(), "",
+            "Shape of the dataset:", str(self.shape), "",
+            "Data types of each column:", self.column_dtypes().to_string(), "",
+            "Missing values in each column:", self.isnull().to_string(),
+        ]
+        return "\n".join(sections)
+
+
+# ===============================================================
+# Section 4: Streaming a File
+# ===============================================================
+
+
+def iter_chunks(path=UBER_CSV, chunksize=DEFAULT_CHUNKSIZE, **read_csv_kwargs):
+    """Yields DataFrame chunks of at most `chunksize` rows."""
+    with pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def summarize_chunks(chunks, sample_size=DEFAULT_SAMPLE_SIZE, seed=None):
+    """Folds an iterable of DataFrame chunks into one StreamSummary."""
+    rng = np.random.default_rng(seed)
+    summary = None
+    for chunk in chunks:
+        partial = StreamSummary.from_chunk(chunk, sample_size, rng)
+        summary = partial if summary is None else summary.merge(partial)
+    if summary is None:
+        raise ValueError("No chunks to summarize")
+    return summary
+
+
+def stream_summary(path=UBER_CSV, chunksize=DEFAULT_CHUNKSIZE, sample_size=DEFAULT_SAMPLE_SIZE,
+                   seed=None, **read_csv_kwargs):
+    """Reads `path` chunk by chunk and returns the merged StreamSummary."""
+    return summarize_chunks(iter_chunks(path, chunksize, **read_csv_kwargs), sample_size, seed)
+
+
+# ===============================================================
+# Section 5: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    # Small chunks on purpose: the merged report matches a single read_csv
+    summary = stream_summary(UBER_CSV, chunksize=250)
+    print(summary.report())
+
+    full = pd.read_csv(UBER_CSV)
+    print("\nMatches df.isnull().sum():", summary.isnull().equals(full.isnull().sum()))
+    print("Matches df.shape:", summary.shape == full.shape)
@@ -0,0 +1,182 @@
+"""
+===============================================================
+Pandas Tooling: Synthetic Uber Trip Generator
+===============================================================
+
+This module covers:
+1. Fitting a simple model of the real UberDataset.csv: which
+   (CATEGORY, START, STOP, PURPOSE) combinations occur and how often,
+   trip MILES and durations, time-of-day and date-format mix.
+2. Generating any number of trips with the same schema and value
+   distributions, chunk by chunk, so 100M rows never sit in memory.
+3. Writing the trips straight to CSV for benchmarks.
+
+Usage:
+    from synthetic_trips import TripModel
+
+    model = TripModel.fit()
+    df = model.sample(10_000, seed=0)
+    model.write_csv('trips_1m.csv', 1_000_000)
+"""
+
+import numpy as np
+import pandas as pd
+
+from fast_datetime import parse_fixed_layout, parse_trip_datetimes
+from streaming_loader import UBER_COLUMNS, UBER_CSV
+
+# ===============================================================
+# Section 1: The Trip Model
+# ===============================================================
+
+"""
+The model resamples real trips and perturbs them:
+- (CATEGORY, START, STOP, PURPOSE) are drawn jointly from the real rows,
+  which keeps route frequencies and missing PURPOSE values realistic.
+- MILES and duration come from the same real row, scaled by one shared
+  log-normal factor so speed stays plausible.
+- Start days are uniform over the requested date range; the minute of the
+  day follows the real time-of-day histogram.
+- Dates are written in the fixed 'MM-DD-YYYY HH:MM' layout or the short
+  'M/D/YYYY H:MM' layout in the same proportion as the real file.
+"""
+
+
+class TripModel:
+    """Empirical model of Uber trips."""
+
+    def __init__(self, trips, minute_of_day_probs, fixed_layout_share):
+        self.trips = trips.reset_index(drop=True)
+        self.minute_of_day_probs = minute_of_day_probs
+        self.fixed_layout_share = fixed_layout_share
+
+    @classmethod
+    def fit(cls, path=UBER_CSV):
+        """Learns the distributions from a real trip file."""
+        raw = pd.read_csv(path)
+        start = parse_trip_datetimes(raw['START_DATE'])
+        end = parse_trip_datetimes(raw['END_DATE'])
+        miles = pd.to_numeric(raw['MILES'], errors='coerce')
+
+        trips = raw[['CATEGORY', 'START', 'STOP', 'PURPOSE']].copy()
+        trips['MILES'] = miles
+        trips['DURATION_MIN'] = (end - start).dt.total_seconds() / 60.0
+        trips['MINUTE_OF_DAY'] = start.dt.hour * 60 + start.dt.minute
+        valid = trips[['CATEGORY', 'START', 'STOP', 'MILES', 'DURATION_MIN']].notna().all(axis=1)
+        trips = trips[valid & (trips['DURATION_MIN'] >= 0)]
+
+        minutes = np.bincount(trips['MINUTE_OF_DAY'].astype(int), minlength=24 * 60).astype(float)
+        # Smooth the minute histogram to hourly resolution so every minute is possible
+        hourly = minutes.reshape(24, 60).sum(axis=1) + 1.0
+        minute_probs = np.repeat(hourly / 60.0, 60)
+        minute_probs /= minute_probs.sum()
+
+        _, ok = parse_fixed_layout(raw['START_DATE'].to_numpy(dtype=object))
+        share = float(ok[start.notna().to_numpy()].mean())
+        return cls(trips.drop(columns='MINUTE_OF_DAY'), minute_probs, share)
+
+    def sample(self, rows, seed=None, start='2016-01-01', end='2016-12-31', as_text=True):
+        """
+        Draws `rows` synthetic trips.
+
+        With `as_text=True` (default) the dates are strings laid out like the
+        raw CSV; otherwise they are returned as datetime64 columns.
+        """
+        rng = np.random.default_rng(seed)
+        picks = rng.integers(0, len(self.trips), rows)
+        base = self.trips.iloc[picks].reset_index(drop=True)
+
+        scale = rng.lognormal(mean=0.0, sigma=0.25, size=rows)
+        miles = np.round(np.maximum(base['MILES'].to_numpy() * scale, 0.1), 1)
+        duration = np.maximum(np.round(base['DURATION_MIN'].to_numpy() * scale), 1).astype('int64')
+
+        first_day = pd.Timestamp(start).normalize()
+        days = (pd.Timestamp(end).normalize() - first_day).days + 1
+        day_offset = rng.integers(0, days, rows)
+        minute = rng.choice(24 * 60, size=rows, p=self.minute_of_day_probs)
+        start_ns = (first_day.value
+                    + day_offset * 86_400_000_000_000
+                    + minute * 60_000_000_000)
+        start_dates = pd.Series(start_ns.astype('datetime64[ns]'))
+        end_dates = start_dates + pd.to_timedelta(duration, unit='min')
+
+        df = pd.DataFrame({
+            'START_DATE': start_dates,
+            'END_DATE': end_dates,
+            'CATEGORY': base['CATEGORY'],
+            'START': base['START'],
+            'STOP': base['STOP'],
+            'MILES': miles,
+            'PURPOSE': base['PURPOSE'],
+        }, columns=UBER_COLUMNS)
+        if not as_text:
+            return df
+
+        fixed = rng.random(rows) < self.fixed_layout_share
+        df['START_DATE'] = _format_dates(df['START_DATE'], fixed)
+        df['END_DATE'] = _format_dates(df['END_DATE'], fixed)
+        return df
+
+    def iter_chunks(self, rows, chunk_rows=1_000_000, seed=None, **sample_kwargs):
+        """Yields `rows` trips in chunks of at most `chunk_rows`."""
+        seeds = np.random.SeedSequence(seed).spawn(max(1, -(-rows // chunk_rows)))
+        produced = 0
+        for chunk_seed in seeds:
+            size = min(chunk_rows, rows - produced)
+            if size <= 0:
+                break
+            yield self.sample(size, seed=np.random.default_rng(chunk_seed), **sample_kwargs)
+            produced += size
+
+    def write_csv(self, path, rows, chunk_rows=1_000_000, seed=None, **sample_kwargs):
+        """Writes `rows` synthetic trips to `path` chunk by chunk."""
+        for index, chunk in enumerate(self.iter_chunks(rows, chunk_rows, seed, **sample_kwargs)):
+            chunk.to_csv(path, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+        return path
+
+
+# ===============================================================
+# Section 2: Formatting Dates Like the Raw File
+# ===============================================================
+
+MINUTES = np.arange(24 * 60)
+LONG_TIMES = np.array([f"{m // 60:02d}:{m % 60:02d}" for m in MINUTES], dtype=object)
+SHORT_TIMES = np.array([f"{m // 60}:{m % 60:02d}" for m in MINUTES], dtype=object)
+
+
+def _format_dates(dates, fixed):
+    """
+    'MM-DD-YYYY HH:MM' where `fixed`, else the short 'M/D/YYYY H:MM' layout.
+
+    Only the distinct days and the 1,440 minutes of a day are formatted;
+    each row is then one lookup per part and a concatenation.
+    """
+    ns = dates.to_numpy(dtype='datetime64[ns]').astype('int64')
+    days, inverse = np.unique(ns // 86_400_000_000_000, return_inverse=True)
+    minute = (ns % 86_400_000_000_000) // 60_000_000_000
+
+    calendar = pd.to_datetime(days, unit='D')
+    long_days = np.asarray(calendar.strftime('%m-%d-%Y'), dtype=object)
+    short_days = np.array([f"{d.month}/{d.day}/{d.year}" for d in calendar], dtype=object)
+
+    day_part = np.where(fixed, long_days[inverse], short_days[inverse])
+    time_part = np.where(fixed, LONG_TIMES[minute], SHORT_TIMES[minute])
+    return pd.Series(day_part + ' ' + time_part, index=dates.index)
+
+
+# ===============================================================
+# Section 3: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    model = TripModel.fit()
+    synthetic = model.sample(100_000, seed=42)
+    print(synthetic.head())
+
+    real = pd.read_csv(UBER_CSV)
+    print("\nCATEGORY share (real vs synthetic):")
+    print(pd.concat([real['CATEGORY'].value_counts(normalize=True),
+                     synthetic['CATEGORY'].value_counts(normalize=True)], axis=1, keys=['real', 'synthetic']))
+    print("\nMissing PURPOSE (real vs synthetic):",
+          round(real['PURPOSE'].isna().mean(), 3), round(synthetic['PURPOSE'].isna().mean(), 3))
+    print("Median MILES (real vs synthetic):", real['MILES'].iloc[:-1].median(), synthetic['MILES'].median())
@@ -0,0 +1,445 @@
+"""
+===============================================================
+Pandas Tooling: Incremental Time-Window Rollups for Trips
+===============================================================
+
+This module covers:
+1. Pre-aggregating trips by (time bucket, CATEGORY, PURPOSE) at hourly,
+   daily and monthly levels, keeping count / sum / M2 (sum of squared
+   deviations from the mean) / min / max of MILES per bucket.
+2. Appending new batches of trips: only the buckets the batch touches are
+   updated, new buckets are added, nothing is recomputed from raw rows.
+3. Answering window queries by combining the coarsest buckets that fit
+   inside the window (whole months, then whole days, then hours at the
+   edges), so a year-long query reads ~12 month buckets per group instead
+   of every trip.
+4. Saving and reopening the store with the column cache format from
+   dataset_cache.py.
+
+Usage:
+    from trip_rollups import RollupStore
+
+    store = RollupStore()
+    store.append(df)                       # any batch of raw trips
+    store.query(by=['PURPOSE'], freq='month')
+    store.query('2016-03-15', '2016-04-02 12:00', by=['CATEGORY'])
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import read_entry, write_entry
+from fast_datetime import parse_trip_datetimes
+
+# ===============================================================
+# Section 1: Buckets
+# ===============================================================
+
+"""
+Every trip is assigned to a bucket by its START_DATE, floored to the hour,
+day or month. Buckets are half-open: the hour bucket 2016-01-01 21:00
+holds trips starting in [21:00, 22:00).
+
+Only trips with a parseable START_DATE and a numeric MILES are rolled up
+(the 'Totals' footer row of UberDataset.csv is skipped that way). Missing
+PURPOSE values are grouped as 'Unknown', as in 2_Data_Cleaning.ipynb.
+"""
+
+LEVELS = ['month', 'day', 'hour']  # coarse to fine
+KEYS = ['BUCKET', 'CATEGORY', 'PURPOSE']
+STATS = ['count', 'sum', 'm2', 'min', 'max']
+GROUP_COLUMNS = ['CATEGORY', 'PURPOSE']
+
+_TABLE_SCHEMA = {
+    'BUCKET': 'datetime', 'CATEGORY': 'category', 'PURPOSE': 'category',
+    'count': 'int64', 'sum': 'float64', 'm2': 'float64', 'min': 'float64', 'max': 'float64',
+}
+
+
+def floor_bucket(values, level):
+    """Floors datetime64 values to the start of their hour, day or month."""
+    values = np.asarray(values, dtype='datetime64[ns]')
+    if level == 'month':
+        return values.astype('datetime64[M]').astype('datetime64[ns]')
+    if level == 'day':
+        return values.astype('datetime64[D]').astype('datetime64[ns]')
+    if level == 'hour':
+        return values.astype('datetime64[h]').astype('datetime64[ns]')
+    raise ValueError(f"level must be one of {LEVELS}")
+
+
+def _floor(timestamp, level):
+    """Start of the bucket containing `timestamp`."""
+    return pd.Timestamp(floor_bucket([timestamp.to_datetime64()], level)[0])
+
+
+def _ceil(timestamp, level):
+    """Start of the first bucket at or after `timestamp`."""
+    floored = _floor(timestamp, level)
+    if floored == timestamp:
+        return floored
+    if level == 'month':
+        return floored + pd.offsets.MonthBegin(1)
+    return floored + pd.Timedelta(1, unit='h' if level == 'hour' else 'D')
+
+
+def _empty_table():
+    """An aggregate table without rows."""
+    index = pd.MultiIndex.from_arrays(
+        [pd.DatetimeIndex([], dtype='datetime64[ns]'), pd.Index([], dtype=object), pd.Index([], dtype=object)],
+        names=KEYS)
+    table = pd.DataFrame({stat: pd.Series(dtype='float64') for stat in STATS}, index=index)
+    return table.astype({'count': 'int64'})
+
+
+def _combine(table):
+    """Collapses rows with equal index into one row per key."""
+    levels = list(range(table.index.nlevels))
+    grouped = table.groupby(level=levels, sort=True)
+    combined = grouped.agg({'count': 'sum', 'sum': 'sum', 'm2': 'sum', 'min': 'min', 'max': 'max'})
+    # Chan et al.: M2 of a union adds each part's spread around the combined mean
+    mean = table['sum'] / table['count']
+    combined_mean = grouped['sum'].transform('sum') / grouped['count'].transform('sum')
+    spread = table['count'] * (mean - combined_mean) ** 2
+    combined['m2'] += spread.groupby(level=levels, sort=True).sum()
+    return combined
+
+
+def _merge_moments(count, total, m2, other_count, other_total, other_m2):
+    """Chan et al. pairwise update: (count, sum, M2) of two disjoint parts combined."""
+    merged = count + other_count
+    delta = other_total / other_count - total / count
+    return merged, total + other_total, m2 + other_m2 + delta * delta * count * other_count / merged
+
+
+# ===============================================================
+# Section 2: Keyed Aggregate Tables
+# ===============================================================
+
+"""
+A level's aggregates are stored column by column in NumPy arrays whose
+capacity doubles as buckets are added, plus a dict from
+(bucket, CATEGORY, PURPOSE) to row position. An append looks up only the
+keys of the (already aggregated) batch: touched rows are updated in place
+and new keys are written after the last row. Nothing is re-sorted or
+copied, so an append costs O(groups in the batch) whatever the size of the
+store. The sorted DataFrame view is built only when it is read, and cached
+until the next append.
+"""
+
+
+class RollupTable:
+    """count/sum/M2/min/max per (bucket, CATEGORY, PURPOSE), updated by key."""
+
+    def __init__(self):
+        self.positions = {}
+        self.size = 0
+        self.buckets = np.empty(0, dtype='int64')
+        self.categories = np.empty(0, dtype=object)
+        self.purposes = np.empty(0, dtype=object)
+        self.stats = {stat: np.empty(0, dtype='int64' if stat == 'count' else 'float64') for stat in STATS}
+        self._frame = None
+
+    @classmethod
+    def from_frame(cls, table):
+        """A keyed table from a DataFrame indexed by KEYS."""
+        return cls().update(table)
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, rows):
+        """Grows the column arrays (doubling) to hold `rows` rows."""
+        capacity = len(self.buckets)
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity, 64)
+        self.buckets = np.resize(self.buckets, capacity)
+        self.categories = np.resize(self.categories, capacity)
+        self.purposes = np.resize(self.purposes, capacity)
+        self.stats = {stat: np.resize(values, capacity) for stat, values in self.stats.items()}
+
+    def update(self, batch):
+        """Merges a table indexed by KEYS (one row per key) into this one."""
+        if batch.empty:
+            return self
+        buckets = np.asarray(batch.index.get_level_values('BUCKET'), dtype='datetime64[ns]').astype('int64')
+        categories = np.asarray(batch.index.get_level_values('CATEGORY'), dtype=object)
+        purposes = np.asarray(batch.index.get_level_values('PURPOSE'), dtype=object)
+        keys = list(zip(buckets.tolist(), categories.tolist(), purposes.tolist()))
+        rows = np.array([self.positions.get(key, -1) for key in keys], dtype='int64')
+        values = {stat: batch[stat].to_numpy() for stat in STATS}
+
+        touched = rows >= 0
+        if touched.any():
+            at, source = rows[touched], touched
+            count, total, m2 = _merge_moments(
+                self.stats['count'][at], self.stats['sum'][at], self.stats['m2'][at],
+                values['count'][source], values['sum'][source], values['m2'][source])
+            self.stats['count'][at] = count
+            self.stats['sum'][at] = total
+            self.stats['m2'][at] = m2
+            self.stats['min'][at] = np.minimum(self.stats['min'][at], values['min'][source])
+            self.stats['max'][at] = np.maximum(self.stats['max'][at], values['max'][source])
+
+        new = np.flatnonzero(~touched)
+        if new.size:
+            self._reserve(self.size + new.size)
+            at = np.arange(self.size, self.size + new.size)
+            self.buckets[at] = buckets[new]
+            self.categories[at] = categories[new]
+            self.purposes[at] = purposes[new]
+            for stat in STATS:
+                self.stats[stat][at] = values[stat][new]
+            self.positions.update(zip((keys[i] for i in new), at.tolist()))
+            self.size += int(new.size)
+        self._frame = None
+        return self
+
+    def _select(self, rows=slice(None)):
+        """Rows (a mask or slice over the stored rows) as a DataFrame indexed by KEYS."""
+        index = pd.MultiIndex.from_arrays(
+            [pd.DatetimeIndex(self.buckets[:self.size][rows].view('datetime64[ns]')),
+             pd.Index(self.categories[:self.size][rows], dtype=object),
+             pd.Index(self.purposes[:self.size][rows], dtype=object)],
+            names=KEYS)
+        return pd.DataFrame({stat: values[:self.size][rows] for stat, values in self.stats.items()}, index=index)
+
+    def frame(self):
+        """The whole table as a DataFrame sorted by KEYS."""
+        if self._frame is None:
+            self._frame = self._select().sort_index()
+        return self._frame
+
+    def rows(self, start, end):
+        """Rows with a bucket in [start, end)."""
+        buckets = self.buckets[:self.size]
+        return self._select((buckets >= pd.Timestamp(start).value) & (buckets < pd.Timestamp(end).value))
+
+
+# ===============================================================
+# Section 3: The Rollup Store
+# ===============================================================
+
+
+class RollupStore:
+    """Hourly, daily and monthly MILES aggregates per (bucket, CATEGORY, PURPOSE)."""
+
+    def __init__(self, tables=None, rows=0):
+        self.tables = tables or {level: RollupTable() for level in LEVELS}
+        self.rows = rows
+
+    @staticmethod
+    def prepare(df):
+        """Parses and filters a raw batch down to START_DATE, CATEGORY, PURPOSE, MILES."""
+        trips = pd.DataFrame({
+            'START_DATE': parse_trip_datetimes(df['START_DATE']),
+            'CATEGORY': df['CATEGORY'].astype(object),
+            'PURPOSE': df['PURPOSE'].astype(object).fillna('Unknown'),
+            'MILES': pd.to_numeric(df['MILES'], errors='coerce'),
+        })
+        return trips.dropna(subset=['START_DATE', 'CATEGORY', 'MILES'])
+
+    @staticmethod
+    def aggregate(trips, level):
+        """Aggregates prepared trips into one table at `level`."""
+        miles = trips['MILES'].to_numpy(dtype='float64')
+        frame = pd.DataFrame({
+            'BUCKET': floor_bucket(trips['START_DATE'], level),
+            'CATEGORY': trips['CATEGORY'].to_numpy(),
+            'PURPOSE': trips['PURPOSE'].to_numpy(),
+            'miles': miles,
+        })
+        grouped = frame.groupby(KEYS, sort=True)
+        count = grouped['miles'].size().astype('int64')
+        return pd.DataFrame({
+            'count': count,
+            'sum': grouped['miles'].sum(),
+            # Population variance times count is the M2 of the group
+            'm2': grouped['miles'].var(ddof=0) * count,
+            'min': grouped['miles'].min(),
+            'max': grouped['miles'].max(),
+        })
+
+    @classmethod
+    def from_frame(cls, df):
+        """Builds a store from one batch of raw trips."""
+        return cls().append(df)
+
+    def append(self, df):
+        """
+        Rolls a new batch of raw trips into the store.
+
+        The batch is aggregated on its own first; existing buckets it touches
+        are updated in place and buckets it creates are added. Buckets the
+        batch does not touch are never read.
+        """
+        trips = self.prepare(df)
+        for level in LEVELS:
+            self.tables[level].update(self.aggregate(trips, level))
+        self.rows += len(trips)
+        return self
+
+    def merge(self, other):
+        """Combines two stores built from disjoint batches of trips."""
+        tables = {level: RollupTable.from_frame(self.tables[level].frame()).update(other.tables[level].frame())
+                  for level in LEVELS}
+        return RollupStore(tables, self.rows + other.rows)
+
+    # ---------------------------------------------------------------
+    # Queries
+    # ---------------------------------------------------------------
+
+    def span(self):
+        """(first hour, end of last hour) covered by the store."""
+        table = self.tables['hour']
+        if len(table) == 0:
+            raise ValueError("The rollup store is empty")
+        buckets = table.buckets[:table.size]
+        return pd.Timestamp(buckets.min()), pd.Timestamp(buckets.max()) + pd.Timedelta(1, unit='h')
+
+    def plan(self, start=None, end=None, freq=None):
+        """
+        The (level, start, end) pieces that cover the window [start, end).
+
+        Window edges are rounded outwards to whole hours. The coarsest level
+        used is `freq` (any level when None), so results can still be
+        grouped by `freq` buckets.
+        """
+        first, last = self.span()
+        start = first if start is None else _floor(pd.Timestamp(start), 'hour')
+        end = last if end is None else _ceil(pd.Timestamp(end), 'hour')
+        levels = LEVELS[LEVELS.index(freq):] if freq else LEVELS
+        return _cover(start, end, levels)
+
+    def _rows(self, level, start, end):
+        """Aggregate rows of `level` with a bucket in [start, end)."""
+        return self.tables[level].rows(start, end)
+
+    def query(self, start=None, end=None, by=('CATEGORY',), freq=None):
+        """
+        MILES statistics for trips starting in [start, end).
+
+        `by` is any subset of ['CATEGORY', 'PURPOSE']; `freq` ('hour', 'day'
+        or 'month') adds the time bucket as the first grouping level. Returns
+        count, sum, mean, std (sample), min and max per group.
+        """
+        by = list(by)
+        unknown = set(by) - set(GROUP_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot group by {sorted(unknown)}; use {GROUP_COLUMNS}")
+
+        pieces = [self._rows(level, lo, hi) for level, lo, hi in self.plan(start, end, freq)]
+        rows = pd.concat(pieces) if pieces else _empty_table()
+        rows = rows.reset_index()
+        if freq:
+            rows['BUCKET'] = floor_bucket(rows['BUCKET'], freq)
+        keys = (['BUCKET'] if freq else []) + by
+
+        if keys:
+            result = _combine(rows.set_index(keys)[STATS])
+        else:
+            result = _combine(rows.assign(_all='all').set_index('_all')[STATS])
+            result.index.name = None
+        return summarize(result)
+
+    def total(self, start=None, end=None):
+        """MILES statistics over every trip in the window as one Series."""
+        return self.query(start, end, by=[]).iloc[0]
+
+    # ---------------------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------------------
+
+    def save(self, directory):
+        """Writes every level as a column cache entry under `directory`."""
+        os.makedirs(directory, exist_ok=True)
+        for level in LEVELS:
+            write_entry(self.tables[level].frame().reset_index(), _TABLE_SCHEMA,
+                        os.path.join(directory, level), f"rollup-{level}")
+        with open(os.path.join(directory, 'store.json'), 'w') as file:
+            json.dump({'rows': self.rows, 'levels': LEVELS}, file, indent=2)
+
+    @classmethod
+    def open(cls, directory):
+        """Loads a store written by `save()`."""
+        with open(os.path.join(directory, 'store.json')) as file:
+            meta = json.load(file)
+        tables = {}
+        for level in LEVELS:
+            frame = read_entry(os.path.join(directory, level))
+            for column in GROUP_COLUMNS:
+                frame[column] = frame[column].astype(object)
+            tables[level] = RollupTable.from_frame(frame.set_index(KEYS))
+        return cls(tables, meta['rows'])
+
+
+def _cover(start, end, levels):
+    """Splits [start, end) into whole buckets, coarsest level first."""
+    if start >= end:
+        return []
+    level = levels[0]
+    if len(levels) == 1:
+        return [(level, start, end)]
+    inner_start, inner_end = _ceil(start, level), _floor(end, level)
+    if inner_start >= inner_end:
+        return _cover(start, end, levels[1:])
+    return (_cover(start, inner_start, levels[1:])
+            + [(level, inner_start, inner_end)]
+            + _cover(inner_end, end, levels[1:]))
+
+
+def summarize(table):
+    """Adds mean and sample std to count/sum/M2/min/max."""
+    count = table['count'].astype('float64')
+    mean = table['sum'] / count
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = table['m2'] / (count - 1)
+    std = np.sqrt(variance.clip(lower=0)).where(count > 1)
+    return pd.DataFrame({
+        'count': table['count'],
+        'sum': table['sum'],
+        'mean': mean,
+        'std': std,
+        'min': table['min'],
+        'max': table['max'],
+    })
+
+
+# ===============================================================
+# Section 4: Example
+# ===============================================================
+
+if __name__ == "__main__":
+    import tempfile
+
+    from streaming_loader import UBER_CSV, iter_chunks
+
+    store = RollupStore()
+    for chunk in iter_chunks(UBER_CSV, chunksize=300):
+        store.append(chunk)
+    print("Trips rolled up:", store.rows)
+    print({level: len(table) for level, table in store.tables.items()})
+    # Output: buckets per level, far fewer at the coarser levels
+
+    print("\nMonthly miles per PURPOSE:")
+    print(store.query(by=['PURPOSE'], freq='month').head())
+
+    print("\nPlan for 2016-03-15 .. 2016-06-02 12:00:")
+    for level, lo, hi in store.plan('2016-03-15', '2016-06-02 12:00'):
+        print(f"  {level:5s} {lo} -> {hi}")
+
+    # Same numbers as a groupby over the raw rows
+    trips = RollupStore.prepare(pd.read_csv(UBER_CSV))
+    window = trips[(trips['START_DATE'] >= '2016-03-15') & (trips['START_DATE'] < '2016-06-02 12:00')]
+    expected = window.groupby('CATEGORY')['MILES'].agg(['count', 'sum', 'mean', 'std', 'min', 'max'])
+    result = store.query('2016-03-15', '2016-06-02 12:00', by=['CATEGORY'])
+    print("\nMatches groupby:", np.allclose(result.to_numpy(dtype=float), expected.to_numpy(dtype=float)))
+
+    directory = os.path.join(tempfile.gettempdir(), 'trip_rollups')
+    store.save(directory)
+    reopened = RollupStore.open(directory)
+    print("Reopened total:", reopened.total().round(2).to_dict())